@@ -1,61 +1,145 @@
 import json
+import logging
 import os
 import time
-from typing import List
+from typing import List, Optional
 
-import openai
 from openai.types.beta.threads import ThreadMessage
 from PIL import Image
 
+from genai_core.client import get_openai_client
+from genai_core.telemetry import get_logger, get_verbose_logger, truncate
+
+import agent.tools.code_search as code_search
 import agent.tools.github_tools as github_tools
 import agent.tools.web_reader as web_reader
+from agent.compaction import CompactingExecutor
 from agent.excecutor import FunctionExecutor
 from agent.prompts import BASE_INSTRUCTION, STATUS_UPDATE
 from agent.tools.github_tools import GitHubInterface
 from agent.tools.image_tools import analyse_image_tool
+from agent.tools.local_git import LocalGitInterface
 
 
-client = openai.OpenAI(api_key=os.environ["OPENAI_API_KEY"])
+client = get_openai_client()
+# messages fetched per request, the maximum of the API
+MESSAGES_PAGE_SIZE = 100
 
-def build_frontend_developer_agent():
+def get_agent_tools():
     tools = github_tools.get_tools()
+    tools.extend(code_search.get_tools())
     tools.extend(web_reader.get_tools())
     tools.append({"type": "code_interpreter"})
+    return tools
+
+
+def build_frontend_developer_agent():
     assistant = client.beta.assistants.create(
         name="Serhii, the Frontend Developer",
         instructions=BASE_INSTRUCTION,
-        tools=tools,
+        tools=get_agent_tools(),
         model="gpt-4-1106-preview"
     )
     return assistant
 
 
+def _tool_names(tools) -> set:
+    return {
+        tool["function"]["name"] if tool["type"] == "function" else tool["type"]
+        for tool in tools
+    }
+
+
 def get_frontend_developer_agent():
     assistants = client.beta.assistants.list()
     for assistant in assistants:
         if assistant.name == "Serhii, the Frontend Developer":
+            tools = get_agent_tools()
+            existing = [tool.model_dump() for tool in assistant.tools]
+            if _tool_names(existing) != _tool_names(tools):
+                # an assistant created before tools were added to the agent
+                assistant = client.beta.assistants.update(assistant.id, tools=tools)
             return assistant
     return build_frontend_developer_agent()
 
 
+class MessageStore:
+    """Messages of a thread in creation order, each rendered once."""
+
+    def __init__(self):
+        self.messages: List[ThreadMessage] = []
+        self._ids = set()
+        self._rendered: List[str] = []
+
+    @property
+    def last_id(self) -> Optional[str]:
+        return self.messages[-1].id if self.messages else None
+
+    def extend(self, messages: List[ThreadMessage]) -> List[ThreadMessage]:
+        """Add the messages not in the store yet and return them."""
+        new_messages = [message for message in messages if message.id not in self._ids]
+        for message in new_messages:
+            self._ids.add(message.id)
+            self.messages.append(message)
+            self._rendered.append(f"{message.role}: {message.content}")
+        return new_messages
+
+    def render(self) -> str:
+        """The conversation, latest message first."""
+        return "\n".join(reversed(self._rendered))
+
+
 class FrontendAgentRunner:
     def __init__(self, verbose: bool = False):
         self.agent = get_frontend_developer_agent()
-        github_interface = GitHubInterface.from_github_token(
-            os.environ["GITHUB_TOKEN"], 
-            repository=os.environ["GITHUB_REPOSITORY"]
-        )
+        if os.environ.get("AGENT_WORKDIR"):
+            # work on a local clone and push once, when the pull request is created
+            github_interface = LocalGitInterface.from_github_token(
+                os.environ["GITHUB_TOKEN"],
+                repository=os.environ["GITHUB_REPOSITORY"],
+                repository_dir=os.environ["AGENT_WORKDIR"],
+            )
+        else:
+            github_interface = GitHubInterface.from_github_token(
+                os.environ["GITHUB_TOKEN"], 
+                repository=os.environ["GITHUB_REPOSITORY"]
+            )
         web_reader_interface = web_reader.WebPageToolExecutor()
-        self.executor = FunctionExecutor([github_interface, web_reader_interface], verbose=verbose)
+        code_search_interface = code_search.CodeSearchToolExecutor(github_interface)
+        # tool outputs are compacted, they are billed again on every turn of the thread
+        self.executor = CompactingExecutor(FunctionExecutor(
+            [github_interface, code_search_interface, web_reader_interface],
+            verbose=verbose,
+            observers=[code_search_interface],
+        ))
         self.thread = client.beta.threads.create()
+        self.store = MessageStore()
         self.verbose = verbose
+        self.logger = get_verbose_logger("agent.runner") if verbose else get_logger("agent.runner")
     
+    def _fetch_new_messages(self) -> List[ThreadMessage]:
+        """Messages created since the last one in the store, oldest first."""
+        messages = []
+        after = self.store.last_id
+        while True:
+            params = {"order": "asc", "limit": MESSAGES_PAGE_SIZE}
+            if after is not None:
+                params["after"] = after
+            page = client.beta.threads.messages.list(thread_id=self.thread.id, **params)
+            messages.extend(page.data)
+            if not page.data or not getattr(page, "has_more", False):
+                return self.store.extend(messages)
+            after = page.data[-1].id
+
     def run(self, text: str, image: Image = None) -> List[ThreadMessage]:
+        """Runs the agent on the text and returns the messages added to the
+        thread meanwhile, the whole conversation is in ``store``."""
         # TODO: add image support
-        if self.verbose:
-            print(f"Running agent with input: {text}")
-            print(f"Thread id: {self.thread.id}")
-        
+        self.logger.debug("Running agent on thread %s with input: %s", self.thread.id, truncate(text))
+        start = time.perf_counter()
+        n_polls, n_tool_calls = 0, 0
+        saved_tokens = self.executor.saved_tokens
+
         _ = client.beta.threads.messages.create(
             thread_id=self.thread.id,
             role="user",
@@ -63,9 +147,7 @@ class FrontendAgentRunner:
         )
         if image:
             image_description = analyse_image_tool(image)
-            if self.verbose:
-                print("Image provided")
-                print(f"Image description: {image_description}")
+            self.logger.debug("Image description: %s", truncate(image_description))
             text_message = f"Here is the description of the image provided by the user: {image_description}"
             _ = client.beta.threads.messages.create(
                 thread_id=self.thread.id,
@@ -81,9 +163,9 @@ class FrontendAgentRunner:
         )
         while run.status != "completed":
             if run.status == "requires_action":
-                if self.verbose:
-                    print("Run requires action")
                 tool_calls = run.required_action.submit_tool_outputs.tool_calls
+                n_tool_calls += len(tool_calls)
+                self.logger.debug("Run requires %d tool calls", len(tool_calls))
                 tool_outputs = []
                 for tool_call in tool_calls:
                     run_output = self.executor.execute(
@@ -100,9 +182,7 @@ class FrontendAgentRunner:
                     thread_id=self.thread.id,
                     run_id=run.id,
                     tool_outputs=tool_outputs
-                )  
-                if self.verbose:
-                    print("Submitted tool outputs")
+                )
             elif run.status == "failed":
                 raise Exception(run.last_error.message) 
             else:
@@ -111,9 +191,16 @@ class FrontendAgentRunner:
                 thread_id=self.thread.id,
                 run_id=run.id
             )
-        messages = client.beta.threads.messages.list(
-            thread_id=self.thread.id
-        )
-        if self.verbose:
-            print(f"Agent finished with output: {messages}")
-        return list(messages)
+            n_polls += 1
+        messages = self._fetch_new_messages()
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("agent run", extra={"fields": {
+                "thread": self.thread.id,
+                "latency_ms": round(1000 * (time.perf_counter() - start), 1),
+                "polls": n_polls,
+                "tool_calls": n_tool_calls,
+                "compacted_tokens": self.executor.saved_tokens - saved_tokens,
+                "messages": len(messages),
+                "thread_messages": len(self.store.messages),
+            }})
+        return messages
@@ -0,0 +1,265 @@
+"""Compaction of the tool outputs submitted to the assistant.
+
+Every tool output stays in the thread and is billed again on every later
+turn, so ``CompactingExecutor`` wraps the ``FunctionExecutor`` and keeps
+each output within a per-tool token budget:
+
+- file lists are summarised as a directory tree, collapsing the deepest
+  directories first;
+- files and web pages are returned one page of lines at a time, with the
+  ``start_line`` to call the tool again with to read the next page;
+- a page the thread has already seen is replaced by a reference to it,
+  unless it was sent more than ``SEEN_TTL_CALLS`` tool calls ago, when the
+  assistant may no longer attend to it.
+"""
+import hashlib
+import json
+import re
+from collections import Counter
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+
+from agent.excecutor import FunctionExecutor
+from genai_core.telemetry import get_logger
+
+logger = get_logger("agent.compaction")
+
+DEFAULT_BUDGETS = {
+    "getStatus": 1500,
+    "readFile": 3000,
+    "readWebpage": 2000,
+    "searchCode": 1500,
+}
+DEFAULT_BUDGET = 1000
+# tools returning text paged by line, the page is selected with start_line
+PAGED_FUNCTIONS = ("readFile", "readWebpage")
+WRITE_FUNCTIONS = ("createFile", "updateFile", "deleteFile")
+# tool calls after which a page already sent is sent again instead of referenced
+SEEN_TTL_CALLS = 20
+
+
+def estimate_tokens(text: str) -> int:
+    # about 4 characters per token
+    return len(text) // 4 + 1
+
+
+class _TextExtractor(HTMLParser):
+    BLOCKS = {"p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "section", "article", "pre"}
+    SKIPPED = {"script", "style", "noscript", "svg", "head"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts: List[str] = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED:
+            self._skipping += 1
+        elif tag in self.BLOCKS:
+            self.parts.append("\n")
+        elif tag == "a":
+            href = dict(attrs).get("href")
+            if href and not href.startswith(("#", "javascript:")):
+                self.parts.append(f" [{href}] ")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED:
+            self._skipping = max(0, self._skipping - 1)
+        elif tag in self.BLOCKS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    """Visible text of a page with the link targets, one block per line."""
+    if "<" not in html:
+        return html
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    lines = (re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in "".join(extractor.parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def file_tree(paths: List[str], budget: int) -> str:
+    """
+    Renders the paths as an indented tree. When it does not fit in the budget,
+    directories below a depth are shown with their number of files instead.
+    """
+    tree: Dict[str, Any] = {}
+    for path in sorted(paths):
+        node = tree
+        *directories, name = path.split("/")
+        for directory in directories:
+            node = node.setdefault(directory + "/", {})
+        node[name] = None
+
+    def render(node: Dict[str, Any], depth: int, max_depth: int) -> List[str]:
+        lines = []
+        for name, child in node.items():
+            indent = "  " * depth
+            if child is None:
+                lines.append(indent + name)
+            elif depth + 1 >= max_depth:
+                lines.append(f"{indent}{name} ({_describe(child)})")
+            else:
+                lines.append(indent + name)
+                lines.extend(render(child, depth + 1, max_depth))
+        return lines
+
+    max_depth = max((path.count("/") + 1 for path in paths), default=1)
+    lines = render(tree, 0, max_depth)
+    while max_depth > 1 and estimate_tokens("\n".join(lines)) > budget:
+        max_depth -= 1
+        lines = render(tree, 0, max_depth)
+    text = "\n".join(lines)
+    if estimate_tokens(text) > budget:
+        kept = _fit_lines(lines, budget)
+        text = "\n".join(lines[:kept]) + f"\n... {len(lines) - kept} more entries"
+    return text
+
+
+def _describe(node: Dict[str, Any]) -> str:
+    extensions: Counter = Counter()
+
+    def walk(node):
+        for name, child in node.items():
+            if child is None:
+                extensions[name.rsplit(".", 1)[-1] if "." in name else name] += 1
+            else:
+                walk(child)
+
+    walk(node)
+    total = sum(extensions.values())
+    common = ", ".join(f".{extension} {count}" for extension, count in extensions.most_common(3))
+    return f"{total} files: {common}"
+
+
+def _fit_lines(lines: List[str], budget: int) -> int:
+    # number of lines fitting in the budget, at least one
+    used = 0
+    for i, line in enumerate(lines):
+        used += estimate_tokens(line)
+        if used > budget:
+            return max(1, i)
+    return len(lines)
+
+
+class CompactingExecutor:
+    def __init__(
+            self,
+            executor: FunctionExecutor,
+            budgets: Optional[Dict[str, int]] = None,
+            seen_ttl_calls: int = SEEN_TTL_CALLS,
+    ):
+        """
+        Parameters:
+            executor(FunctionExecutor): runs the tools
+            budgets(dict): tokens allowed for the output of each function, the
+                other functions get DEFAULT_BUDGET
+            seen_ttl_calls(int): tool calls during which a page already sent is
+                replaced by a reference to it
+        """
+        self.executor = executor
+        self.budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+        self.seen_ttl_calls = seen_ttl_calls
+        # full text of the paged outputs, so the next pages are not fetched again
+        self._pages: Dict[str, str] = {}
+        # digest of every page submitted to the thread -> how it was requested
+        # and the tool call that sent it
+        self._seen: Dict[str, Tuple[str, int]] = {}
+        self._calls = 0
+        # running total, over every run of the thread
+        self.saved_tokens = 0
+
+    def budget(self, function_name: str) -> int:
+        return self.budgets.get(function_name, DEFAULT_BUDGET)
+
+    def reset(self) -> None:
+        """Forget what the thread has seen, e.g. on a new thread."""
+        self._pages.clear()
+        self._seen.clear()
+
+    def execute(self, function_name: str, **kwargs) -> str:
+        self._calls += 1
+        if function_name in PAGED_FUNCTIONS:
+            return self._execute_paged(function_name, **kwargs)
+        result = self.executor.execute(function_name, **kwargs)
+        if function_name in WRITE_FUNCTIONS:
+            self._pages.pop(self._key("readFile", {"file_path": kwargs.get("file_path", "")}), None)
+        if function_name == "getStatus" and isinstance(result, dict):
+            return self._compact_status(result)
+        text = result if isinstance(result, str) else json.dumps(result, default=str)
+        return self._truncate(function_name, text)
+
+    @staticmethod
+    def _key(function_name: str, kwargs: Dict[str, Any]) -> str:
+        if function_name == "readFile":
+            kwargs = {"file_path": kwargs.get("file_path", "").lstrip("/")}
+        return function_name + json.dumps(kwargs, sort_keys=True)
+
+    def _execute_paged(self, function_name: str, start_line: int = 1, **kwargs) -> str:
+        key = self._key(function_name, kwargs)
+        start_line = max(1, int(start_line))
+        if start_line == 1 or key not in self._pages:
+            result = self.executor.execute(function_name, **kwargs)
+            if not isinstance(result, str):
+                result = json.dumps(result, default=str)
+            if function_name == "readWebpage":
+                result = html_to_text(result)
+            self._pages[key] = result
+        text = self._pages[key]
+        page, end_line, n_lines = self._page(text, start_line, self.budget(function_name))
+        described = ", ".join(f"{name}={value}" for name, value in kwargs.items())
+        if start_line > n_lines:
+            return f"[{function_name} {described}: start_line {start_line} is past the last line, {n_lines}]"
+        if end_line < n_lines or start_line > 1:
+            header = f"[{function_name} {described}: lines {start_line}-{end_line} of {n_lines}"
+            if end_line < n_lines:
+                header += f", call {function_name} again with start_line={end_line + 1} for the next lines"
+            page = header + "]\n" + page
+        digest = hashlib.sha1(page.encode("utf-8")).hexdigest()
+        seen = self._seen.get(digest)
+        if seen is not None and self._calls - seen[1] <= self.seen_ttl_calls:
+            self.saved_tokens += estimate_tokens(page)
+            return (
+                f"[{function_name} {described}: unchanged since {seen[0]}, "
+                "see the earlier output]"
+            )
+        self._seen[digest] = (
+            f"the call {function_name} with {described}, start_line={start_line}", self._calls
+        )
+        self.saved_tokens += max(0, estimate_tokens(text) - estimate_tokens(page))
+        return page
+
+    @staticmethod
+    def _page(text: str, start_line: int, budget: int) -> Tuple[str, int, int]:
+        lines = text.split("\n")
+        if start_line > len(lines):
+            return "", len(lines), len(lines)
+        remaining = lines[start_line - 1:]
+        kept = _fit_lines(remaining, budget)
+        page = remaining[:kept]
+        if kept == 1 and estimate_tokens(page[0]) > budget:
+            # a single huge line, e.g. minified code
+            page = [page[0][:4 * budget] + " ...[line truncated]"]
+        return "\n".join(page), start_line + kept - 1, len(lines)
+
+    def _compact_status(self, status: Dict[str, Any]) -> str:
+        status = dict(status)
+        files = status.pop("files", [])
+        others = json.dumps(status, default=str)
+        tree = file_tree(files, max(100, self.budget("getStatus") - estimate_tokens(others)))
+        self.saved_tokens += max(0, estimate_tokens(json.dumps(files)) - estimate_tokens(tree))
+        return f"{others}\nfiles ({len(files)}):\n{tree}"
+
+    def _truncate(self, function_name: str, text: str) -> str:
+        budget = self.budget(function_name)
+        if estimate_tokens(text) <= budget:
+            return text
+        self.saved_tokens += estimate_tokens(text) - budget
+        logger.debug("Truncating the output of %s to %d tokens", function_name, budget)
+        return text[:4 * budget] + f"\n...[output of {function_name} truncated to {budget} tokens]"
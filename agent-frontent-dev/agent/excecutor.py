@@ -1,5 +1,9 @@
+import logging
+import time
 from typing import Any, Dict, Protocol, List
 
+from genai_core.telemetry import get_logger, get_verbose_logger, truncate
+
 
 class ToolExecutor(Protocol):
     """This class defines the interface for the tool executor. 
@@ -19,19 +23,40 @@ class ToolExecutor(Protocol):
         raise NotImplementedError
 
 
+class ToolObserver(Protocol):
+    """Notified after every tool call, e.g. to keep an index in sync with the agent's writes."""
+    def observe(self, function_name: str, parameters: Dict[str, Any], result: Any) -> None:
+        raise NotImplementedError
+
+
 class FunctionExecutor:
-    def __init__(self, tool_executors: List[ToolExecutor], verbose: bool = False):
+    def __init__(
+            self,
+            tool_executors: List[ToolExecutor],
+            verbose: bool = False,
+            observers: List[ToolObserver] = (),
+    ):
         self.tool_executors = tool_executors
+        self.observers = list(observers)
         self.verbose = verbose
+        self.logger = get_verbose_logger("agent.executor") if verbose else get_logger("agent.executor")
 
     def execute(self, function_name: str, **kwargs):
         for exec in self.tool_executors:
             if exec.support(function_name):
-                if self.verbose:
-                    print(f"Trying to run {function_name}")
+                self.logger.debug("Running %s with %s", function_name, truncate(kwargs))
+                start = time.perf_counter()
                 result = exec.run(function_name, **kwargs)
-                if self.verbose:
-                    print(f"Result: {result}")
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info("tool call", extra={"fields": {
+                        "tool": function_name,
+                        "latency_ms": round(1000 * (time.perf_counter() - start), 1),
+                        "bytes": len(str(result)),
+                    }})
+                self.logger.debug("Result: %s", truncate(result))
+                for observer in self.observers:
+                    observer.observe(function_name, kwargs, result)
                 return result
-        
+
+        self.logger.warning("Unknown function %s was called", function_name)
         return f"Unknown function {function_name} was called."
\ No newline at end of file
@@ -0,0 +1,348 @@
+"""Code search over the repository the agent works on.
+
+``CodeIndex`` is an in-memory inverted index of the identifiers, paths and
+text of the repository files, plus a table of the symbols they define.
+``CodeSearchToolExecutor`` builds it from the repository interface at the
+head of the working branch, once, and keeps it up to date with the files
+the agent creates, updates and deletes, so searching never re-reads the
+whole repository.
+"""
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from genai_core.telemetry import get_logger
+
+logger = get_logger("agent.code_search")
+
+INDEXED_EXTENSIONS = {
+    ".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs", ".vue", ".svelte",
+    ".html", ".css", ".scss", ".sass", ".less",
+    ".json", ".md", ".mdx", ".txt", ".yml", ".yaml", ".toml", ".py", ".sh",
+}
+# files larger than this are usually generated, e.g. lock files and bundles
+MAX_FILE_CHARS = 200_000
+PATH_WEIGHT = 3
+# BM25 parameters
+K1, B = 1.2, 0.75
+
+IDENTIFIER = re.compile(r"[A-Za-z_$][\w$]*|\d+")
+SUBWORD = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+SYMBOL_PATTERNS = [
+    # javascript and typescript
+    (re.compile(r"\b(function\*?|class|interface|type|enum)\s+([A-Za-z_$][\w$]*)"), None),
+    (re.compile(r"\b(const|let|var)\s+([A-Za-z_$][\w$]*)\s*=\s*(?:async\s*)?(?:\(|function|[\w$]+\s*=>|class\b|React\.|styled)"), None),
+    # python
+    (re.compile(r"^\s*(?:async\s+)?(def|class)\s+(\w+)"), None),
+    # css classes and ids
+    (re.compile(r"^\s*([.#])(-?[A-Za-z_][\w-]*)[^{;]*\{"), "selector"),
+]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase identifiers, each followed by its camelCase and snake_case parts."""
+    tokens = []
+    for identifier in IDENTIFIER.findall(text):
+        tokens.append(identifier.lower())
+        parts = [part.lower() for part in SUBWORD.findall(identifier)]
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+def is_indexed(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in INDEXED_EXTENSIONS
+
+
+@dataclass(frozen=True)
+class Symbol:
+    name: str
+    kind: str
+    path: str
+    line: int
+    text: str
+
+
+class _Document:
+    def __init__(self, path: str, text: str):
+        self.path = path
+        self.lines = text.splitlines()
+        self.terms = Counter(tokenize(text))
+        for term in tokenize(path):
+            self.terms[term] += PATH_WEIGHT
+        self.length = sum(self.terms.values())
+        self.symbols = []
+        for number, line in enumerate(self.lines, start=1):
+            for pattern, kind in SYMBOL_PATTERNS:
+                for match in pattern.finditer(line):
+                    self.symbols.append(Symbol(
+                        match.group(2), kind or match.group(1), path, number, line.strip()
+                    ))
+
+
+class CodeIndex:
+    def __init__(self):
+        self._documents: Dict[str, _Document] = {}
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._symbols: Dict[str, List[Symbol]] = defaultdict(list)
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._documents
+
+    def add(self, path: str, text: str) -> None:
+        """Index a file, replacing its previous version."""
+        document = _Document(path, text)
+        with self._lock:
+            self._remove(path)
+            self._documents[path] = document
+            self._total_length += document.length
+            for term, count in document.terms.items():
+                self._postings[term][path] = count
+            for symbol in document.symbols:
+                self._symbols[symbol.name].append(symbol)
+
+    def remove(self, path: str) -> None:
+        with self._lock:
+            self._remove(path)
+
+    def _remove(self, path: str) -> None:
+        document = self._documents.pop(path, None)
+        if document is None:
+            return
+        self._total_length -= document.length
+        for term in document.terms:
+            postings = self._postings[term]
+            postings.pop(path, None)
+            if not postings:
+                del self._postings[term]
+        for symbol in document.symbols:
+            symbols = self._symbols[symbol.name]
+            symbols.remove(symbol)
+            if not symbols:
+                del self._symbols[symbol.name]
+
+    def search(self, query: str, limit: int = 10, context: int = 1) -> List[Dict[str, Any]]:
+        """
+        Files ranked by BM25 on the query terms, each with its best matching
+        lines and ``context`` lines around them, numbered from 1.
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            n_documents = len(self._documents)
+            if not terms or not n_documents:
+                return []
+            average_length = self._total_length / n_documents
+            scores: Counter = Counter()
+            for term in terms:
+                postings = self._postings.get(term, {})
+                idf = math.log(1 + (n_documents - len(postings) + 0.5) / (len(postings) + 0.5))
+                for path, count in postings.items():
+                    length = self._documents[path].length
+                    scores[path] += idf * count * (K1 + 1) / (
+                        count + K1 * (1 - B + B * length / average_length)
+                    )
+            ranked = [(path, score, self._documents[path]) for path, score in scores.most_common(limit)]
+        return [
+            {"path": path, "score": round(score, 2), "snippets": _snippets(document, terms, context)}
+            for path, score, document in ranked
+        ]
+
+    def find_symbol(self, name: str, limit: int = 20) -> List[Symbol]:
+        """Definitions named ``name``, then the case insensitive and partial matches."""
+        lowered = name.lower()
+        with self._lock:
+            exact = list(self._symbols.get(name, []))
+            others = [
+                symbol
+                for symbol_name, symbols in self._symbols.items()
+                if symbol_name != name and lowered in symbol_name.lower()
+                for symbol in symbols
+            ]
+        # case insensitive matches first, then the shortest names
+        others.sort(key=lambda s: (s.name.lower() != lowered, len(s.name), s.path, s.line))
+        return (exact + others)[:limit]
+
+
+def _snippets(document: _Document, terms: set, context: int, max_snippets: int = 3) -> List[Dict[str, Any]]:
+    scored = []
+    for number, line in enumerate(document.lines):
+        matched = terms.intersection(tokenize(line))
+        if matched:
+            scored.append((len(matched), -number))
+    snippets, covered = [], set()
+    for _, negative_number in sorted(scored, reverse=True):
+        number = -negative_number
+        if number in covered:
+            continue
+        start, end = max(0, number - context), min(len(document.lines), number + context + 1)
+        covered.update(range(start, end))
+        snippets.append({
+            "line": number + 1,
+            "text": "\n".join(
+                f"{i + 1}: {document.lines[i]}" for i in range(start, end)
+            ),
+        })
+        if len(snippets) == max_snippets:
+            break
+    return sorted(snippets, key=lambda snippet: snippet["line"])
+
+
+class CodeSearchToolExecutor:
+    function_names = ["searchCode", "findSymbol"]
+    # write functions of the repository interface and the success message they return
+    WRITES = {
+        "createFile": "Created file ",
+        "updateFile": "Updated file ",
+        "deleteFile": "Deleted file ",
+    }
+
+    def __init__(self, repository: Any, max_workers: int = 8):
+        """
+        Parameters:
+            repository: GitHubInterface or LocalGitInterface, the files are
+                listed with get_files and read with read_file
+            max_workers(int): files read at the same time to build the index
+        """
+        self.repository = repository
+        self.max_workers = max_workers
+        self.index = CodeIndex()
+        self._branch: Optional[str] = None
+        self._build_lock = threading.Lock()
+
+    def _ensure_index(self) -> None:
+        branch = self.repository.get_current_branch()
+        with self._build_lock:
+            if self._branch == branch:
+                return
+            paths = [path for path in self.repository.get_files() if is_indexed(path)]
+            logger.info("Indexing %d files of %s", len(paths), branch)
+            index = CodeIndex()
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                for path, text in zip(paths, pool.map(self._read, paths)):
+                    if text is not None:
+                        index.add(path, text)
+            self.index, self._branch = index, branch
+
+    def _read(self, path: str) -> Optional[str]:
+        text = self.repository.read_file(path)
+        if text.startswith("Unable to read file due to error") or len(text) > MAX_FILE_CHARS:
+            return None
+        return text
+
+    def observe(self, function_name: str, parameters: Dict[str, Any], result: Any) -> None:
+        """Called after every tool call, keeps the index in sync with the agent's writes."""
+        if self._branch is None:
+            # not built yet, it will read the current files
+            return
+        if function_name == "createBranch" and str(result).startswith("Successfully"):
+            # the new branch starts from the indexed one
+            self._branch = self.repository.get_current_branch()
+            return
+        prefix = self.WRITES.get(function_name)
+        if prefix is None or not str(result).startswith(prefix):
+            return
+        path = parameters["file_path"].lstrip("/")
+        if function_name == "deleteFile" or not is_indexed(path):
+            self.index.remove(path)
+        elif function_name == "createFile":
+            self.index.add(path, parameters["file_contents"])
+        else:
+            text = self._read(path)
+            if text is None:
+                self.index.remove(path)
+            else:
+                self.index.add(path, text)
+
+    def search_code(self, query: str, limit: int = 10) -> str:
+        self._ensure_index()
+        results = self.index.search(query, limit=limit)
+        if not results:
+            return f"No results for {query}"
+        return "\n\n".join(
+            f"{result['path']} (score {result['score']})\n"
+            + "\n...\n".join(snippet["text"] for snippet in result["snippets"])
+            for result in results
+        )
+
+    def find_symbol(self, name: str) -> str:
+        self._ensure_index()
+        symbols = self.index.find_symbol(name)
+        if not symbols:
+            return f"No definition of {name} found"
+        return "\n".join(
+            f"{symbol.path}:{symbol.line}: {symbol.kind} {symbol.name}: {symbol.text}"
+            for symbol in symbols
+        )
+
+    def run(self, function_name: str, **parameters: Dict[str, Any]) -> Any:
+        if function_name == "searchCode":
+            return self.search_code(**parameters)
+        elif function_name == "findSymbol":
+            return self.find_symbol(**parameters)
+        else:
+            return "Function not found"
+
+    @staticmethod
+    def support(function_name: str) -> bool:
+        return function_name in CodeSearchToolExecutor.function_names
+
+
+def get_tools() -> List[Dict[str, Any]]:
+    tools = [
+        {
+            "type": "function",
+            "function": {
+                "name": "searchCode",
+                "description": (
+                    "Search the files of the current branch by identifiers, paths and words. "
+                    "Returns the best matching files with the matching lines and their line numbers. "
+                    "Use it before reading files one by one."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "query": {
+                            "type": "string",
+                            "description": "Words or identifiers to look for, e.g. 'navbar login button'"
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "Maximum number of files returned, 10 by default"
+                        },
+                    },
+                    "required": ["query"]
+                }
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "findSymbol",
+                "description": (
+                    "Find where a function, class, component, type, variable or CSS selector "
+                    "is defined. Returns file paths and line numbers."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "name": {
+                            "type": "string",
+                            "description": "The name of the symbol, e.g. 'NavBar' or 'useAuth'"
+                        },
+                    },
+                    "required": ["name"]
+                }
+            }
+        },
+    ]
+    return tools
@@ -1,10 +1,24 @@
 from dataclasses import dataclass
 import os
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 from github import Github, GithubException
 
 
+def parse_update_contents(file_contents: str) -> Tuple[str, str]:
+    """
+    Splits the updateFile query in the old and the new contents,
+    raises an IndexError when one of the blocks is missing.
+    """
+    old_file_contents = (
+        file_contents.split("OLD <<<<")[1].split(">>>> OLD")[0].strip()
+    )
+    new_file_contents = (
+        file_contents.split("NEW <<<<")[1].split(">>>> NEW")[0].strip()
+    )
+    return old_file_contents, new_file_contents
+
+
 @dataclass
 class GitHubInterface:
     """Wrapper for GitHub API."""
@@ -207,12 +221,7 @@ class GitHubInterface:
         if kwargs:
             print(f"Warning: extra kwargs detected: {kwargs}")
         try:
-            old_file_contents = (
-                file_contents.split("OLD <<<<")[1].split(">>>> OLD")[0].strip()
-            )
-            new_file_contents = (
-                file_contents.split("NEW <<<<")[1].split(">>>> NEW")[0].strip()
-            )
+            old_file_contents, new_file_contents = parse_update_contents(file_contents)
             if not self.file_exists(file_path):
                 return f"File does not exist at {file_path}. Use create_file instead"
             
@@ -371,7 +380,7 @@ def get_tools() -> List[Dict[str, Any]]:
             "type": "function",
             "function": {
                 "name": "readFile",
-                "description": "Read a file from the github repo",
+                "description": "Read a file from the github repo. Long files are returned one page of lines at a time",
                 "parameters": {
                     "type": "object",
                     "properties": {
@@ -379,6 +388,10 @@ def get_tools() -> List[Dict[str, Any]]:
                             "type": "string", 
                             "description": "The file path"
                         },
+                        "start_line": {
+                            "type": "integer",
+                            "description": "The first line to return, 1 by default. Use it to read the next page of a long file"
+                        },
                     },
                     "required": ["file_path"]
                 }
@@ -3,7 +3,7 @@ import os
 import tempfile
 from PIL import Image
 
-import openai
+from genai_core.models import BaseGenerativeModel
 
 
 def encode_image(image_path: str) -> str:
@@ -19,17 +19,19 @@ def save_and_encode_image(image: Image.Image) -> str:
         return encode_image(image_path)
 
 
-class OpenAIVisionModel:
-    def __init__(self):
+class OpenAIVisionModel(BaseGenerativeModel):
+    def __init__(self, verbose: bool = False):
+        super().__init__(verbose=verbose)
         self.model = "gpt-4-vision-preview"
-        self.client = openai.OpenAI(
-            api_key=os.environ.get("OPENAI_API_KEY")
-        )
+
+    def run(self, message: str, image: Image.Image) -> str:
+        return self.analyse_image(message, image)
     
     def analyse_image(self, message: str, image: Image.Image) -> str:
         """Analyse an image and return the result as a string."""
         base64_image = save_and_encode_image(image)
-        response = self.client.chat.completions.create(
+        response = self._request(
+        self.client.chat.completions.create,
         model=self.model,
         messages=[
             {
@@ -0,0 +1,344 @@
+"""Local git backend of the GitHub tools.
+
+``LocalGitInterface`` exposes the same functions as ``GitHubInterface`` but
+works on a clone of the repository: files are read and written on disk,
+branches are local refs and every write is a local commit. Nothing leaves
+the machine until ``createPullRequest``, which pushes the branch once and
+opens the pull request. Any git remote works, including a local bare
+repository.
+
+A GitHub token is never written in the clone: it is sent as an HTTP header
+to the git commands talking to the remote, through the environment.
+"""
+from dataclasses import dataclass, field
+import os
+import subprocess
+from typing import Any, List, Optional
+
+from agent.tools.github_tools import GitHubInterface, parse_update_contents
+from genai_core.git import auth_env
+from genai_core.telemetry import get_logger
+
+logger = get_logger("agent.local_git")
+
+
+class GitError(RuntimeError):
+    pass
+
+
+def _git(*args: str, cwd: Optional[str] = None, token: Optional[str] = None) -> str:
+    result = subprocess.run(
+        ["git", "-c", "core.quotePath=false", *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        env=auth_env(token),
+    )
+    if result.returncode != 0:
+        raise GitError(f"git {args[0]} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+@dataclass
+class LocalGitInterface:
+    """Wrapper for a local clone of a GitHub repository."""
+
+    repository_dir: str
+    github_repository: str | None = None
+    github_branch: str | None = None
+    github_base_branch: str | None = None
+    remote: str = "origin"
+    # PyGithub repository used to open the pull request, the branch is only pushed without it
+    github_repo_instance: Any = None
+    author_name: str = "Frontend Agent"
+    author_email: str = "frontend-agent@users.noreply.github.com"
+    # sent to the remote on push, kept out of the clone
+    github_token: str | None = field(default=None, repr=False)
+
+    @classmethod
+    def from_remote(cls, remote_url: str, repository_dir: str, **kwargs) -> "LocalGitInterface":
+        """
+        Clones the remote into repository_dir, or fetches it when the clone exists
+        and moves the base branch to the one of the remote
+        Parameters:
+            remote_url(str): The url of the repository, e.g. a file:// url
+            repository_dir(str): Where the clone is kept
+        Returns:
+            LocalGitInterface: The LocalGitInterface object
+        """
+        remote = kwargs.get("remote", "origin")
+        token = kwargs.get("github_token")
+        fetched = os.path.isdir(os.path.join(repository_dir, ".git"))
+        if fetched:
+            # clones made before the token was kept out of the url are cleaned too
+            _git("remote", "set-url", remote, remote_url, cwd=repository_dir)
+            _git("fetch", "--quiet", "--prune", remote, cwd=repository_dir, token=token)
+        else:
+            logger.info("Cloning %s into %s", kwargs.get("github_repository") or remote_url, repository_dir)
+            _git("clone", "--quiet", "--origin", remote, remote_url, repository_dir, token=token)
+        interface = cls(repository_dir=repository_dir, **kwargs)
+        if fetched:
+            interface.sync_base_branch()
+        return interface
+
+    @classmethod
+    def from_github_token(
+            cls, github_token: str, repository: str, repository_dir: str, **kwargs
+    ) -> "LocalGitInterface":
+        """
+        Creates a LocalGitInterface on a clone of a GitHub repository
+        Parameters:
+            github_token(str): The GitHub token, used to push and to open the pull request
+            repository(str): The repository full name
+            repository_dir(str): Where the clone is kept
+        Returns:
+            LocalGitInterface: The LocalGitInterface object
+        """
+        from github import Github
+
+        return cls.from_remote(
+            f"https://github.com/{repository}.git",
+            repository_dir,
+            github_repository=repository,
+            github_repo_instance=Github(github_token).get_repo(repository),
+            github_token=github_token,
+            **kwargs,
+        )
+
+    def __post_init__(self):
+        self.repository_dir = os.path.abspath(self.repository_dir)
+        # default value for base branch is the default branch of the remote
+        if self.github_base_branch is None:
+            try:
+                remote_head = self._git("symbolic-ref", "--short", f"refs/remotes/{self.remote}/HEAD")
+                self.github_base_branch = remote_head.strip().split("/", 1)[1]
+            except GitError:
+                self.github_base_branch = self._git("symbolic-ref", "--short", "HEAD").strip()
+        if self.github_branch is None:
+            self.github_branch = self.github_base_branch
+        if self.github_repository is None:
+            self.github_repository = os.path.basename(self.repository_dir)
+        self._git("checkout", "--quiet", self.github_branch)
+
+    def _git(self, *args: str) -> str:
+        return _git(*args, cwd=self.repository_dir)
+
+    def sync_base_branch(self) -> None:
+        """Moves the base branch to the one of the remote as last fetched, so
+        new branches start from the latest commit."""
+        upstream = f"refs/remotes/{self.remote}/{self.github_base_branch}"
+        try:
+            self._git("rev-parse", "--verify", "--quiet", upstream)
+        except GitError:
+            # not pushed yet
+            return
+        if self.github_branch == self.github_base_branch:
+            self._git("reset", "--quiet", "--hard", upstream)
+        else:
+            self._git("branch", "--quiet", "--force", self.github_base_branch, upstream)
+
+    def _path(self, file_path: str) -> str:
+        # paths are relative to the repository root, as in the GitHub API
+        path = os.path.normpath(os.path.join(self.repository_dir, file_path.lstrip("/")))
+        relative = os.path.relpath(path, self.repository_dir)
+        if relative == "." or relative.startswith(os.pardir) or relative.split(os.sep)[0] == ".git":
+            raise ValueError(f"{file_path} is not a file of the repository")
+        return path
+
+    def _commit(self, message: str, *paths: str) -> None:
+        self._git("add", "--all", "--", *paths)
+        self._git(
+            "-c", f"user.name={self.author_name}",
+            "-c", f"user.email={self.author_email}",
+            "commit", "--quiet", "-m", message,
+        )
+
+    def get_status(self) -> dict:
+        """
+        Gets the status of the local repository, as GitHubInterface.get_status
+        Returns:
+            dict: The repository, branches, files and last commits
+        """
+        try:
+            commits = self._git("log", "-10", "--format=%h %s").splitlines()
+        except GitError as e:
+            logger.warning("Unable to read the commit history: %s", e)
+            commits = []
+        return {
+            "github_repository": self.github_repository,
+            "github_branch": self.github_branch,
+            "github_base_branch": self.github_base_branch,
+            "files": self.get_files(),
+            "commit_history": commits,
+        }
+
+    def get_files(self) -> List[str]:
+        """
+        Gets all the files committed in the current branch
+        Returns:
+            List[str]: The files in the repository
+        """
+        return [path for path in self._git("ls-files", "-z").split("\0") if path]
+
+    def create_branch(self, branch_name: str) -> str:
+        """
+        Creates a new local branch from the working branch and checks it out
+        Parameters:
+            branch_name(str): The name of the new branch
+        Returns:
+            str: A success or failure message
+        """
+        try:
+            self._git("rev-parse", "--verify", "--quiet", f"refs/heads/{branch_name}")
+            return f"Branch {branch_name} already exists"
+        except GitError:
+            pass
+        try:
+            self._git("checkout", "--quiet", "-b", branch_name)
+        except GitError as e:
+            return "Unable to create branch due to error:\n" + str(e)
+        self.github_branch = branch_name
+        return f"Successfully created branch {branch_name}"
+
+    def get_current_branch(self) -> str:
+        """
+        Gets the current branch
+        Returns:
+            str: The current branch
+        """
+        return self.github_branch
+
+    def create_pull_request(self, pr_query: str) -> str:
+        """
+        Pushes the bot's branch and makes a pull request to the base branch
+        Parameters:
+            pr_query(str): a string which contains the PR title
+            and the PR body. The title is the first line
+            in the string, and the body are the rest of the string.
+        Returns:
+            str: A success or failure message
+        """
+        if self.github_base_branch == self.github_branch:
+            return """Cannot make a pull request because
+            commits are already in the master branch"""
+        try:
+            _git(
+                "push", "--quiet", "--set-upstream", self.remote, self.github_branch,
+                cwd=self.repository_dir, token=self.github_token,
+            )
+            if self.github_repo_instance is None:
+                return f"Pushed branch {self.github_branch} to {self.remote}, no GitHub repository to open the PR on"
+            title = pr_query.split("\n")[0]
+            body = pr_query[len(title) + 2 :]
+            pr = self.github_repo_instance.create_pull(
+                title=title,
+                body=body,
+                head=self.github_branch,
+                base=self.github_base_branch,
+            )
+            return f"Successfully created PR number {pr.number}"
+        except Exception as e:
+            return "Unable to make pull request due to error:\n" + str(e)
+
+    def file_exists(self, file_path: str) -> bool:
+        try:
+            return os.path.isfile(self._path(file_path))
+        except ValueError:
+            return False
+
+    def create_file(self, file_path: str, file_contents: str) -> str:
+        """
+        Creates a new file and commits it
+        Parameters:
+            file_path (str): The path to the file to be created
+            file_contents (str): The contents of the file
+        Returns:
+            str: A success or failure message
+        """
+        try:
+            if self.file_exists(file_path):
+                return f"File already exists at {file_path}. Use update_file instead"
+            path = self._path(file_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(file_contents)
+            self._commit("Create " + file_path, path)
+            return "Created file " + file_path
+        except Exception as e:
+            logger.warning("Unable to create %s: %s", file_path, e)
+            return "Unable to make file due to error:\n" + str(e)
+
+    def read_file(self, file_path: str) -> str:
+        """
+        Reads a file from the working tree
+        Parameters:
+            file_path(str): the file path
+        Returns:
+            str: The file decoded as a string
+        """
+        try:
+            with open(self._path(file_path), encoding="utf-8") as f:
+                return f.read()
+        except Exception as e:
+            return "Unable to read file due to error:\n" + str(e)
+
+    def update_file(self, file_path: str, file_contents: str, **kwargs) -> str:
+        """
+        Updates a file with new content and commits it, the file_contents
+        are formatted as in GitHubInterface.update_file
+        Parameters:
+            file_path(str): The path to the file to be updated
+            file_contents(str): The old and the new file contents
+        Returns:
+            A success or failure message
+        """
+        if kwargs:
+            logger.warning("Extra kwargs detected: %s", kwargs)
+        try:
+            old_file_contents, new_file_contents = parse_update_contents(file_contents)
+            if not self.file_exists(file_path):
+                return f"File does not exist at {file_path}. Use create_file instead"
+
+            file_content = self.read_file(file_path)
+            updated_file_content = file_content.replace(
+                old_file_contents, new_file_contents
+            )
+            if file_content == updated_file_content:
+                return (
+                    "File content was not updated because old content was not found."
+                    "It may be helpful to use the read_file action to get "
+                    "the current file contents."
+                )
+            path = self._path(file_path)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(updated_file_content)
+            self._commit("Update " + file_path, path)
+            return "Updated file " + file_path
+        except IndexError:
+            return "Unable to update file because the file contents were not formatted correctly."
+        except Exception as e:
+            logger.warning("Unable to update %s: %s", file_path, e)
+            return "Unable to update file due to error:\n" + str(e)
+
+    def delete_file(self, file_path: str) -> str:
+        """
+        Deletes a file and commits the deletion
+        Parameters:
+            file_path(str): Where the file is
+        Returns:
+            str: Success or failure message
+        """
+        try:
+            if not self.file_exists(file_path):
+                raise FileNotFoundError(f"No file at {file_path}")
+            path = self._path(file_path)
+            os.remove(path)
+            self._commit("Delete " + file_path, path)
+            return "Deleted file " + file_path
+        except Exception as e:
+            logger.warning("Unable to delete %s: %s", file_path, e)
+            return "Unable to delete file due to error:\n" + str(e)
+
+    # same functions as the GitHub backend, so the agent tools are unchanged
+    run = GitHubInterface.run
+    support = staticmethod(GitHubInterface.support)
@@ -50,7 +50,7 @@ def get_tools() -> list:
             "type": "function",
             "function": {
                 "name": "readWebpage",
-                "description": "Read the html of the given url and return it in a string.",
+                "description": "Read the text and the links of the given url and return it in a string. Long pages are returned one page of lines at a time.",
                 "parameters": {
                     "type": "object",
                     "properties": {
@@ -58,6 +58,10 @@ def get_tools() -> list:
                             "type": "string", 
                             "description": "The url you want to read the page from"
                         },
+                        "start_line": {
+                            "type": "integer",
+                            "description": "The first line to return, 1 by default. Use it to read the next page of a long webpage"
+                        },
                     },
                     "required": ["url"]
                 }
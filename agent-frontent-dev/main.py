@@ -2,13 +2,17 @@ from functools import partial
 import gradio as gr
 from PIL import Image
 from agent.agents import FrontendAgentRunner
+from genai_core.telemetry import configure_logging
 
 def _main_loop(agent: FrontendAgentRunner, input_text: str, image: Image.Image = None):
-    assistant_messages = agent.run(input_text, image=image)
-    return "\n".join([f"{message.role}: {message.content}" for message in assistant_messages])
+    agent.run(input_text, image=image)
+    # only the new messages are fetched and rendered, the others are kept by the store
+    return agent.store.render()
 
-def main():
-    agent = FrontendAgentRunner(verbose=True)
+def main(max_queue_size: int = None):
+    # log level, sampling and format are read from the GENAI_LOG_* variables
+    configure_logging()
+    agent = FrontendAgentRunner()
     _main_loop_with_agent = partial(_main_loop, agent)
     inputs = [
         gr.Textbox(lines=2, placeholder="Enter your request here..."),
@@ -16,7 +20,17 @@ def main():
     ]
     outputs = gr.Textbox()
     interface = gr.Interface(fn=_main_loop_with_agent, inputs=inputs, outputs=outputs)
+    # the agent works on a single OpenAI thread, which accepts one run at a time
+    interface.queue(max_size=max_queue_size, default_concurrency_limit=1)
     interface.launch()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser()
+    parser.add_argument(
+        "--queue-size", type=int, default=None,
+        help="Maximum number of requests waiting in the queue, unbounded by default"
+    )
+    args = parser.parse_args()
+    main(max_queue_size=args.queue_size)
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""Benchmark of the biogen profile reduction.
+
+Runs ``reduce_profile`` on scraped profiles and reports the tokens before and
+after the reduction together with the processing time. Without arguments it
+uses synthetic profiles shaped like scraped LinkedIn payloads.
+
+Usage:
+    python -m benchmarks.biogen_preprocessing [profile.json ...] [--output results.json]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from os.path import dirname, abspath, join
+
+sys.path.append(join(dirname(dirname(abspath(__file__))), "biogen"))
+from biogen.preprocessing import reduce_profile  # noqa: E402
+
+_BOILERPLATE_HTML = (
+    "<html><head><style>.a{color:red}</style><script>window.track({});</script></head>"
+    "<body><nav><a href='/feed'>Home</a><a href='/jobs'>Jobs</a></nav>"
+    "<div class='pv-top-card'><h1>{name}</h1><div class='text-body-medium'>{headline}</div></div>"
+    "<footer>LinkedIn Corporation © 2024 <button>Follow</button></footer></body></html>"
+)
+
+
+def synthetic_profile(n_positions: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    companies = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries"]
+    titles = ["Software Engineer", "Data Scientist", "Engineering Manager", "Researcher"]
+    name = f"Person {seed}"
+    headline = f"{rng.choice(titles)} at {rng.choice(companies)}"
+    positions = []
+    for i in range(n_positions):
+        positions.append({
+            "$type": "com.linkedin.voyager.identity.profile.Position",
+            "entityUrn": f"urn:li:fsd_position:({seed},{i})",
+            "title": rng.choice(titles),
+            "companyName": rng.choice(companies),
+            "companyLogoUrl": f"https://media.licdn.com/logo/{seed}/{i}.png",
+            "description": (
+                f"<p>Led the <b>{rng.choice(['platform', 'ml', 'infra'])}</b> team.</p>"
+                "<ul><li>Shipped things</li><li>Mentored people</li></ul>"
+            ),
+            "timePeriod": {"startDate": {"year": 2010 + i, "month": 1}},
+            "trackingId": "%032x" % rng.getrandbits(128),
+        })
+    return json.dumps({
+        "html": _BOILERPLATE_HTML.replace("{name}", name).replace("{headline}", headline) * 5,
+        "profile": {
+            "firstName": name,
+            "headline": headline,
+            "summary": "<div>Passionate about <i>building</i> products.</div>",
+            "profilePicture": {"rootUrl": "https://media.licdn.com/dms/image/"},
+            "followersCount": rng.randint(100, 10000),
+        },
+        "positions": positions,
+        "education": [{"schoolName": "Politecnico", "degreeName": "MSc", "fieldOfStudy": "CS"}],
+        "recommendations": [{"entityUrn": f"urn:li:rec:{i}", "trackingId": "x" * 32} for i in range(50)],
+        "ads": [{"cta": "Try Premium", "imageUrl": "https://ads.example.com/a.png"}] * 20,
+    })
+
+
+def run(profiles):
+    results = []
+    for name, profile in profiles:
+        start = time.perf_counter()
+        reduced = reduce_profile(profile)
+        elapsed = time.perf_counter() - start
+        results.append({
+            "profile": name,
+            "bytes": len(profile.encode("utf-8")),
+            "tokens_before": reduced.tokens_before,
+            "tokens_after": reduced.tokens_after,
+            "reduction": reduced.reduction,
+            "seconds": elapsed,
+        })
+        print(
+            f"{name:>24}: {reduced.tokens_before:>7} -> {reduced.tokens_after:>6} tokens "
+            f"(-{100 * reduced.reduction:.0f}%) in {1000 * elapsed:.1f}ms"
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.biogen_preprocessing")
+    parser.add_argument("profiles", nargs="*", help="scraped profiles, synthetic ones if empty")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    if args.profiles:
+        profiles = []
+        for path in args.profiles:
+            with open(path, "r") as f:
+                profiles.append((path, f.read()))
+    else:
+        profiles = [
+            (f"synthetic-{n}-positions", synthetic_profile(n, seed=n))
+            for n in (1, 5, 20, 100)
+        ]
+    results = run(profiles)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""Load generation benchmark of the gradio handlers.
+
+Drives ``convert_audio`` (voice) and ``translate_audio`` (translate) in
+process, with their models replaced by stubs sleeping for a configurable
+latency. Requests arrive at a fixed rate into a local queue emulating the
+gradio one: bounded size, a fixed number of concurrent workers and optional
+batching. Reports the p50/p95 latency (queueing included), the throughput
+and the requests rejected because the queue was full.
+
+Usage:
+    python -m benchmarks.gradio_load --app translate --requests 200 --rate 20 \
+        --concurrency 4 --max-batch-size 4 --queue-size 64
+"""
+import argparse
+import contextlib
+import importlib
+import inspect
+import json
+import queue
+import random
+import statistics
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+SAMPLE_AUDIO = (16000, np.zeros(16000, dtype=np.int16))
+
+
+class StubModel:
+    """Stand-in for a model, sleeps for ``latency`` seconds (+-20%)."""
+
+    def __init__(self, latency: float, output: Any, n_images: int = 4):
+        self.latency = latency
+        self.output = output
+        self.n_images = n_images
+
+    def __call__(self, *args, **kwargs):
+        time.sleep(self.latency * random.uniform(0.8, 1.2))
+        return self.output
+
+    def stream(self, *args, **kwargs) -> Iterator[Any]:
+        yield self(*args, **kwargs)
+
+
+APPS = {
+    "voice": {
+        "module": "voice2image.main",
+        "handler": "convert_audio",
+        "batch_handler": None,
+        "stubs": lambda latency: {
+            "whisper_model": StubModel(latency, "a red car at sunset"),
+            "prompt_generation_model": StubModel(latency, "<begin> a red car <end>"),
+            "image_generation_model": StubModel(latency, ["image.png"] * 4),
+        },
+        "args": lambda: (SAMPLE_AUDIO,),
+    },
+    "translate": {
+        "module": "real_time_translation.main",
+        "handler": "translate_audio",
+        "batch_handler": "translate_audio_batch",
+        "stubs": lambda latency: {
+            "whisper_model": StubModel(latency, "hello world"),
+            "translation_model": StubModel(latency, "hola mundo"),
+            "voice_generation_model": StubModel(latency, "output.mp3"),
+        },
+        "args": lambda: (SAMPLE_AUDIO, "spanish"),
+    },
+}
+
+
+@contextlib.contextmanager
+def stubbed(module, stubs: Dict[str, Any]):
+    originals = {name: getattr(module, name) for name in stubs}
+    for name, stub in stubs.items():
+        setattr(module, name, stub)
+    try:
+        yield
+    finally:
+        for name, original in originals.items():
+            setattr(module, name, original)
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1]
+
+
+def drive(
+        handler: Callable,
+        batch_handler: Optional[Callable],
+        requests_args: List[Tuple],
+        rate: float,
+        concurrency: int,
+        max_queue_size: Optional[int] = None,
+        max_batch_size: int = 1,
+) -> Dict[str, float]:
+    pending: "queue.Queue[Tuple[float, Tuple]]" = queue.Queue(maxsize=max_queue_size or 0)
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    submitted_all = threading.Event()
+
+    def worker():
+        while True:
+            try:
+                batch = [pending.get(timeout=0.05)]
+            except queue.Empty:
+                if submitted_all.is_set():
+                    return
+                continue
+            while len(batch) < max_batch_size:
+                try:
+                    batch.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            args = [request_args for _, request_args in batch]
+            try:
+                if max_batch_size > 1:
+                    batch_handler(*map(list, zip(*args)))
+                else:
+                    result = handler(*args[0])
+                    if inspect.isgenerator(result):
+                        for _ in result:
+                            pass
+            except Exception:
+                with lock:
+                    errors[0] += len(batch)
+                continue
+            finished = time.perf_counter()
+            with lock:
+                latencies.extend(finished - submitted for submitted, _ in batch)
+
+    workers = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in workers:
+        thread.start()
+    rejected = 0
+    start = time.perf_counter()
+    for i, request_args in enumerate(requests_args):
+        # open loop arrivals, requests keep coming even if the app is slow
+        delay = start + i / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        try:
+            pending.put_nowait((time.perf_counter(), request_args))
+        except queue.Full:
+            rejected += 1
+    submitted_all.set()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(requests_args),
+        "completed": len(latencies),
+        "rejected": rejected,
+        "errors": errors[0],
+        "elapsed": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "latency_max": max(latencies, default=0.0),
+    }
+
+
+def run(
+        app: str,
+        n_requests: int,
+        rate: float,
+        concurrency: int,
+        max_queue_size: Optional[int],
+        max_batch_size: int,
+        model_latency: float,
+) -> Dict[str, float]:
+    config = APPS[app]
+    if max_batch_size > 1 and config["batch_handler"] is None:
+        raise ValueError(f"The {app} app has no batch handler")
+    module = importlib.import_module(config["module"])
+    handler = getattr(module, config["handler"])
+    batch_handler = getattr(module, config["batch_handler"]) if config["batch_handler"] else None
+    with stubbed(module, config["stubs"](model_latency)):
+        results = drive(
+            handler,
+            batch_handler,
+            [config["args"]() for _ in range(n_requests)],
+            rate=rate,
+            concurrency=concurrency,
+            max_queue_size=max_queue_size,
+            max_batch_size=max_batch_size,
+        )
+    results.update({
+        "app": app,
+        "rate": rate,
+        "concurrency": concurrency,
+        "max_queue_size": max_queue_size,
+        "max_batch_size": max_batch_size,
+        "model_latency": model_latency,
+    })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.gradio_load")
+    parser.add_argument("--app", choices=sorted(APPS), default="translate")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=10.0, help="requests per second")
+    parser.add_argument("--concurrency", type=int, default=1, help="concurrency limit of the handler")
+    parser.add_argument("--queue-size", type=int, default=None)
+    parser.add_argument("--max-batch-size", type=int, default=1)
+    parser.add_argument("--model-latency-ms", type=float, default=100.0, help="latency of each stub model")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(
+        args.app,
+        args.requests,
+        args.rate,
+        args.concurrency,
+        args.queue_size,
+        args.max_batch_size,
+        args.model_latency_ms / 1000,
+    )
+    print(
+        f"{results['app']}: {results['completed']}/{results['requests']} completed, "
+        f"{results['rejected']} rejected, {results['errors']} errors, "
+        f"{results['throughput_rps']:.1f} req/s, p50 {1000 * results['latency_p50']:.0f}ms, "
+        f"p95 {1000 * results['latency_p95']:.0f}ms"
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""End-to-end benchmark of the webhook review service, fully local.
+
+Runs ``code_reviewer.service`` with ``LocalGithub`` in place of GitHub and
+the fake backend of ``genai_core.fake_server`` in place of OpenAI, then
+delivers ``pull_request`` webhooks in bursts, re-sending each commit a few
+times as parallel CI jobs do. Reports the webhook outcomes, the review
+latency and throughput, and checks every commit was reviewed exactly once.
+
+Usage:
+    python -m benchmarks.review_service --prs 20 --commits 3 --redeliveries 4 --workers 4
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from os.path import dirname, abspath, join
+
+import httpx
+
+from genai_core import client
+from genai_core.fake_server import FakeServer, add_backend_arguments, backend_from_arguments
+
+sys.path.append(join(dirname(dirname(abspath(__file__))), "github-pr-reviewer"))
+from code_reviewer.github_code import GithubAPI  # noqa: E402
+from code_reviewer.jobs import ReviewJobQueue  # noqa: E402
+from code_reviewer.local_github import LocalGithub  # noqa: E402
+from code_reviewer.service import ReviewServer, ReviewService  # noqa: E402
+
+REPOSITORY = "octo/playground"
+PATCH = (
+    "@@ -1,3 +1,5 @@\n"
+    " def mean(values):\n"
+    "-    return sum(values) / len(values)\n"
+    "+    total = 0\n"
+    "+    for value in values:\n"
+    "+        total += value\n"
+    "+    return total / len(values)\n"
+)
+
+
+def webhook(pr_number: int, head_sha: str) -> bytes:
+    return json.dumps({
+        "action": "synchronize",
+        "repository": {"full_name": REPOSITORY},
+        "pull_request": {"number": pr_number, "head": {"sha": head_sha}},
+    }).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.review_service")
+    parser.add_argument("--prs", type=int, default=20)
+    parser.add_argument("--commits", type=int, default=3, help="commits pushed to each PR")
+    parser.add_argument("--files", type=int, default=3, help="files changed by each PR")
+    parser.add_argument("--redeliveries", type=int, default=4, help="deliveries of each webhook")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    add_backend_arguments(parser)
+    args = parser.parse_args()
+
+    github = LocalGithub()
+    with FakeServer(backend_from_arguments(args)) as backend:
+        client.configure(base_url=backend.url)
+        queue = ReviewJobQueue(join(tempfile.mkdtemp(prefix="reviews-"), "jobs.sqlite"))
+        service = ReviewService(
+            queue,
+            lambda: GithubAPI(None, github=github).write_comments_for_pr,
+            workers=args.workers,
+        )
+        server = ReviewServer(service)
+        with ThreadPoolExecutor(max_workers=1) as http_thread:
+            http_thread.submit(server.serve_forever)
+            service.start()
+            start = time.perf_counter()
+            with httpx.Client(base_url=server.url) as http, ThreadPoolExecutor(max_workers=16) as ci:
+                for commit in range(args.commits):
+                    # every PR gets a new commit, then CI re-sends its webhook in parallel
+                    deliveries = []
+                    for pr_number in range(1, args.prs + 1):
+                        head_sha = f"{pr_number:04d}{commit:036d}"
+                        github.add_pull(REPOSITORY, pr_number, head_sha, [
+                            (f"module_{i}.py", PATCH) for i in range(args.files)
+                        ])
+                        deliveries.extend([webhook(pr_number, head_sha)] * args.redeliveries)
+                    list(ci.map(
+                        lambda body: http.post(
+                            "/webhook", content=body, headers={"X-GitHub-Event": "pull_request"}
+                        ).raise_for_status(),
+                        deliveries,
+                    ))
+                    time.sleep(0.1)
+                while True:
+                    metrics = http.get("/metrics").json()
+                    if metrics["jobs"]["queue_depth"] == 0 and metrics["jobs"]["running"] == 0:
+                        break
+                    time.sleep(0.1)
+            elapsed = time.perf_counter() - start
+            service.stop()
+            server.shutdown()
+        queue.close()
+
+    reviewed = {
+        (pr_number, comment["commit_id"])
+        for pr_number in range(1, args.prs + 1)
+        for comment in github.comments(REPOSITORY, pr_number)
+    }
+    comments_per_commit = {
+        key: sum(
+            1 for comment in github.comments(REPOSITORY, key[0]) if comment["commit_id"] == key[1]
+        )
+        for key in reviewed
+    }
+    jobs = metrics["jobs"]
+    results = {
+        "elapsed": elapsed,
+        "webhooks": metrics["webhooks"],
+        "jobs": jobs,
+        "reviews_per_minute": 60 * jobs["done"] / elapsed,
+        "commits_reviewed": len(reviewed),
+        "reviewed_more_than_once": sum(
+            1 for count in comments_per_commit.values() if count > args.files
+        ),
+    }
+    print(
+        f"{sum(metrics['webhooks'].values())} webhooks: {metrics['webhooks']}\n"
+        f"{jobs['done']} reviews, {jobs['superseded']} superseded, {jobs['failed']} failed "
+        f"in {elapsed:.1f}s ({results['reviews_per_minute']:.0f}/min), "
+        f"latency p50 {jobs['latency_p50']:.2f}s p95 {jobs['latency_p95']:.2f}s\n"
+        f"{results['reviewed_more_than_once']} commits reviewed more than once"
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if results["reviewed_more_than_once"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Real-time factor and latency of the speech recognition backends.
+
+Transcribes the same clips with ``WhisperModel`` on the API and on each
+on-device backend of ``genai_core.speech``, one clip at a time and then as a
+batch. The real-time factor (RTF) is the processing time divided by the
+audio duration, below 1 is faster than real time.
+
+The API is the local fake backend of ``genai_core.fake_server`` by default,
+its latency set with ``--latency-ms``; pass ``--live-api`` to call OpenAI.
+Synthetic clips are used unless WAV files are given with ``--audio``.
+
+Usage:
+    python -m benchmarks.speech --backends api faster-whisper --durations 2 5 10 \
+        --model-size base --workers 2 --output speech.json
+"""
+import argparse
+import json
+import statistics
+import time
+from contextlib import ExitStack
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from genai_core import client
+from genai_core.audio import WHISPER_SAMPLE_RATE, load_samples
+from genai_core.fake_server import FakeServer, add_backend_arguments, backend_from_arguments
+from genai_core.models import WhisperModel
+from genai_core.speech import BACKENDS
+
+Clip = Tuple[int, np.ndarray]
+
+
+def synthetic_clip(duration: float, seed: int) -> Clip:
+    """Amplitude modulated noise, about the spectrum and loudness of speech."""
+    rng = np.random.default_rng(seed)
+    times = np.arange(int(duration * WHISPER_SAMPLE_RATE)) / WHISPER_SAMPLE_RATE
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * times)
+    samples = rng.normal(0, 0.1, len(times)) * envelope
+    return WHISPER_SAMPLE_RATE, (samples * 32767).astype(np.int16)
+
+
+def load_clips(args: argparse.Namespace) -> List[Clip]:
+    if args.audio:
+        return [(WHISPER_SAMPLE_RATE, load_samples(path)) for path in args.audio]
+    return [synthetic_clip(duration, seed) for seed, duration in enumerate(args.durations)]
+
+
+def duration(clip: Clip) -> float:
+    sample_rate, samples = clip
+    return len(samples) / sample_rate
+
+
+def measure(model: WhisperModel, clips: List[Clip], repeats: int) -> Dict[str, float]:
+    latencies, rtfs = [], []
+    for _ in range(repeats):
+        for clip in clips:
+            start = time.perf_counter()
+            model(clip)
+            latency = time.perf_counter() - start
+            latencies.append(latency)
+            rtfs.append(latency / duration(clip))
+    audio_seconds = sum(duration(clip) for clip in clips)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        model.run_batch(clips)
+    batch_elapsed = (time.perf_counter() - start) / repeats
+    return {
+        "latency_p50": statistics.median(latencies),
+        "latency_max": max(latencies),
+        "rtf_p50": statistics.median(rtfs),
+        "rtf_max": max(rtfs),
+        "batch_seconds": batch_elapsed,
+        "batch_rtf": batch_elapsed / audio_seconds,
+        "batch_clips_per_second": len(clips) / batch_elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.speech")
+    parser.add_argument("--backends", nargs="+", choices=["api", *sorted(BACKENDS)], default=["api", *sorted(BACKENDS)])
+    parser.add_argument("--audio", nargs="+", help="WAV files to transcribe instead of synthetic clips")
+    parser.add_argument("--durations", nargs="+", type=float, default=[2.0, 5.0, 10.0], help="seconds of the synthetic clips")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--model-size", default="base", help="on-device model, e.g. tiny, base, small")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--workers", type=int, default=None, help="on-device workers, one per two cores by default")
+    parser.add_argument("--live-api", action="store_true", help="call the OpenAI API instead of the fake backend")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    add_backend_arguments(parser)
+    args = parser.parse_args()
+
+    clips = load_clips(args)
+    results = {"clips": [duration(clip) for clip in clips], "backends": {}}
+    with ExitStack() as stack:
+        if "api" in args.backends and not args.live_api:
+            server = stack.enter_context(FakeServer(backend_from_arguments(args)))
+            client.configure(base_url=server.url)
+        for name in args.backends:
+            if name == "api":
+                model = WhisperModel("whisper-1", target_sample_rate=WHISPER_SAMPLE_RATE, backend="api")
+                load_seconds = 0.0
+            else:
+                options = {"model_size": args.model_size, "compute_type": args.compute_type, "workers": args.workers}
+                model = WhisperModel("whisper-1", backend=name, backend_options=options)
+                start = time.perf_counter()
+                try:
+                    model.backend.load()
+                except ImportError as e:
+                    print(f"{name:<15} skipped: {e}")
+                    results["backends"][name] = {"skipped": str(e)}
+                    continue
+                load_seconds = time.perf_counter() - start
+                # the first transcription warms up the caches of the engine
+                model(clips[0])
+            result = {"load_seconds": load_seconds, **measure(model, clips, args.repeats)}
+            results["backends"][name] = result
+            print(
+                f"{name:<15} latency p50 {1000 * result['latency_p50']:7.0f}ms, "
+                f"RTF p50 {result['rtf_p50']:.3f} max {result['rtf_max']:.3f}, "
+                f"batch RTF {result['batch_rtf']:.3f} ({result['batch_clips_per_second']:.2f} clips/s), "
+                f"loaded in {load_seconds:.1f}s"
+            )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
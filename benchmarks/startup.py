@@ -0,0 +1,102 @@
+"""Startup benchmark of the ``src`` launcher.
+
+Imports the launcher in a fresh interpreter with ``-X importtime``, reports
+the slowest imports and checks the total against a budget. It also fails
+if a heavy dependency, which should only be imported once a mode is
+selected, is imported at startup.
+
+Usage:
+    python -m benchmarks.startup [--budget-ms 500] [--runs 5] [--output results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from os.path import dirname, abspath
+from typing import Dict, List, Tuple
+
+ROOT = dirname(dirname(abspath(__file__)))
+LAUNCHER_IMPORT = (
+    "import sys; "
+    f"sys.path[:0] = [{os.path.join(ROOT, 'src')!r}, {ROOT!r}]; "
+    "import renderer"
+)
+# these must only be imported once a mode is selected
+LAZY_MODULES = ("gradio", "openai", "google.cloud.texttospeech", "numpy")
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Parse the ``-X importtime`` output into (module, self_us, cumulative_us)."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        # the first space is a separator, nested imports are indented by two more
+        imports.append((module.rstrip()[1:], int(self_us), int(cumulative_us)))
+    return imports
+
+
+def measure_once() -> Tuple[float, List[Tuple[str, int, int]]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", LAUNCHER_IMPORT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imports = parse_importtime(result.stderr)
+    # top level imports are not indented, their cumulative time adds up to the total
+    total_us = sum(cumulative for module, _, cumulative in imports if not module.startswith("  "))
+    return total_us / 1000, imports
+
+
+def run(runs: int) -> Dict:
+    totals = []
+    imports = []
+    for _ in range(runs):
+        total_ms, imports = measure_once()
+        totals.append(total_ms)
+    imported = {module.strip() for module, _, _ in imports}
+    slowest = sorted(imports, key=lambda x: x[2], reverse=True)[:15]
+    return {
+        "runs": runs,
+        "import_ms_median": statistics.median(totals),
+        "import_ms_min": min(totals),
+        "lazy_modules_imported": [m for m in LAZY_MODULES if m in imported],
+        "slowest_imports": [
+            {"module": module.strip(), "self_us": self_us, "cumulative_us": cumulative}
+            for module, self_us, cumulative in slowest
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument("--budget-ms", type=float, default=500.0)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.runs)
+    results["budget_ms"] = args.budget_ms
+    print(f"Launcher import time: {results['import_ms_median']:.1f}ms (median of {args.runs})")
+    for entry in results["slowest_imports"]:
+        print(f"  {entry['cumulative_us'] / 1000:>8.1f}ms  {entry['module']}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failed = False
+    if results["lazy_modules_imported"]:
+        print(f"FAIL: imported at startup: {', '.join(results['lazy_modules_imported'])}")
+        failed = True
+    if results["import_ms_median"] > args.budget_ms:
+        print(f"FAIL: import time above the {args.budget_ms:.0f}ms budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""Benchmark suite of the hot paths of every app.
+
+Each case runs a hot path with its network calls stubbed out and reports
+the wall time per operation, the throughput and the memory allocated while
+running it (traced with ``tracemalloc`` in a separate pass, so it does not
+slow down the timings). Cases whose dependencies are not installed are
+reported as skipped.
+
+Save the results with ``--output`` and compare a later run against them with
+``--compare``, which fails when a case got slower than the tolerance.
+
+Usage:
+    python -m benchmarks.suite [--cases reviewer_parse ...] [--output results.json]
+    python -m benchmarks.suite --compare results.json --tolerance 0.2
+"""
+import argparse
+import importlib
+import inspect
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from os.path import dirname, abspath, join
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+ROOT = dirname(dirname(abspath(__file__)))
+# the models build their OpenAI client before calling the stubbed request
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+SAMPLE_RATE = 44100
+# 5 seconds of stereo microphone input, as gradio hands it to the handlers
+SAMPLE_AUDIO = (
+    SAMPLE_RATE,
+    (np.random.default_rng(0).normal(0, 0.1, (5 * SAMPLE_RATE, 2)) * 32767).astype(np.int16),
+)
+
+
+def _chat_response(content: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(prompt_tokens=100, completion_tokens=20),
+    )
+
+
+def _python_file(n_functions: int) -> str:
+    return "\n\n".join(
+        f"def function_{i}(values, name='value {i}'):\n"
+        f"    total = 0\n"
+        f"    for value in values:\n"
+        f"        total += value * {i}  # \"quoted\" comment\n"
+        f"    return total / len(values)\n"
+        for i in range(n_functions)
+    )
+
+
+def reviewer_parse() -> Callable[[], object]:
+    """Parse 20 review comments on a 200-function file, a quarter of them on a previous file."""
+    sys.path.append(join(ROOT, "github-pr-reviewer"))
+    from code_reviewer.reviewer import CodeReviewer
+
+    code = _python_file(200)
+    previous = _python_file(100)
+    user_message = {
+        "role": "user",
+        "content": f"<start_file_name> stats.py <end_file_name>\n<start_code> {code} <end_code>",
+    }
+    old_messages = [
+        {
+            "role": "user",
+            "content": f"<start_file_name> utils.py <end_file_name>\n<start_code> {previous} <end_code>",
+        },
+        user_message,
+    ]
+    response = "\n".join(
+        f"<start_file_name> {'utils.py' if i % 4 == 0 else 'stats.py'} <end_file_name>\n"
+        f"<start_code_snippet> total += value * {i * 5} <end_code_snippet>\n"
+        f"<start_comment> Use sum() instead of an explicit loop. <end_comment>"
+        for i in range(20)
+    )
+
+    def operation():
+        return CodeReviewer._process_model_message(response, user_message, iter(old_messages))
+
+    return operation
+
+
+class _StubRepository:
+    def __init__(self, files: Dict[str, str]):
+        self.files = files
+
+    def get_contents(self, path: str):
+        if path not in self.files:
+            raise FileNotFoundError(path)
+        return SimpleNamespace(
+            path=path, type="file", sha="0" * 40, decoded_content=self.files[path].encode("utf-8")
+        )
+
+    def update_file(self, path: str, message: str, content: str, branch: str, sha: str):
+        self.files[path] = content
+
+
+def github_update_file() -> Callable[[], object]:
+    """Patch a function in a 2000-line file through ``GitHubInterface.update_file``."""
+    sys.path.append(join(ROOT, "agent-frontent-dev"))
+    from agent.tools.github_tools import GitHubInterface
+
+    original = _python_file(400)
+    repository = _StubRepository({"src/stats.py": original})
+    interface = GitHubInterface(
+        github=SimpleNamespace(get_repo=lambda name: repository),
+        github_repository="owner/repo",
+    )
+    patch = (
+        "src/stats.py\n"
+        "OLD <<<<\n        total += value * 399  # \"quoted\" comment\n>>>> OLD\n"
+        "NEW <<<<\n        total += value * 400\n>>>> NEW"
+    )
+
+    def operation():
+        repository.files["src/stats.py"] = original
+        return interface.update_file("src/stats.py", patch)
+
+    return operation
+
+
+def prompt_extraction() -> Callable[[], object]:
+    """``PromptGenerationModel.run`` with the chat completion stubbed out."""
+    from voice2image.voice2image.models import PromptGenerationModel
+
+    model = PromptGenerationModel()
+    response = _chat_response(
+        "Sure! Here is a better prompt for DALLE2:\n"
+        "<begin> a watercolor painting of a lighthouse on a cliff at sunset, "
+        "warm light, crashing waves, highly detailed <end>\n"
+        "Let me know if you want another one."
+    )
+    model._request = lambda *args, **kwargs: response
+
+    def operation():
+        return model("a lighthouse at sunset")
+
+    return operation
+
+
+def _stub_whisper_model():
+    from genai_core.audio import WHISPER_SAMPLE_RATE
+    from genai_core.models import WhisperModel
+
+    model = WhisperModel("whisper-1", target_sample_rate=WHISPER_SAMPLE_RATE)
+    transcript = SimpleNamespace(text="hello world")
+
+    def request(function, upload, **kwargs):
+        # read the upload as the HTTP client would
+        upload[1].read()
+        return transcript
+
+    model._request = request
+    return model
+
+
+def whisper_upload() -> Callable[[], object]:
+    """Audio handoff of ``WhisperModel.run``: mono, resampling and WAV encoding of the upload."""
+    model = _stub_whisper_model()
+
+    def operation():
+        return model(SAMPLE_AUDIO)
+
+    return operation
+
+
+def _handler(app: str) -> Callable[[], object]:
+    from benchmarks.gradio_load import APPS, stubbed
+
+    config = APPS[app]
+    module = importlib.import_module(config["module"])
+    handler = getattr(module, config["handler"])
+    # the other models answer at once, only the handler code and the audio handoff count
+    stubs = config["stubs"](0.0)
+    stubs["whisper_model"] = _stub_whisper_model()
+    args = (SAMPLE_AUDIO,) + config["args"]()[1:]
+
+    def operation():
+        with stubbed(module, stubs):
+            result = handler(*args)
+            if inspect.isgenerator(result):
+                result = list(result)
+            return result
+
+    return operation
+
+
+def translate_audio() -> Callable[[], object]:
+    """``translate_audio`` handler with stubbed models, audio handoff included."""
+    return _handler("translate")
+
+
+def convert_audio() -> Callable[[], object]:
+    """``convert_audio`` handler with stubbed models, audio handoff included."""
+    return _handler("voice")
+
+
+def model_chain() -> Callable[[], object]:
+    """``ModelChain._call`` orchestration with instantaneous stub LLMs."""
+    sys.path.append(join(ROOT, "biogen"))
+    from langchain import LLMChain
+    from langchain.llms.base import LLM
+    from biogen.chain import ModelChain
+    from biogen.templates import READ_JSON_TEMPLATE, READ_CURRICULUM_TEMPLATE, \
+        GENERATE_BIO_TEMPLATE
+
+    class StubLLM(LLM):
+        @property
+        def _llm_type(self) -> str:
+            return "stub"
+
+        def _call(self, prompt, stop=None, run_manager=None, **kwargs) -> str:
+            return "Ada Lovelace is a mathematician who wrote the first published algorithm."
+
+    llm = StubLLM()
+    chain = ModelChain(
+        json_reader=LLMChain(llm=llm, prompt=READ_JSON_TEMPLATE),
+        curriculum_reader=LLMChain(llm=llm, prompt=READ_CURRICULUM_TEMPLATE),
+        llm_core=LLMChain(llm=llm, prompt=GENERATE_BIO_TEMPLATE),
+    )
+    inputs = {
+        "website": json.dumps({"name": "Ada Lovelace", "headline": "Analyst"}),
+        "curriculum": "Mathematician, wrote the first published algorithm.",
+    }
+
+    def operation():
+        return chain._call(inputs)
+
+    return operation
+
+
+CASES: Dict[str, Callable[[], Callable[[], object]]] = {
+    "reviewer_parse": reviewer_parse,
+    "github_update_file": github_update_file,
+    "prompt_extraction": prompt_extraction,
+    "whisper_upload": whisper_upload,
+    "translate_audio": translate_audio,
+    "convert_audio": convert_audio,
+    "model_chain": model_chain,
+}
+
+
+def measure(operation: Callable[[], object], min_time: float, min_iterations: int) -> Dict[str, float]:
+    operation()  # warm up
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < min_iterations or time.perf_counter() - start < min_time:
+        op_start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - op_start)
+    elapsed = time.perf_counter() - start
+
+    # allocations in a separate pass, tracing slows down every allocation
+    n_traced = min(len(timings), 20)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    for _ in range(n_traced):
+        operation()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    differences = after.compare_to(before, "filename")
+    allocated = sum(diff.size_diff for diff in differences if diff.size_diff > 0)
+    blocks = sum(diff.count_diff for diff in differences if diff.count_diff > 0)
+    return {
+        "iterations": len(timings),
+        "wall_us_median": 1e6 * statistics.median(timings),
+        "wall_us_p95": 1e6 * (
+            statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+        ),
+        "throughput_ops": len(timings) / elapsed,
+        "peak_kb": peak / 1024,
+        "retained_kb_per_op": allocated / n_traced / 1024,
+        "retained_blocks_per_op": blocks / n_traced,
+    }
+
+
+def run(cases: List[str], min_time: float, min_iterations: int) -> Dict[str, Dict]:
+    results = {}
+    for name in cases:
+        try:
+            result = measure(CASES[name](), min_time, min_iterations)
+        except ImportError as e:
+            results[name] = {"skipped": f"{type(e).__name__}: {e}"}
+            print(f"{name:<20} skipped ({e})")
+            continue
+        except Exception as e:
+            # a broken case is reported, the other cases still run
+            results[name] = {"failed": f"{type(e).__name__}: {e}"}
+            print(f"{name:<20} failed ({type(e).__name__}: {e})")
+            continue
+        results[name] = result
+        print(
+            f"{name:<20} {result['wall_us_median']:>10.1f}us median, "
+            f"{result['wall_us_p95']:>10.1f}us p95, {result['throughput_ops']:>9.0f} ops/s, "
+            f"peak {result['peak_kb']:>8.1f}KB"
+        )
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name, {})
+        if "wall_us_median" not in result or "wall_us_median" not in reference:
+            continue
+        ratio = result["wall_us_median"] / reference["wall_us_median"]
+        print(f"{name:<20} {ratio:>6.2f}x the baseline")
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds spent on each case")
+    parser.add_argument("--min-iterations", type=int, default=10)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="accepted slowdown, 0.2 is 20%%")
+    args = parser.parse_args()
+
+    results = run(args.cases, args.min_time, args.min_iterations)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {"python": platform.python_version(), "machine": platform.machine(), "cases": results},
+                f,
+                indent=2,
+            )
+    failures = [name for name, result in results.items() if "failed" in result]
+    if failures:
+        print(f"FAIL: errors in {', '.join(failures)}")
+    regressions: Optional[List[str]] = None
+    if args.compare:
+        with open(args.compare, "r") as f:
+            regressions = compare(results, json.load(f)["cases"], args.tolerance)
+        if regressions:
+            print(f"FAIL: slower than the baseline: {', '.join(regressions)}")
+    sys.exit(1 if failures or regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
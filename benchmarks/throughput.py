@@ -0,0 +1,231 @@
+"""Offline throughput benchmark of the apps.
+
+Starts the local fake backend of ``genai_core.fake_server`` in process,
+points every model to it and runs the model pipeline of each app with an
+increasing number of concurrent clients. The throughput ceiling is the best
+throughput reached; past it more clients only add latency.
+
+Apps:
+    voice      whisper, prompt generation and 4 parallel image generations
+    translate  whisper, translation and text-to-speech
+    translate_fanout  one whisper transcription, translated and voiced in
+               every supported language concurrently
+    reviewer   code review of a single file
+    biogen     the three stages of the bio generation chain
+
+Usage:
+    python -m benchmarks.throughput --apps voice translate --clients 1 4 16 \
+        --requests 64 --latency-ms 300 --error-rate 0.01 --output results.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from os.path import dirname, abspath, join
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from genai_core import client
+from genai_core.fake_server import FakeServer, add_backend_arguments, backend_from_arguments
+from genai_core.metrics import metrics_snapshot
+
+ROOT = dirname(dirname(abspath(__file__)))
+SAMPLE_AUDIO = (16000, (np.random.default_rng(0).normal(0, 0.1, 16000) * 32767).astype(np.int16))
+SAMPLE_CODE = (
+    "def mean(values):\n"
+    "    total = 0\n"
+    "    for value in values:\n"
+    "        total += value\n"
+    "    return total / len(values)\n"
+)
+
+
+def voice_pipeline() -> Callable[[], object]:
+    from voice2image.voice2image.models import (
+        WhisperModel, PromptGenerationModel, ImageGenerationModel
+    )
+    whisper_model = WhisperModel("whisper-1", target_sample_rate=16000)
+    # no prompt cache, every request must reach the backend. The images are
+    # downloaded as in the app, the fake prompts are random so they never hit
+    prompt_generation_model = PromptGenerationModel()
+    image_generation_model = ImageGenerationModel(
+        n_images=4, parallel=True, cache_dir=tempfile.mkdtemp(prefix="throughput-")
+    )
+
+    def request():
+        transcript = whisper_model(SAMPLE_AUDIO)
+        return image_generation_model(prompt_generation_model(transcript))
+
+    return request
+
+
+def translate_pipeline() -> Callable[[], object]:
+    from real_time_translation.ai_translate.models import (
+        WhisperModel, TranslationModel, TextToVoice
+    )
+    whisper_model = WhisperModel("whisper-1", target_sample_rate=16000)
+    translation_model = TranslationModel()
+    voice_generation_model = TextToVoice()
+
+    def request():
+        transcript = whisper_model(SAMPLE_AUDIO)
+        return voice_generation_model(translation_model(transcript, "spanish"), "spanish")
+
+    return request
+
+
+def translate_fanout_pipeline() -> Callable[[], object]:
+    from real_time_translation.ai_translate.models import (
+        WhisperModel, TranslationModel, TextToVoice
+    )
+    whisper_model = WhisperModel("whisper-1", target_sample_rate=16000)
+    translation_model = TranslationModel()
+    voice_generation_model = TextToVoice()
+    languages = list(TextToVoice.LANGUAGE_CODES)
+
+    def voice_translation(transcript, language):
+        return voice_generation_model(translation_model(transcript, language), language)
+
+    def request():
+        # same fan-out as real_time_translation.main.translate_audio_multi
+        transcript = whisper_model(SAMPLE_AUDIO)
+        with ThreadPoolExecutor(max_workers=len(languages)) as executor:
+            return list(executor.map(lambda language: voice_translation(transcript, language), languages))
+
+    return request
+
+
+def reviewer_pipeline() -> Callable[[], object]:
+    sys.path.append(join(ROOT, "github-pr-reviewer"))
+    from code_reviewer.reviewer import CodeReviewer
+
+    def request():
+        # the reviewer keeps the conversation, each request reviews a new PR
+        return CodeReviewer()("stats.py", SAMPLE_CODE)
+
+    return request
+
+
+def biogen_pipeline() -> Callable[[], object]:
+    sys.path.append(join(ROOT, "biogen"))
+    from biogen.model import APIModel
+    model = APIModel()
+    website_json = json.dumps({"name": "Ada Lovelace", "headline": "Analyst at the Analytical Engine"})
+
+    def request():
+        return model(website_json, "Mathematician, wrote the first published algorithm.")
+
+    return request
+
+
+PIPELINES: Dict[str, Callable[[], Callable[[], object]]] = {
+    "voice": voice_pipeline,
+    "translate": translate_pipeline,
+    "translate_fanout": translate_fanout_pipeline,
+    "reviewer": reviewer_pipeline,
+    "biogen": biogen_pipeline,
+}
+
+
+def measure(request: Callable[[], object], n_clients: int, n_requests: int) -> Dict[str, float]:
+    """Closed loop: ``n_clients`` threads send ``n_requests`` requests in total."""
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    remaining = iter(range(n_requests))
+
+    def worker():
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            start = time.perf_counter()
+            try:
+                request()
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker) for _ in range(n_clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "clients": n_clients,
+        "completed": len(latencies),
+        "errors": errors[0],
+        "elapsed": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "latency_p50": statistics.median(latencies) if latencies else 0.0,
+        "latency_p95": (
+            statistics.quantiles(latencies, n=20)[-1]
+            if len(latencies) > 1 else max(latencies, default=0.0)
+        ),
+    }
+
+
+def run(apps: List[str], clients: List[int], n_requests: int) -> Dict[str, Dict]:
+    results = {}
+    for app in apps:
+        request = PIPELINES[app]()
+        # warm up the connections and the lazy imports
+        request()
+        levels = [measure(request, n_clients, n_requests) for n_clients in clients]
+        best = max(levels, key=lambda level: level["throughput_rps"])
+        results[app] = {
+            "levels": levels,
+            "ceiling_rps": best["throughput_rps"],
+            "ceiling_clients": best["clients"],
+        }
+        for level in levels:
+            print(
+                f"{app:<10} {level['clients']:>4} clients: {level['throughput_rps']:7.2f} req/s, "
+                f"p50 {1000 * level['latency_p50']:6.0f}ms, p95 {1000 * level['latency_p95']:6.0f}ms, "
+                f"{level['errors']} errors"
+            )
+        print(f"{app:<10} ceiling {best['throughput_rps']:.2f} req/s with {best['clients']} clients")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.throughput")
+    parser.add_argument("--apps", nargs="+", choices=sorted(PIPELINES), default=["voice", "translate"])
+    parser.add_argument("--clients", nargs="+", type=int, default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--requests", type=int, default=64, help="requests for each number of clients")
+    parser.add_argument("--max-in-flight", type=int, default=64, help="limit of in-flight API requests")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    add_backend_arguments(parser)
+    args = parser.parse_args()
+
+    with FakeServer(backend_from_arguments(args)) as server:
+        client.configure(
+            base_url=server.url,
+            max_concurrency=args.max_in_flight,
+            max_connections=args.max_in_flight,
+            max_keepalive_connections=args.max_in_flight,
+        )
+        results = run(args.apps, sorted(args.clients), args.requests)
+        results = {
+            "apps": results,
+            "backend": vars(args),
+            "server": server.backend.stats(),
+            "models": metrics_snapshot(),
+        }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
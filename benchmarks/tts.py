@@ -0,0 +1,125 @@
+"""Latency and throughput of the text-to-speech backends of ``TextToVoice``.
+
+Synthesizes the same sentences with Google Cloud TTS and with each on-device
+engine of ``real_time_translation.ai_translate.local_tts``: the latency of a
+whole utterance, the time to the first streamed audio chunk (on-device only)
+and the throughput with an increasing number of concurrent clients.
+
+Google is the local fake backend of ``genai_core.fake_server`` by default,
+its latency set with ``--latency-ms``; pass ``--live-api`` to call Google.
+
+Usage:
+    python -m benchmarks.tts --backends google piper --language english \
+        --clients 1 4 8 --requests 32 --voices-dir voices --output tts.json
+"""
+import argparse
+import json
+import statistics
+import time
+from contextlib import ExitStack
+from typing import Dict, List
+
+from genai_core import client
+from genai_core.fake_server import FakeServer, add_backend_arguments, backend_from_arguments
+from benchmarks.throughput import measure
+
+TEXT = (
+    "The meeting has been moved to Thursday afternoon. "
+    "Please bring the quarterly report and the updated budget. "
+    "We will discuss the hiring plan for the next six months."
+)
+
+
+def first_chunk_latency(model, language: str, repeats: int) -> List[float]:
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        chunks = model.stream(TEXT, language)
+        next(chunks)
+        # the first chunk is the header, the first sentence follows
+        next(chunks)
+        latencies.append(time.perf_counter() - start)
+        for _ in chunks:
+            pass
+    return latencies
+
+
+def main():
+    from real_time_translation.ai_translate.local_tts import ENGINES
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.tts")
+    parser.add_argument("--backends", nargs="+", choices=["google", *sorted(ENGINES)], default=["google", *sorted(ENGINES)])
+    parser.add_argument("--language", default="english")
+    parser.add_argument("--repeats", type=int, default=5, help="utterances timed one at a time")
+    parser.add_argument("--clients", nargs="+", type=int, default=[1, 4, 8])
+    parser.add_argument("--requests", type=int, default=32, help="utterances for each number of clients")
+    parser.add_argument("--workers", type=int, default=None, help="on-device processes, one per core by default")
+    parser.add_argument("--voices-dir", default=None, help="directory of the on-device voices")
+    parser.add_argument("--live-api", action="store_true", help="call Google instead of the fake backend")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    add_backend_arguments(parser)
+    args = parser.parse_args()
+
+    results: Dict[str, Dict] = {}
+    with ExitStack() as stack:
+        if "google" in args.backends and not args.live_api:
+            server = stack.enter_context(FakeServer(backend_from_arguments(args)))
+            client.configure(base_url=server.url)
+        for name in args.backends:
+            try:
+                from real_time_translation.ai_translate.models import TextToVoice
+                if name == "google":
+                    model = TextToVoice(backend="google")
+                    load_seconds = 0.0
+                else:
+                    model = TextToVoice(backend=name, backend_options={
+                        "workers": args.workers, "voices_dir": args.voices_dir,
+                    })
+                    start = time.perf_counter()
+                    model.backend.load()
+                    load_seconds = time.perf_counter() - start
+            except Exception as e:
+                # a missing engine package raises in the worker processes, not only ImportError
+                print(f"{name:<8} skipped: {type(e).__name__}: {e}")
+                results[name] = {"skipped": f"{type(e).__name__}: {e}"}
+                continue
+
+            latencies = []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                model(TEXT, args.language)
+                latencies.append(time.perf_counter() - start)
+            result = {
+                "load_seconds": load_seconds,
+                "latency_p50": statistics.median(latencies),
+                "latency_max": max(latencies),
+            }
+            if model.backend is not None:
+                result["first_chunk_p50"] = statistics.median(
+                    first_chunk_latency(model, args.language, args.repeats)
+                )
+            result["levels"] = [
+                measure(lambda: model(TEXT, args.language), n_clients, args.requests)
+                for n_clients in sorted(args.clients)
+            ]
+            results[name] = result
+            first_chunk = result.get("first_chunk_p50")
+            print(
+                f"{name:<8} latency p50 {1000 * result['latency_p50']:6.0f}ms"
+                + (f", first chunk p50 {1000 * first_chunk:6.0f}ms" if first_chunk is not None else "")
+                + f", loaded in {load_seconds:.1f}s"
+            )
+            for level in result["levels"]:
+                print(
+                    f"{name:<8} {level['clients']:>4} clients: {level['throughput_rps']:7.2f} utterances/s, "
+                    f"p95 {1000 * level['latency_p95']:6.0f}ms, {level['errors']} errors"
+                )
+            if model.backend is not None:
+                model.backend.close()
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"backends": results, "text": TEXT, "language": args.language}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Batch bio generation.
+
+Reads profiles from a JSONL or CSV file, generates their bios with bounded
+concurrency and streams the results to a JSONL file. Profiles already in the
+output file are skipped, so a failed run is resumed by running it again.
+
+Every profile needs a ``website_json`` and a ``curriculum`` field. Their
+``website_json_path`` and ``curriculum_path`` variants read the value from a
+file instead. An ``id`` field is recommended, the line number is used
+otherwise.
+
+Usage:
+    python -m biogen.batch speakers.jsonl --output bios.jsonl --concurrency 4 --batch-size 8
+"""
+import argparse
+import csv
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Set
+
+from biogen.model import APIModel
+
+
+@dataclass(frozen=True)
+class Profile:
+    id: str
+    website_json: str
+    curriculum: str
+
+
+def _field(row: Dict[str, str], name: str, base_dir: str) -> str:
+    if row.get(name):
+        value = row[name]
+        # a JSONL row can hold the scraped profile as an object
+        return value if isinstance(value, str) else json.dumps(value)
+    path = row.get(f"{name}_path")
+    if not path:
+        raise ValueError(f"Missing {name} or {name}_path")
+    with open(os.path.join(base_dir, path), "r") as f:
+        return f.read()
+
+
+def read_profiles(path: str) -> Iterator[Profile]:
+    base_dir = os.path.dirname(os.path.abspath(path))
+    with open(path, "r", newline="") as f:
+        if path.endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for line_number, row in enumerate(rows, start=1):
+            yield Profile(
+                id=str(row.get("id") or line_number),
+                website_json=_field(row, "website_json", base_dir),
+                curriculum=_field(row, "curriculum", base_dir),
+            )
+
+
+def load_done(output_path: str) -> Set[str]:
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["id"])
+            except (json.JSONDecodeError, KeyError):
+                # truncated last line of an interrupted run
+                continue
+    return done
+
+
+def _chunks(profiles: List[Profile], size: int) -> Iterator[List[Profile]]:
+    for i in range(0, len(profiles), size):
+        yield profiles[i:i + size]
+
+
+class BatchBioGenerator:
+    def __init__(
+            self,
+            model: APIModel,
+            output_path: str,
+            concurrency: int = 4,
+            batch_size: int = 8,
+    ):
+        """
+        Parameters:
+            model(APIModel): the model generating the bios
+            output_path(str): JSONL file the bios are appended to
+            concurrency(int): number of batches processed at the same time
+            batch_size(int): profiles sent together to each stage of the chain
+        """
+        self.model = model
+        self.output_path = output_path
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self._output_lock = threading.Lock()
+
+    def _process(self, profiles: List[Profile]) -> float:
+        start = time.perf_counter()
+        bios = self.model.batch([(p.website_json, p.curriculum) for p in profiles])
+        latency = time.perf_counter() - start
+        with self._output_lock:
+            with open(self.output_path, "a") as f:
+                for profile, bio in zip(profiles, bios):
+                    f.write(json.dumps({"id": profile.id, "bio": bio.strip()}) + "\n")
+        return latency
+
+    def run(self, profiles: List[Profile]) -> Dict[str, float]:
+        done = load_done(self.output_path)
+        todo = [profile for profile in profiles if profile.id not in done]
+        print(f"{len(done)} profiles already done, {len(todo)} to go")
+        start = time.perf_counter()
+        latencies = []
+        n_done, n_failed = 0, 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {
+                executor.submit(self._process, chunk): chunk
+                for chunk in _chunks(todo, self.batch_size)
+            }
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    latencies.append(future.result())
+                    n_done += len(chunk)
+                except Exception as e:
+                    n_failed += len(chunk)
+                    print(f"FAILED {[p.id for p in chunk]}: {e}", file=sys.stderr)
+                    continue
+                elapsed = time.perf_counter() - start
+                print(
+                    f"[{n_done + n_failed}/{len(todo)}] batch of {len(chunk)} in "
+                    f"{latencies[-1]:.1f}s - {60 * n_done / elapsed:.1f} profiles/min"
+                )
+        elapsed = time.perf_counter() - start
+        stats = {
+            "done": n_done,
+            "failed": n_failed,
+            "skipped": len(done),
+            "elapsed": elapsed,
+            "profiles_per_minute": 60 * n_done / elapsed if elapsed > 0 else 0.0,
+            "batch_latency_p50": statistics.median(latencies) if latencies else 0.0,
+            "batch_latency_p95": (
+                statistics.quantiles(latencies, n=20)[-1]
+                if len(latencies) > 1 else max(latencies, default=0.0)
+            ),
+            "batch_latency_max": max(latencies, default=0.0),
+        }
+        print(json.dumps(stats, indent=2))
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m biogen.batch")
+    parser.add_argument("profiles", help="JSONL or CSV file of profiles")
+    parser.add_argument("--output", required=True, help="JSONL file the bios are appended to")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--model-name", default="text-davinci-003")
+    parser.add_argument("--temperature", type=float, default=0.7)
+    parser.add_argument("--cache-dir", help="cache the reader stages outputs in this directory")
+    args = parser.parse_args()
+
+    model = APIModel(
+        model_name=args.model_name,
+        temperature=args.temperature,
+        cache_dir=args.cache_dir,
+    )
+    generator = BatchBioGenerator(
+        model,
+        args.output,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+    )
+    stats = generator.run(list(read_profiles(args.profiles)))
+    sys.exit(1 if stats["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
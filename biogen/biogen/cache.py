@@ -0,0 +1,102 @@
+"""Caches for the outputs of the single stages of ``ModelChain``."""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Protocol
+
+from langchain import LLMChain
+
+
+class StageCache(Protocol):
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    def put(self, key: str, value: str) -> None:
+        ...
+
+
+def stage_key(chain: LLMChain, inputs: Dict[str, str]) -> str:
+    """Hash of the stage inputs, its prompt template and the LLM parameters."""
+    payload = json.dumps(
+        {
+            "template": chain.prompt.template,
+            "llm": chain.llm._identifying_params,
+            "inputs": inputs,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryLRUCache:
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DiskLRUCache:
+    """SQLite backed cache, the least recently used entries are evicted
+    once it holds more than ``max_entries``."""
+
+    def __init__(self, cache_dir: str, max_entries: int = 10000):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            os.path.join(cache_dir, "stages.sqlite"), check_same_thread=False
+        )
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS stages "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS stages_last_access ON stages (last_access)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT value FROM stages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute(
+                "UPDATE stages SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO stages (key, value, last_access) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            self._connection.execute(
+                "DELETE FROM stages WHERE key IN ("
+                "SELECT key FROM stages ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def close(self) -> None:
+        self._connection.close()
@@ -0,0 +1,35 @@
+import time
+from typing import Any, Dict, List
+from uuid import UUID
+
+from langchain.callbacks.base import BaseCallbackHandler
+from langchain.schema import LLMResult
+
+from genai_core.metrics import get_metrics
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Records the latency and token usage of every LLM call in the shared
+    genai_core metrics registry."""
+
+    def __init__(self, name: str):
+        self.metrics = get_metrics(name)
+        self._start_times: Dict[UUID, float] = {}
+
+    def on_llm_start(
+            self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._start_times[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        latency = time.perf_counter() - self._start_times.pop(run_id, time.perf_counter())
+        token_usage = (response.llm_output or {}).get("token_usage", {})
+        self.metrics.record(
+            latency,
+            prompt_tokens=token_usage.get("prompt_tokens", 0),
+            completion_tokens=token_usage.get("completion_tokens", 0),
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        latency = time.perf_counter() - self._start_times.pop(run_id, time.perf_counter())
+        self.metrics.record(latency, error=True)
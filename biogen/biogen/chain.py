@@ -1,17 +1,55 @@
-from typing import Dict, List
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
 
 from langchain import LLMChain
+from langchain.callbacks.manager import (
+    AsyncCallbackManagerForChainRun,
+    CallbackManagerForChainRun,
+    Callbacks,
+)
 from langchain.chains.base import Chain
-from pydantic import BaseModel
+from langchain.schema import RUN_KEY
+from pydantic import BaseModel, Field
+
+from biogen.cache import stage_key
+
+# timings kept for the calls whose caller did not pop them
+MAX_RUN_TIMINGS = 1024
+
+
+def _timed(function: Callable[..., Any], *args, **kwargs) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    return function(*args, **kwargs), time.perf_counter() - start
+
+
+async def _atimed(awaitable: Awaitable[Any]) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    return await awaitable, time.perf_counter() - start
 
 
 class ModelChain(Chain, BaseModel):
+    """Runs the two independent reader stages concurrently, then feeds both
+    outputs to ``llm_core``.
+
+    The duration in seconds of each stage of a call, together with the
+    overall ``total``, is returned by ``pop_timings`` for the outputs of a
+    call made with ``include_run_info=True``. When a ``cache``
+    is given, the outputs of the reader stages are cached by input, template
+    and LLM parameters, so tweaking ``llm_core`` only re-runs the last stage.
+    """
     json_reader: LLMChain
     curriculum_reader: LLMChain
     llm_core: LLMChain
     output_key: str = "text"
     curriculum_key: str = "curriculum"
-    json_key: str = "webpage"
+    json_key: str = "website"
+    # timings of each call by run id, see ``pop_timings``
+    run_timings: Dict[UUID, Dict[str, float]] = Field(default_factory=dict)
+    # a StageCache, typed as Any since pydantic cannot validate protocols
+    cache: Any = None
 
     @property
     def _chain_type(self) -> str:
@@ -30,21 +68,161 @@ class ModelChain(Chain, BaseModel):
     def output_keys(self) -> List[str]:
         return [self.output_key]
 
-    def _call(self, inputs: Dict[str, str]) -> Dict[str, str]:
-        json_inputs = {
+    def pop_timings(self, outputs: Dict[str, Any]) -> Dict[str, float]:
+        """Timings of the call that returned ``outputs``."""
+        return self.run_timings.pop(outputs[RUN_KEY].run_id)
+
+    def _record(self, run_id: UUID, timings: Dict[str, float]) -> None:
+        self.run_timings[run_id] = timings
+        while len(self.run_timings) > MAX_RUN_TIMINGS:
+            self.run_timings.pop(next(iter(self.run_timings)), None)
+
+    @staticmethod
+    def _select(inputs: Dict[str, str], chain: LLMChain) -> Dict[str, str]:
+        return {
             key: value for key, value in inputs.items()
-            if key in self.json_reader.input_keys
+            if key in chain.input_keys
         }
-        json_output = self.json_reader.run(**json_inputs)
-        curriculum_inputs = {
-            key: value for key, value in inputs.items()
-            if key in self.curriculum_reader.input_keys
+
+    def _run_reader(self, reader: LLMChain, inputs: Dict[str, str], callbacks: Callbacks) -> str:
+        inputs = self._select(inputs, reader)
+        if self.cache is None:
+            return reader.run(callbacks=callbacks, **inputs)
+        key = stage_key(reader, inputs)
+        output = self.cache.get(key)
+        if output is None:
+            output = reader.run(callbacks=callbacks, **inputs)
+            self.cache.put(key, output)
+        return output
+
+    async def _arun_reader(self, reader: LLMChain, inputs: Dict[str, str], callbacks: Callbacks) -> str:
+        inputs = self._select(inputs, reader)
+        if self.cache is None:
+            return await reader.arun(callbacks=callbacks, **inputs)
+        key = stage_key(reader, inputs)
+        output = self.cache.get(key)
+        if output is None:
+            output = await reader.arun(callbacks=callbacks, **inputs)
+            self.cache.put(key, output)
+        return output
+
+    def _apply_reader(
+            self, reader: LLMChain, inputs_list: List[Dict[str, str]], callbacks: Callbacks
+    ) -> List[str]:
+        inputs_list = [self._select(inputs, reader) for inputs in inputs_list]
+        if self.cache is None:
+            results = reader.apply(inputs_list, callbacks=callbacks)
+            return [result[reader.output_key] for result in results]
+        keys = [stage_key(reader, inputs) for inputs in inputs_list]
+        outputs = [self.cache.get(key) for key in keys]
+        missing = [i for i, output in enumerate(outputs) if output is None]
+        if missing:
+            results = reader.apply([inputs_list[i] for i in missing], callbacks=callbacks)
+            for i, result in zip(missing, results):
+                outputs[i] = result[reader.output_key]
+                self.cache.put(keys[i], outputs[i])
+        return outputs
+
+    def _call(
+            self,
+            inputs: Dict[str, str],
+            run_manager: Optional[CallbackManagerForChainRun] = None,
+    ) -> Dict[str, str]:
+        start = time.perf_counter()
+        callbacks = run_manager.get_child() if run_manager else None
+        # the readers do not depend on each other, only llm_core needs both
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            json_future = executor.submit(
+                _timed, self._run_reader, self.json_reader, inputs, callbacks
+            )
+            curriculum_future = executor.submit(
+                _timed, self._run_reader, self.curriculum_reader, inputs, callbacks
+            )
+            json_output, json_time = json_future.result()
+            curriculum_output, curriculum_time = curriculum_future.result()
+        core_inputs = {
+            **inputs,
+            self.json_key: json_output,
+            self.curriculum_key: curriculum_output,
+        }
+        llm_core_output, core_time = _timed(
+            self.llm_core.run, callbacks=callbacks, **core_inputs
+        )
+        timings = {
+            "json_reader": json_time,
+            "curriculum_reader": curriculum_time,
+            "llm_core": core_time,
+            "total": time.perf_counter() - start,
         }
-        curriculum_output = self.curriculum_reader.run(**curriculum_inputs)
-        inputs.update({
+        if run_manager:
+            self._record(run_manager.run_id, timings)
+        return {self.output_key: llm_core_output}
+
+    async def _acall(
+            self,
+            inputs: Dict[str, str],
+            run_manager: Optional[AsyncCallbackManagerForChainRun] = None,
+    ) -> Dict[str, str]:
+        start = time.perf_counter()
+        callbacks = run_manager.get_child() if run_manager else None
+        (json_output, json_time), (curriculum_output, curriculum_time) = await asyncio.gather(
+            _atimed(self._arun_reader(self.json_reader, inputs, callbacks)),
+            _atimed(self._arun_reader(self.curriculum_reader, inputs, callbacks)),
+        )
+        core_inputs = {
+            **inputs,
             self.json_key: json_output,
-            self.curriculum_key: curriculum_output
-        })
-        llm_core_output = self.llm_core.run(**inputs)
+            self.curriculum_key: curriculum_output,
+        }
+        llm_core_output, core_time = await _atimed(
+            self.llm_core.arun(callbacks=callbacks, **core_inputs)
+        )
+        timings = {
+            "json_reader": json_time,
+            "curriculum_reader": curriculum_time,
+            "llm_core": core_time,
+            "total": time.perf_counter() - start,
+        }
+        if run_manager:
+            self._record(run_manager.run_id, timings)
         return {self.output_key: llm_core_output}
 
+    def apply_batch(
+            self, inputs_list: List[Dict[str, str]], callbacks: Callbacks = None
+    ) -> Tuple[List[str], Dict[str, float]]:
+        """Run the chain on many inputs, sending each stage as a single batch.
+
+        The LLM splits every stage in as few requests as it allows (see the
+        ``batch_size`` of the langchain OpenAI LLM), instead of one request
+        per input and stage. Returns the generated texts in order and the
+        timings of the whole batch.
+        """
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            json_future = executor.submit(
+                _timed, self._apply_reader, self.json_reader, inputs_list, callbacks
+            )
+            curriculum_future = executor.submit(
+                _timed, self._apply_reader, self.curriculum_reader, inputs_list, callbacks
+            )
+            json_outputs, json_time = json_future.result()
+            curriculum_outputs, curriculum_time = curriculum_future.result()
+        core_inputs = [
+            {
+                **inputs,
+                self.json_key: json_output,
+                self.curriculum_key: curriculum_output,
+            }
+            for inputs, json_output, curriculum_output
+            in zip(inputs_list, json_outputs, curriculum_outputs)
+        ]
+        core_outputs, core_time = _timed(
+            self.llm_core.apply, core_inputs, callbacks=callbacks
+        )
+        timings = {
+            "json_reader": json_time,
+            "curriculum_reader": curriculum_time,
+            "llm_core": core_time,
+            "total": time.perf_counter() - start,
+        }
+        return [output[self.llm_core.output_key] for output in core_outputs], timings
@@ -1,8 +1,27 @@
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import openai
 from langchain import OpenAI, LLMChain
 
+from biogen.cache import DiskLRUCache
+from biogen.callbacks import MetricsCallbackHandler
 from biogen.chain import ModelChain
+from biogen.preprocessing import ReducedProfile, reduce_profile
 from biogen.templates import READ_JSON_TEMPLATE, READ_CURRICULUM_TEMPLATE, \
     GENERATE_BIO_TEMPLATE
+from genai_core.client import get_config, get_http_client, openai_base_url
+
+
+@dataclass(frozen=True)
+class GeneratedBio:
+    text: str
+    # duration in seconds of each stage of the chain, see ``ModelChain``
+    stage_timings: Dict[str, float]
+    # None when the profile is not preprocessed
+    reduction: Optional[ReducedProfile] = None
 
 
 class APIModel:
@@ -11,28 +30,119 @@ class APIModel:
             model_name: str = "text-davinci-003",
             temperature: float = 0.7,
             max_tokens: int = 2048,
+            preprocess: bool = True,
+            cache_dir: Optional[str] = None,
     ):
-        llm = OpenAI(
+        """
+        Parameters:
+            temperature(float): sampling temperature of the bio generation, the
+                reader stages extract the facts at temperature 0.
+            preprocess(bool): reduce the scraped profile locally to its career
+                related fields before sending it to the LLM.
+            cache_dir(str): when given, the outputs of the reader stages are
+                cached on disk there, so re-running a profile with a different
+                bio template or temperature only calls the last stage.
+        """
+        self._model_name = model_name
+        self._preprocess = preprocess
+        config = get_config()
+        backend = {}
+        if openai_base_url():
+            # a local backend does not check the key
+            backend = {
+                "openai_api_base": openai_base_url(),
+                "openai_api_key": os.environ.get("OPENAI_API_KEY") or "local",
+            }
+        llm_params = dict(
             model_name=model_name,
-            temperature=temperature,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            http_client=get_http_client(),
+            # the shared pool is synchronous, acall needs a client of its own
+            async_client=openai.AsyncOpenAI(
+                api_key=backend.get("openai_api_key") or os.environ.get("OPENAI_API_KEY"),
+                base_url=openai_base_url(),
+                timeout=config.timeout,
+                max_retries=config.max_retries,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=config.max_connections,
+                        max_keepalive_connections=config.max_keepalive_connections,
+                    ),
+                    timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+                ),
+            ).completions,
+            request_timeout=config.timeout,
+            max_retries=config.max_retries,
+            callbacks=[MetricsCallbackHandler(type(self).__name__)],
+            **backend,
         )
-        website_chain = LLMChain(llm=llm, prompt=READ_JSON_TEMPLATE)
-        curriculum_chain = LLMChain(llm=llm, prompt=READ_CURRICULUM_TEMPLATE)
-        generation_bio_chain = LLMChain(llm=llm, prompt=GENERATE_BIO_TEMPLATE)
+        # the readers have their own LLM, so their cache keys do not depend
+        # on the temperature of the generation
+        reader_llm = OpenAI(temperature=0, **llm_params)
+        core_llm = OpenAI(temperature=temperature, **llm_params)
+        website_chain = LLMChain(llm=reader_llm, prompt=READ_JSON_TEMPLATE)
+        curriculum_chain = LLMChain(llm=reader_llm, prompt=READ_CURRICULUM_TEMPLATE)
+        generation_bio_chain = LLMChain(llm=core_llm, prompt=GENERATE_BIO_TEMPLATE)
         self._chain = ModelChain(
             json_reader=website_chain,
             curriculum_reader=curriculum_chain,
             llm_core=generation_bio_chain,
+            cache=DiskLRUCache(cache_dir) if cache_dir else None,
         )
 
+    def _reduce(self, website_json: str) -> Optional[ReducedProfile]:
+        if not self._preprocess:
+            return None
+        return reduce_profile(website_json, model_name=self._model_name)
+
+    def _inputs(self, website_json: str, curriculum: str) -> Tuple[Dict[str, str], Optional[ReducedProfile]]:
+        reduction = self._reduce(website_json)
+        website = reduction.text if reduction is not None else website_json
+        return {"website": website, "curriculum": curriculum}, reduction
+
+    def _bio(self, outputs: Dict, reduction: Optional[ReducedProfile]) -> GeneratedBio:
+        chain = self._chain
+        return GeneratedBio(outputs[chain.output_key], chain.pop_timings(outputs), reduction)
+
+    def generate(self, website_json: str, curriculum: str) -> GeneratedBio:
+        """Generate the bio, with the timings and the reduction of this call."""
+        inputs, reduction = self._inputs(website_json, curriculum)
+        return self._bio(self._chain(inputs, include_run_info=True), reduction)
+
+    async def agenerate(self, website_json: str, curriculum: str) -> GeneratedBio:
+        inputs, reduction = self._inputs(website_json, curriculum)
+        return self._bio(await self._chain.acall(inputs, include_run_info=True), reduction)
+
     def __call__(self, website_json: str, curriculum: str) -> str:
-        return self._chain.run(
-            webpage=website_json,
-            curriculum=curriculum
-        )
+        return self.generate(website_json, curriculum).text
+
+    async def acall(self, website_json: str, curriculum: str) -> str:
+        return (await self.agenerate(website_json, curriculum)).text
+
+    def generate_batch(self, profiles: List[Tuple[str, str]]) -> List[GeneratedBio]:
+        """Generate the bios for a list of ``(website_json, curriculum)``,
+        the stages of all of them are sent together."""
+        prepared = [self._inputs(website_json, curriculum) for website_json, curriculum in profiles]
+        texts, timings = self._chain.apply_batch([inputs for inputs, _ in prepared])
+        return [GeneratedBio(text, timings, reduction) for text, (_, reduction) in zip(texts, prepared)]
+
+    def batch(self, profiles: List[Tuple[str, str]]) -> List[str]:
+        """Generate the bios for a list of ``(website_json, curriculum)``."""
+        return [bio.text for bio in self.generate_batch(profiles)]
 
 
 if __name__ == "__main__":
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser()
+    parser.add_argument("--website", type=str, required=True, help="scraped profile json")
+    parser.add_argument("--curriculum", type=str, required=True)
+    args = parser.parse_args()
+
+    with open(args.website, "r") as f:
+        website_json = f.read()
+    with open(args.curriculum, "r") as f:
+        curriculum = f.read()
+
     model = APIModel()
-    print(model("website_json", "curriculum"))
\ No newline at end of file
+    print(model(website_json, curriculum))
\ No newline at end of file
@@ -0,0 +1,222 @@
+"""Local reduction of scraped LinkedIn profiles before they reach the LLM.
+
+The scraped payload is walked leaf by leaf (incrementally with ``ijson`` when
+it is installed, without building the whole document in memory), markup is
+stripped from the values, and only the fields related to the career of the
+person are kept.
+"""
+import io
+import json
+import re
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Any, BinaryIO, Iterator, List, Tuple, Union
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+RELEVANT_KEYS = (
+    "name", "headline", "title", "position", "experience", "company",
+    "organization", "education", "school", "degree", "field", "skill",
+    "summary", "about", "description", "certification", "honor", "award",
+    "publication", "project", "patent", "course", "language", "volunteer",
+    "location", "start", "end", "date", "year", "month", "role",
+    # the scraped page itself, reduced to its visible text
+    "html", "content", "text", "body",
+)
+# matched against the words of the field name, e.g. "entityUrn" -> entity, urn
+IGNORED_KEYS = {
+    "url", "urn", "id", "image", "logo", "picture", "photo", "tracking",
+    "type", "recipe", "entity", "vector", "artifact", "style", "script",
+    "icon", "follower", "followers", "connection", "connections", "cta",
+}
+SKIPPED_TAGS = {"script", "style", "noscript", "svg", "head", "nav", "footer", "header", "button", "form"}
+_URL = re.compile(r"^(https?:|www\.|urn:|data:)")
+_WORD = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])")
+
+ProfileSource = Union[str, bytes, BinaryIO]
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._chunks: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth and data.strip():
+            self._chunks.append(data.strip())
+
+    def text(self) -> str:
+        return " ".join(" ".join(self._chunks).split())
+
+
+def strip_html(text: str) -> str:
+    """Remove tags, scripts and styles, keeping the visible text."""
+    if "<" not in text:
+        return " ".join(text.split())
+    parser = _TextExtractor()
+    parser.feed(text)
+    parser.close()
+    return parser.text()
+
+
+def count_tokens(text: str, model_name: str = "text-davinci-003") -> int:
+    """Count tokens with tiktoken, or estimate them as 4 characters per token."""
+    if tiktoken is None:
+        return (len(text) + 3) // 4
+    try:
+        encoding = tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _walk(value: Any, prefix: str = "") -> Iterator[Tuple[str, Any]]:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _walk(item, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(value, list):
+        for item in value:
+            yield from _walk(item, f"{prefix}.item" if prefix else "item")
+    else:
+        yield prefix, value
+
+
+def iter_leaves(source: ProfileSource) -> Iterator[Tuple[str, Any]]:
+    """Yield ``(path, value)`` for every scalar in the JSON document.
+
+    List items appear as ``item`` in the path, e.g. ``experience.item.title``.
+    """
+    if ijson is not None and not isinstance(source, str):
+        stream = io.BytesIO(source) if isinstance(source, bytes) else source
+        for prefix, event, value in ijson.parse(stream):
+            if event in ("string", "number", "boolean"):
+                yield prefix, value
+        return
+    if not isinstance(source, (str, bytes)):
+        source = source.read()
+    yield from _walk(json.loads(source))
+
+
+class _TokenCounter:
+    """Binary file wrapper counting the tokens read through it, so a profile
+    parsed incrementally does not need to be held in memory to be counted."""
+
+    def __init__(self, file: BinaryIO, model_name: str):
+        self.file = file
+        self._model_name = model_name
+        self.tokens = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.file.read(size)
+        if chunk:
+            text = chunk.decode("utf-8", errors="replace") if isinstance(chunk, bytes) else chunk
+            # about, a token can be split between two chunks
+            self.tokens += count_tokens(text, self._model_name)
+        return chunk
+
+
+def _words(key: str) -> List[str]:
+    return [word.lower() for word in _WORD.findall(key)]
+
+
+def _is_relevant(path: str) -> bool:
+    keys = [key for key in path.split(".") if key != "item"]
+    if not keys or any(word in IGNORED_KEYS for word in _words(keys[-1])):
+        return False
+    return any(
+        word.startswith(RELEVANT_KEYS)
+        for key in keys
+        for word in _words(key)
+    )
+
+
+@dataclass(frozen=True)
+class ReducedProfile:
+    text: str
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def reduction(self) -> float:
+        if self.tokens_before == 0:
+            return 0.0
+        return 1 - self.tokens_after / self.tokens_before
+
+
+def reduce_profile(source: ProfileSource, model_name: str = "text-davinci-003") -> ReducedProfile:
+    """Reduce a scraped profile to its career related content.
+
+    Parameters:
+        source: the scraped profile, as JSON (str, bytes or binary file) or
+            as raw HTML.
+        model_name: model used to count the tokens.
+    Returns:
+        ReducedProfile: the reduced text, one ``path: value`` per line or
+            the raw text when no career field was found, and the token
+            counts before and after the reduction.
+    """
+    counter = None
+    if not isinstance(source, (str, bytes)):
+        if ijson is not None and source.seekable():
+            # parsed as it is read, the raw text is only read again to fall back on it
+            start = source.tell()
+            counter = source = _TokenCounter(source, model_name)
+        else:
+            source = source.read()
+    lines = []
+    seen = set()
+    try:
+        for path, value in iter_leaves(source):
+            if isinstance(value, bool) or value is None or not _is_relevant(path):
+                continue
+            text = strip_html(str(value))
+            if not text or _URL.match(text):
+                continue
+            key = ".".join(key for key in path.split(".") if key != "item")
+            line = f"{key}: {text}"
+            # short values (dates, ...) repeat legitimately, long ones are boilerplate
+            if len(text) > 40 and line in seen:
+                continue
+            seen.add(line)
+            lines.append(line)
+        reduced = "\n".join(lines)
+        parsed = True
+    except ValueError:
+        reduced, parsed = "", False
+    if counter is not None and parsed and reduced:
+        tokens_before = counter.tokens
+    else:
+        if counter is not None:
+            counter.file.seek(start)
+            source = counter.file.read()
+        raw_text = source.decode("utf-8") if isinstance(source, bytes) else source
+        tokens_before = count_tokens(raw_text, model_name)
+        if not parsed:
+            # not JSON (ijson errors subclass ValueError too), treat it as a page
+            reduced = strip_html(raw_text)
+        elif not reduced:
+            # no field we know, better the whole profile than nothing
+            reduced = raw_text
+    return ReducedProfile(
+        text=reduced,
+        tokens_before=tokens_before,
+        tokens_after=count_tokens(reduced, model_name),
+    )
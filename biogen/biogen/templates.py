@@ -1,5 +1,7 @@
+from langchain.prompts import PromptTemplate
+
 # Self reasoning agent templates
-READ_JSON_TEMPLATE = dict(
+READ_JSON_TEMPLATE = PromptTemplate(
     template=(
         "You are an AI helping in cleaning the json input containing the HTML, "
         "obtained by scraping a linkedin profile. You must extract "
@@ -11,7 +13,7 @@ READ_JSON_TEMPLATE = dict(
     input_variables=["website"],
 )
 
-READ_CURRICULUM_TEMPLATE = dict(
+READ_CURRICULUM_TEMPLATE = PromptTemplate(
     template=(
         "You are an AI helping in summarizing the curriculum of a person. "
         "You must extract the information related to the career of the person "
@@ -22,7 +24,7 @@ READ_CURRICULUM_TEMPLATE = dict(
     input_variables=["curriculum"],
 )
 
-GENERATE_BIO_TEMPLATE = dict(
+GENERATE_BIO_TEMPLATE = PromptTemplate(
     template=(
         "You are an AI helping in generating a bio for a person. The bio "
         "must be a short description of the person's career. Consider that "
@@ -35,4 +37,4 @@ GENERATE_BIO_TEMPLATE = dict(
         "Now provide the bio for the person:\n"
     ),
     input_variables=["curriculum", "website"],
-)
\ No newline at end of file
+)
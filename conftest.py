@@ -0,0 +1,8 @@
+import sys
+from os.path import dirname, abspath, join
+
+# the subprojects are run from their own directory, the tests import them all
+ROOT = dirname(abspath(__file__))
+for path in (ROOT, join(ROOT, "github-pr-reviewer"), join(ROOT, "biogen"), join(ROOT, "agent-frontent-dev")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,217 @@
+"""Audio handoff helpers shared by the speech models.
+
+The audio can be given as a file path, raw bytes, a binary file object, a
+memory map, a numpy array or the ``(sample_rate, array)`` tuple produced by
+``gr.Audio(type="numpy")``. Nothing is renamed or copied to disk: the input
+is turned into an in-memory upload and every handle opened on the way is
+closed as soon as the ``audio_upload`` context exits.
+"""
+import io
+import mmap
+import os
+import wave
+from contextlib import ExitStack, contextmanager
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+
+import numpy as np
+
+# Whisper resamples everything to 16kHz mono, anything above is wasted bandwidth
+WHISPER_SAMPLE_RATE = 16000
+
+AudioSource = Union[
+    str,
+    os.PathLike,
+    bytes,
+    bytearray,
+    memoryview,
+    mmap.mmap,
+    BinaryIO,
+    np.ndarray,
+    Tuple[int, np.ndarray],
+]
+Upload = Tuple[str, BinaryIO]
+
+
+def describe_audio(audio: AudioSource) -> str:
+    """Short human readable description, safe to print for large arrays."""
+    if isinstance(audio, (str, os.PathLike)):
+        return os.fspath(audio)
+    if isinstance(audio, tuple):
+        sample_rate, samples = audio
+        return f"array{samples.shape} @ {sample_rate}Hz"
+    if isinstance(audio, np.ndarray):
+        return f"array{audio.shape}"
+    return type(audio).__name__
+
+
+def to_mono(samples: np.ndarray) -> np.ndarray:
+    if samples.ndim == 1:
+        return samples
+    # gradio returns (n_samples, n_channels). The mean is cast back, integer
+    # samples would otherwise become floats in the integer range
+    return samples.mean(axis=1).astype(samples.dtype)
+
+
+def to_pcm16(samples: np.ndarray) -> np.ndarray:
+    if samples.dtype == np.int16:
+        return samples
+    if np.issubdtype(samples.dtype, np.integer):
+        scale = np.iinfo(samples.dtype).max / np.iinfo(np.int16).max
+        return (samples / scale).astype(np.int16)
+    samples = np.clip(samples, -1.0, 1.0)
+    return (samples * np.iinfo(np.int16).max).astype(np.int16)
+
+
+def resample(samples: np.ndarray, sample_rate: int, target_sample_rate: int) -> np.ndarray:
+    """Linear resampling, good enough for speech recognition."""
+    if sample_rate == target_sample_rate or len(samples) == 0:
+        return samples
+    duration = len(samples) / sample_rate
+    n_target = max(int(round(duration * target_sample_rate)), 1)
+    old_times = np.linspace(0.0, duration, num=len(samples), endpoint=False)
+    new_times = np.linspace(0.0, duration, num=n_target, endpoint=False)
+    return np.interp(new_times, old_times, samples.astype(np.float32))
+
+
+def decode_wav(buffer: BinaryIO) -> Tuple[int, np.ndarray]:
+    with wave.open(buffer, "rb") as wav_file:
+        sample_rate = wav_file.getframerate()
+        n_channels = wav_file.getnchannels()
+        sample_width = wav_file.getsampwidth()
+        frames = wav_file.readframes(wav_file.getnframes())
+    dtypes = {1: np.uint8, 2: np.int16, 4: np.int32}
+    if sample_width not in dtypes:
+        raise ValueError(f"Unsupported WAV sample width: {sample_width} bytes")
+    samples = np.frombuffer(frames, dtype=dtypes[sample_width])
+    if sample_width == 1:
+        # 8 bit WAV is unsigned
+        samples = (samples.astype(np.int16) - 128) << 8
+    return sample_rate, samples.reshape(-1, n_channels)
+
+
+def encode_audio(samples: np.ndarray, sample_rate: int, audio_format: str = "wav") -> io.BytesIO:
+    """Encode mono PCM samples into an in-memory file of the given format."""
+    buffer = io.BytesIO()
+    if audio_format == "wav":
+        with wave.open(buffer, "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(sample_rate)
+            wav_file.writeframes(to_pcm16(samples).tobytes())
+    elif audio_format == "flac":
+        try:
+            import soundfile
+        except ImportError as e:
+            raise ImportError(
+                "FLAC compression requires the soundfile package: "
+                "pip install soundfile"
+            ) from e
+        soundfile.write(buffer, to_pcm16(samples), sample_rate, format="FLAC")
+    else:
+        raise ValueError(f"Unsupported audio format: {audio_format}")
+    buffer.seek(0)
+    return buffer
+
+
+def _is_wav(buffer: BinaryIO) -> bool:
+    position = buffer.tell()
+    header = buffer.read(12)
+    buffer.seek(position)
+    return header[:4] == b"RIFF" and header[8:12] == b"WAVE"
+
+
+@contextmanager
+def audio_upload(
+        audio: AudioSource,
+        sample_rate: Optional[int] = None,
+        target_sample_rate: Optional[int] = None,
+        audio_format: Optional[str] = None,
+        filename: str = "audio",
+) -> Iterator[Upload]:
+    """Yield a ``(filename, file)`` pair ready to be uploaded.
+
+    Parameters:
+        audio: the audio to upload, see ``AudioSource``.
+        sample_rate: sample rate of ``audio`` when it is a bare numpy array.
+        target_sample_rate: when set, raw and WAV audio is converted to mono
+            and downsampled to this rate before the upload.
+        audio_format: format used when the audio has to be (re)encoded,
+            either "wav" or "flac". Setting it forces re-encoding of WAV input.
+        filename: name of the upload, the API uses its extension to detect
+            the audio format.
+    Returns:
+        Iterator[Upload]: the upload, closed when the context exits. File
+            objects passed in by the caller are left open.
+    """
+    with ExitStack() as stack:
+        if isinstance(audio, tuple):
+            sample_rate, audio = audio
+        if isinstance(audio, np.ndarray):
+            if sample_rate is None:
+                raise ValueError("sample_rate is required for numpy audio")
+            file = _encode(audio, sample_rate, target_sample_rate, audio_format)
+            yield f"{filename}.{audio_format or 'wav'}", stack.enter_context(file)
+            return
+
+        if isinstance(audio, (str, os.PathLike)):
+            path = os.fspath(audio)
+            file = stack.enter_context(open(path, "rb"))
+            extension = os.path.splitext(path)[1].lstrip(".") or "wav"
+            if os.fstat(file.fileno()).st_size > 0:
+                # map the file instead of reading it, pages are shared with the OS cache
+                file = stack.enter_context(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+        elif isinstance(audio, (bytes, bytearray, memoryview)):
+            file = stack.enter_context(io.BytesIO(audio))
+            extension = "wav"
+        elif isinstance(audio, mmap.mmap) or hasattr(audio, "read"):
+            # owned by the caller, we must not close it
+            file = audio
+            extension = os.path.splitext(getattr(audio, "name", ""))[1].lstrip(".") or "wav"
+        else:
+            raise TypeError(f"Unsupported audio input: {type(audio).__name__}")
+
+        if (target_sample_rate or audio_format) and _is_wav(file):
+            wav_sample_rate, samples = decode_wav(file)
+            file = stack.enter_context(
+                _encode(samples, wav_sample_rate, target_sample_rate, audio_format)
+            )
+            extension = audio_format or "wav"
+        yield f"{filename}.{extension}", file
+
+
+def load_samples(
+        audio: AudioSource,
+        sample_rate: Optional[int] = None,
+        target_sample_rate: int = WHISPER_SAMPLE_RATE,
+) -> np.ndarray:
+    """Decode the audio into float32 mono samples in [-1, 1] at ``target_sample_rate``,
+    as on-device speech models expect. Encoded input other than WAV raises a ValueError."""
+    if isinstance(audio, tuple):
+        sample_rate, audio = audio
+    if not isinstance(audio, np.ndarray):
+        with audio_upload(audio) as (_, file):
+            if not _is_wav(file):
+                raise ValueError(f"Cannot decode {describe_audio(audio)}, only WAV and raw samples are supported")
+            sample_rate, audio = decode_wav(file)
+    elif sample_rate is None:
+        raise ValueError("sample_rate is required for numpy audio")
+    samples = audio
+    if np.issubdtype(samples.dtype, np.integer):
+        samples = to_pcm16(samples).astype(np.float32) / np.iinfo(np.int16).max
+    samples = resample(to_mono(samples), sample_rate, target_sample_rate)
+    return np.clip(samples, -1.0, 1.0).astype(np.float32)
+
+
+def _encode(
+        samples: np.ndarray,
+        sample_rate: int,
+        target_sample_rate: Optional[int],
+        audio_format: Optional[str],
+) -> io.BytesIO:
+    samples = to_mono(samples)
+    if target_sample_rate is not None:
+        samples = resample(to_pcm16(samples), sample_rate, target_sample_rate)
+        # resampling returns floats in the int16 range
+        samples = samples.astype(np.int16)
+        sample_rate = target_sample_rate
+    return encode_audio(samples, sample_rate, audio_format or "wav")
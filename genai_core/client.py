@@ -0,0 +1,138 @@
+"""Pooled API clients shared by every model in the repository.
+
+All the models go through the same ``httpx`` connection pool and the same
+concurrency limiter, so throughput is tuned in one place with ``configure``.
+``configure`` must be called before the first request, since the clients are
+built lazily once and then reused.
+
+Setting ``base_url`` (or the ``GENAI_BACKEND_URL`` environment variable)
+points every model to another backend speaking the same APIs, for instance
+the local fake server of ``genai_core.fake_server``.
+"""
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Optional, Tuple, Type
+
+import httpx
+import openai
+
+
+@dataclass(frozen=True)
+class ClientConfig:
+    timeout: float = 60.0
+    connect_timeout: float = 5.0
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    max_concurrency: int = 8
+    # root url of the backend, None for the public cloud APIs
+    base_url: Optional[str] = field(default_factory=lambda: os.environ.get("GENAI_BACKEND_URL"))
+
+
+RETRYABLE_ERRORS: Tuple[Type[Exception], ...] = (
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+    httpx.TransportError,
+)
+
+_config = ClientConfig()
+_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_openai_client: Optional[openai.OpenAI] = None
+_limiter: Optional[threading.BoundedSemaphore] = None
+
+
+def configure(**kwargs) -> ClientConfig:
+    """Update the shared client configuration, see ``ClientConfig``."""
+    global _config
+    with _lock:
+        if _http_client is not None:
+            raise RuntimeError("configure must be called before the first request")
+        _config = replace(_config, **kwargs)
+    return _config
+
+
+def get_config() -> ClientConfig:
+    return _config
+
+
+def openai_base_url() -> Optional[str]:
+    """Base url of the OpenAI API, None for the default one."""
+    if not _config.base_url:
+        return None
+    return f"{_config.base_url.rstrip('/')}/v1"
+
+
+def get_http_client() -> httpx.Client:
+    """Shared keep-alive connection pool."""
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=_config.max_connections,
+                    max_keepalive_connections=_config.max_keepalive_connections,
+                ),
+                timeout=httpx.Timeout(_config.timeout, connect=_config.connect_timeout),
+            )
+        return _http_client
+
+
+def get_openai_client() -> openai.OpenAI:
+    """Shared OpenAI client, the API key is read from OPENAI_API_KEY."""
+    global _openai_client
+    http_client = get_http_client()
+    with _lock:
+        if _openai_client is None:
+            base_url = openai_base_url()
+            _openai_client = openai.OpenAI(
+                # a local backend does not check the key
+                api_key=os.environ.get("OPENAI_API_KEY") or ("local" if base_url else None),
+                base_url=base_url,
+                http_client=http_client,
+                timeout=_config.timeout,
+                # retries are handled by ``call_with_retries``
+                max_retries=0,
+            )
+        return _openai_client
+
+
+def get_limiter() -> threading.BoundedSemaphore:
+    """Process wide limit on the number of in-flight requests."""
+    global _limiter
+    with _lock:
+        if _limiter is None:
+            _limiter = threading.BoundedSemaphore(_config.max_concurrency)
+        return _limiter
+
+
+def backoff_delay(attempt: int, config: Optional[ClientConfig] = None) -> float:
+    """Exponential backoff with full jitter."""
+    config = config or _config
+    return random.uniform(0, min(config.backoff_max, config.backoff_base * 2 ** attempt))
+
+
+def call_with_retries(
+        function: Callable[..., Any],
+        *args,
+        retry_on: Tuple[Type[Exception], ...] = RETRYABLE_ERRORS,
+        **kwargs,
+) -> Any:
+    """Run ``function`` under the concurrency limit, retrying transient errors."""
+    config = _config
+    for attempt in range(config.max_retries + 1):
+        try:
+            with get_limiter():
+                return function(*args, **kwargs)
+        except retry_on:
+            if attempt == config.max_retries:
+                raise
+        # sleep outside of the limiter so other requests can go on meanwhile
+        time.sleep(backoff_delay(attempt, config))
@@ -0,0 +1,324 @@
+"""Local stand-in for the OpenAI and Google text-to-speech APIs.
+
+Serves the endpoints used by the models of the repository with a
+configurable latency, error rate and payload size, so the apps can be run
+and load tested without network access. Point the models to it with
+``GENAI_BACKEND_URL`` or ``genai_core.client.configure(base_url=...)``.
+
+The replies follow the shape of the real APIs, not their content: chat
+replies match the format asked by the system prompt when they recognise it,
+images are random noise PNGs and the synthesised audio is random bytes.
+
+Usage:
+    python -m genai_core.fake_server --port 8089 --latency-ms 300 --error-rate 0.01
+    GENAI_BACKEND_URL=http://127.0.0.1:8089 python src/main.py --v
+"""
+import argparse
+import base64
+import json
+import random
+import re
+import struct
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+_WORDS = (
+    "a painting of the city skyline at night with bright lights reflected in "
+    "the river under a clear sky full of stars and a warm orange moon rising "
+    "over old bridges while people walk along the quiet streets"
+).split()
+
+
+def _png(n_bytes: int, rng: random.Random) -> bytes:
+    """Random RGB image of about ``n_bytes``, stored uncompressed."""
+    side = max(1, int((n_bytes / 3) ** 0.5))
+    rows = b"".join(b"\x00" + rng.randbytes(3 * side) for _ in range(side))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data)) + kind + data
+            + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+        )
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", side, side, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows, 0))
+        + chunk(b"IEND", b"")
+    )
+
+
+class FakeBackend:
+    """Replies and failure injection, shared by all the request handlers."""
+
+    def __init__(
+            self,
+            latency: float = 0.2,
+            jitter: float = 0.05,
+            error_rate: float = 0.0,
+            error_status: int = 500,
+            text_words: int = 30,
+            blob_bytes: int = 64 * 1024,
+            seed: Optional[int] = None,
+    ):
+        """
+        Parameters:
+            latency(float): mean time in seconds spent on each request
+            jitter(float): the latency is drawn uniformly in +-jitter
+            error_rate(float): fraction of the requests failing
+            error_status(int): HTTP status of the failures, 500 or 429
+            text_words(int): words in the generated texts
+            blob_bytes(int): size of the generated images and audio
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.text_words = text_words
+        self.blob_bytes = blob_bytes
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._requests: Counter = Counter()
+        self._errors: Counter = Counter()
+        # generated once, the payload size matters, not the content
+        self.image = _png(blob_bytes, self._rng)
+        self.audio = b"ID3" + self._rng.randbytes(max(0, blob_bytes - 3))
+
+    def wait(self) -> None:
+        time.sleep(max(0.0, self.latency + self._random().uniform(-self.jitter, self.jitter)))
+
+    def should_fail(self, endpoint: str) -> bool:
+        with self._lock:
+            self._requests[endpoint] += 1
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self._errors[endpoint] += 1
+        return failed
+
+    def text(self) -> str:
+        rng = self._random()
+        return " ".join(rng.choice(_WORDS) for _ in range(self.text_words))
+
+    def chat_reply(self, messages: List[Dict[str, Any]]) -> str:
+        system = " ".join(m.get("content") or "" for m in messages if m.get("role") == "system")
+        if "<begin>" in system:
+            return f"<begin> {self.text()} <end>"
+        if "<start_comment>" in system:
+            return self._review(messages[-1].get("content") or "")
+        return self.text()
+
+    def _review(self, user_message: str) -> str:
+        file_name = re.search(r"<start_file_name>(.*?)<end_file_name>", user_message, re.DOTALL)
+        code = re.search(r"<start_code>(.*)<end_code>", user_message, re.DOTALL)
+        if file_name is None or code is None:
+            return "LGTM!"
+        lines = [line.strip() for line in code.group(1).splitlines() if line.strip()]
+        snippet = self._random().choice(lines) if lines else ""
+        return (
+            f"<start_file_name> {file_name.group(1).strip()} <end_file_name>\n"
+            f"<start_code_snippet> {snippet} <end_code_snippet>\n"
+            f"<start_comment> {self.text()} <end_comment>"
+        )
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {"requests": dict(self._requests), "errors": dict(self._errors)}
+
+    def _random(self) -> random.Random:
+        # each handler thread gets its own generator, seeded from the shared one
+        rng = getattr(self._local, "rng", None)
+        if rng is None:
+            with self._lock:
+                rng = self._local.rng = random.Random(self._rng.random())
+        return rng
+
+
+def _usage(prompt: str, completion: str) -> Dict[str, int]:
+    prompt_tokens, completion_tokens = len(prompt) // 4, len(completion) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "FakeServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/stats":
+            return self._json(200, self.server.backend.stats())
+        if self.path.startswith("/files/"):
+            return self._reply(200, self.server.backend.image, "image/png")
+        self._json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        endpoint = self.path.split("?")[0]
+        route = {
+            "/v1/chat/completions": self._chat_completions,
+            "/v1/completions": self._completions,
+            "/v1/audio/transcriptions": self._transcriptions,
+            "/v1/images/generations": self._images,
+            "/v1/text:synthesize": self._synthesize,
+        }.get(endpoint)
+        if route is None:
+            return self._json(404, {"error": {"message": f"Unknown path {self.path}"}})
+        backend = self.server.backend
+        backend.wait()
+        if backend.should_fail(endpoint):
+            return self._json(backend.error_status, {
+                "error": {
+                    "code": backend.error_status,
+                    "message": "Injected error",
+                    "type": "server_error",
+                },
+            })
+        route(body)
+
+    def _chat_completions(self, body: bytes):
+        request = json.loads(body)
+        reply = self.server.backend.chat_reply(request["messages"])
+        prompt = " ".join(m.get("content") or "" for m in request["messages"])
+        self._json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": "stop",
+            }],
+            "usage": _usage(prompt, reply),
+        })
+
+    def _completions(self, body: bytes):
+        request = json.loads(body)
+        prompts = request["prompt"] if isinstance(request["prompt"], list) else [request["prompt"]]
+        texts = [self.server.backend.text() for _ in prompts]
+        self._json(200, {
+            "id": f"cmpl-{uuid.uuid4().hex}",
+            "object": "text_completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [
+                {"index": i, "text": text, "logprobs": None, "finish_reason": "stop"}
+                for i, text in enumerate(texts)
+            ],
+            "usage": _usage("".join(prompts), "".join(texts)),
+        })
+
+    def _transcriptions(self, body: bytes):
+        self._json(200, {"text": self.server.backend.text()})
+
+    def _images(self, body: bytes):
+        request = json.loads(body)
+        host = self.headers.get("Host", f"{self.server.server_address[0]}:{self.server.server_port}")
+        self._json(200, {
+            "created": int(time.time()),
+            "data": [
+                {"url": f"http://{host}/files/{uuid.uuid4().hex}.png"}
+                for _ in range(request.get("n", 1))
+            ],
+        })
+
+    def _synthesize(self, body: bytes):
+        audio = base64.b64encode(self.server.backend.audio).decode("ascii")
+        self._json(200, {"audioContent": audio})
+
+    def _json(self, status: int, payload: Dict[str, Any]):
+        self._reply(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+    def _reply(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, backend: FakeBackend, host: str = "127.0.0.1", port: int = 0):
+        """Port 0 picks a free port, read it back from ``url``."""
+        super().__init__((host, port), _Handler)
+        self.backend = backend
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeServer":
+        """Serve from a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def add_backend_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="mean latency of each request")
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of failing requests")
+    parser.add_argument("--error-status", type=int, default=500, choices=[429, 500, 503])
+    parser.add_argument("--text-words", type=int, default=30, help="words in the generated texts")
+    parser.add_argument("--blob-kb", type=float, default=64.0, help="size of the images and audio")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def backend_from_arguments(args: argparse.Namespace) -> FakeBackend:
+    return FakeBackend(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        text_words=args.text_words,
+        blob_bytes=int(args.blob_kb * 1024),
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m genai_core.fake_server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    add_backend_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeServer(backend_from_arguments(args), host=args.host, port=args.port)
+    print(f"Fake backend listening on {server.url}, set GENAI_BACKEND_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
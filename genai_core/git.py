@@ -0,0 +1,22 @@
+"""Authentication of the git commands talking to a GitHub remote."""
+import base64
+import os
+from typing import Dict, Optional
+
+
+def auth_env(token: Optional[str]) -> Optional[Dict[str, str]]:
+    """Environment of a git command sending ``token`` as an HTTP header, None
+    without a token.
+
+    The header is configuration from the environment, so the token is neither
+    written in the repository config nor shown in the command line by ps.
+    """
+    if not token:
+        return None
+    credentials = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+    return {
+        **os.environ,
+        "GIT_CONFIG_COUNT": "1",
+        "GIT_CONFIG_KEY_0": "http.extraHeader",
+        "GIT_CONFIG_VALUE_0": f"Authorization: Basic {credentials}",
+    }
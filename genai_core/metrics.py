@@ -0,0 +1,69 @@
+"""Per-model latency, token and payload counters."""
+import threading
+from dataclasses import dataclass, field
+from typing import Dict
+
+
+@dataclass
+class ModelMetrics:
+    name: str
+    calls: int = 0
+    errors: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    payload_bytes: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(
+            self,
+            latency: float,
+            prompt_tokens: int = 0,
+            completion_tokens: int = 0,
+            payload_bytes: int = 0,
+            error: bool = False,
+    ) -> None:
+        with self._lock:
+            self.calls += 1
+            self.errors += int(error)
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.payload_bytes += payload_bytes
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.calls if self.calls else 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "total_latency": self.total_latency,
+                "mean_latency": self.mean_latency,
+                "max_latency": self.max_latency,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "payload_bytes": self.payload_bytes,
+            }
+
+
+_registry: Dict[str, ModelMetrics] = {}
+_registry_lock = threading.Lock()
+
+
+def get_metrics(name: str) -> ModelMetrics:
+    """Metrics shared by all the instances of the model called ``name``."""
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = ModelMetrics(name)
+        return _registry[name]
+
+
+def metrics_snapshot() -> Dict[str, Dict[str, float]]:
+    with _registry_lock:
+        metrics = list(_registry.values())
+    return {m.name: m.snapshot() for m in metrics}
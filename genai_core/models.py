@@ -0,0 +1,158 @@
+import os
+import time
+from abc import abstractmethod, ABC
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+
+from genai_core.audio import AudioSource, audio_upload, describe_audio
+from genai_core.client import RETRYABLE_ERRORS, call_with_retries, get_openai_client
+from genai_core.metrics import ModelMetrics, get_metrics
+from genai_core.speech import LocalSpeechBackend, get_speech_backend
+from genai_core.telemetry import Lazy, get_logger, get_verbose_logger, log_call, truncate
+
+
+class BaseGenerativeModel(ABC):
+    """Base class for every model calling a remote generative API.
+
+    Requests must go through ``_request`` to share the pooled client, the
+    retry policy, the concurrency limit, the per-model metrics and the
+    per-call log records. ``verbose`` enables the DEBUG records of the model.
+    """
+
+    def __init__(self, verbose: bool = False):
+        self.verbose = verbose
+        self.metrics: ModelMetrics = get_metrics(type(self).__name__)
+        name = f"models.{type(self).__name__}"
+        self.logger = get_verbose_logger(name) if verbose else get_logger(name)
+
+    @property
+    def client(self):
+        return get_openai_client()
+
+    def __call__(self, *args, **kwargs):
+        return self.run(*args, **kwargs)
+
+    @abstractmethod
+    def run(self, *args, **kwargs):
+        raise NotImplementedError
+
+    def _request(
+            self,
+            function: Callable[..., Any],
+            *args,
+            retry_on: Tuple[Type[Exception], ...] = RETRYABLE_ERRORS,
+            payload_bytes: int = 0,
+            **kwargs,
+    ) -> Any:
+        """``payload_bytes`` is the size of the uploaded or generated media, if any."""
+        return self._measure(
+            call_with_retries, function, *args,
+            retry_on=retry_on, payload_bytes=payload_bytes, **kwargs,
+        )
+
+    def _measure(
+            self,
+            function: Callable[..., Any],
+            *args,
+            payload_bytes: Union[int, Callable[[Any], int]] = 0,
+            **kwargs,
+    ) -> Any:
+        """Call ``function`` once, recording its metrics and its log record.
+        The on-device backends call it directly, they have nothing to retry.
+        ``payload_bytes`` can be a function of the response, for generated media."""
+        name = type(self).__name__
+        start = time.perf_counter()
+        try:
+            response = function(*args, **kwargs)
+        except Exception as e:
+            latency = time.perf_counter() - start
+            payload_bytes = 0 if callable(payload_bytes) else payload_bytes
+            self.metrics.record(latency, payload_bytes=payload_bytes, error=True)
+            log_call(self.logger, name, latency, payload_bytes=payload_bytes, error=e)
+            raise
+        latency = time.perf_counter() - start
+        if callable(payload_bytes):
+            payload_bytes = payload_bytes(response)
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        self.metrics.record(
+            latency,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            payload_bytes=payload_bytes,
+        )
+        log_call(self.logger, name, latency, prompt_tokens, completion_tokens, payload_bytes)
+        return response
+
+
+class WhisperModel(BaseGenerativeModel):
+    def __init__(
+            self,
+            model_name: str,
+            target_sample_rate: Optional[int] = None,
+            audio_format: Optional[str] = None,
+            verbose: bool = False,
+            backend: Union[str, LocalSpeechBackend, None] = None,
+            backend_options: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        ``backend`` is "api" for the OpenAI API, the name of an on-device
+        backend of ``genai_core.speech`` or a backend instance. It defaults to
+        the ``GENAI_WHISPER_BACKEND`` environment variable, then to "api".
+        ``model_name`` only applies to the API, the on-device model is chosen
+        with ``backend_options``, e.g. ``{"model_size": "small"}``.
+        """
+        super().__init__(verbose=verbose)
+        self.model = model_name
+        self.target_sample_rate = target_sample_rate
+        self.audio_format = audio_format
+        backend = backend or os.environ.get("GENAI_WHISPER_BACKEND") or "api"
+        if isinstance(backend, str) and backend != "api":
+            backend = get_speech_backend(backend, **(backend_options or {}))
+        self.backend: Optional[LocalSpeechBackend] = None if backend == "api" else backend
+
+    def run(self, audio: AudioSource, sample_rate: Optional[int] = None):
+        self.logger.debug("Transcribing audio: %s", Lazy(lambda: describe_audio(audio)))
+        if self.backend is not None:
+            return self._run_local([audio], sample_rate)[0]
+        with audio_upload(
+            audio,
+            sample_rate=sample_rate,
+            target_sample_rate=self.target_sample_rate,
+            audio_format=self.audio_format,
+        ) as upload:
+            transcript = self._request(
+                self._transcribe, upload, payload_bytes=_upload_size(upload[1])
+            )
+        self.logger.debug("Transcript: %s", truncate(transcript.text))
+        return transcript.text
+
+    def run_batch(self, audios: List[AudioSource], sample_rate: Optional[int] = None) -> List[str]:
+        """Transcripts of several clips, transcribed concurrently."""
+        if not audios:
+            return []
+        if self.backend is not None:
+            return self._run_local(audios, sample_rate)
+        with ThreadPoolExecutor(max_workers=len(audios)) as executor:
+            return list(executor.map(lambda audio: self.run(audio, sample_rate), audios))
+
+    def _run_local(self, audios: List[AudioSource], sample_rate: Optional[int]) -> List[str]:
+        transcripts = self._measure(self.backend.transcribe_batch, audios, sample_rate)
+        for transcript in transcripts:
+            self.logger.debug("Transcript: %s", truncate(transcript))
+        return transcripts
+
+    def _transcribe(self, upload):
+        # a retry must re-send the audio from the start
+        upload[1].seek(0)
+        return self.client.audio.transcriptions.create(model=self.model, file=upload)
+
+
+def _upload_size(file) -> int:
+    # works for the in-memory buffers and the mmapped files of ``audio_upload``
+    position = file.tell()
+    file.seek(0, 2)
+    size = file.tell()
+    file.seek(position)
+    return size
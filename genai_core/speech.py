@@ -0,0 +1,161 @@
+"""On-device speech recognition backends of ``WhisperModel``.
+
+A backend runs the speech model in process instead of calling the API. The
+model is loaded once per process and shared by every ``WhisperModel`` using
+the same backend options, and transcriptions run on a pool of workers sized
+to the CPU cores. Clips submitted together, or queued by concurrent requests,
+are spread over the workers.
+
+Backends:
+    faster-whisper  quantized Whisper on CTranslate2, pip install faster-whisper
+
+Select one with ``WhisperModel(..., backend="faster-whisper")`` or for every
+model with the ``GENAI_WHISPER_BACKEND`` environment variable.
+"""
+import os
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import numpy as np
+
+from genai_core.audio import WHISPER_SAMPLE_RATE, AudioSource, load_samples
+from genai_core.telemetry import get_logger
+
+logger = get_logger("speech")
+
+
+class LocalSpeechBackend(ABC):
+    """Speech recognition engine running in this process."""
+
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Parameters:
+            workers(int): transcriptions running at the same time, by default
+                one per two cores, each of them using the cores left
+        """
+        cores = os.cpu_count() or 1
+        self.workers = workers or max(1, cores // 2)
+        self.cpu_threads = max(1, cores // self.workers)
+        self._engine = None
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="speech")
+
+    @abstractmethod
+    def _load(self) -> Any:
+        """Load the model, called once."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _transcribe(self, engine: Any, samples: np.ndarray) -> str:
+        """Transcribe 16kHz float32 mono samples."""
+        raise NotImplementedError
+
+    def _samples(self, audio: AudioSource, sample_rate: Optional[int]) -> np.ndarray:
+        return load_samples(audio, sample_rate, WHISPER_SAMPLE_RATE)
+
+    @property
+    def engine(self) -> Any:
+        with self._lock:
+            if self._engine is None:
+                logger.info("Loading %s with %d workers", type(self).__name__, self.workers)
+                self._engine = self._load()
+            return self._engine
+
+    def load(self) -> None:
+        """Load the model now instead of on the first transcription, e.g. at startup."""
+        self.engine
+
+    def submit(self, audio: AudioSource, sample_rate: Optional[int] = None) -> "Future[str]":
+        # decoded in the caller thread, the workers only run the model
+        samples = self._samples(audio, sample_rate)
+        engine = self.engine
+        return self._pool.submit(self._transcribe, engine, samples)
+
+    def transcribe(self, audio: AudioSource, sample_rate: Optional[int] = None) -> str:
+        return self.submit(audio, sample_rate).result()
+
+    def transcribe_batch(self, audios: List[AudioSource], sample_rate: Optional[int] = None) -> List[str]:
+        """Transcripts of the clips in order, transcribed by all the workers."""
+        futures = [self.submit(audio, sample_rate) for audio in audios]
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+
+class FasterWhisperBackend(LocalSpeechBackend):
+    def __init__(
+            self,
+            model_size: str = "base",
+            compute_type: str = "int8",
+            beam_size: int = 1,
+            language: Optional[str] = None,
+            workers: Optional[int] = None,
+    ):
+        """
+        Parameters:
+            model_size(str): name of a faster-whisper model, e.g. "tiny", "base",
+                "small", or the path of a converted model
+            compute_type(str): quantization of the weights, int8 is the fastest on CPU
+            beam_size(int): 1 is greedy decoding, the fastest
+            language(str): language code of the speech, detected when None
+        """
+        super().__init__(workers=workers)
+        self.model_size = model_size
+        self.compute_type = compute_type
+        self.beam_size = beam_size
+        self.language = language
+
+    def _load(self) -> Any:
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise ImportError(
+                "The faster-whisper backend requires the faster-whisper package: "
+                "pip install faster-whisper"
+            ) from e
+        return WhisperModel(
+            self.model_size,
+            device="cpu",
+            compute_type=self.compute_type,
+            cpu_threads=self.cpu_threads,
+            # one model replica per worker, so the transcriptions run in parallel
+            num_workers=self.workers,
+        )
+
+    def _samples(self, audio: AudioSource, sample_rate: Optional[int]) -> np.ndarray:
+        try:
+            return super()._samples(audio, sample_rate)
+        except ValueError:
+            if isinstance(audio, np.ndarray):
+                raise
+            # compressed audio, e.g. mp3, decoded with the ffmpeg libraries of faster-whisper
+            from faster_whisper import decode_audio
+            return decode_audio(audio, sampling_rate=WHISPER_SAMPLE_RATE)
+
+    def _transcribe(self, engine: Any, samples: np.ndarray) -> str:
+        segments, _ = engine.transcribe(
+            samples, beam_size=self.beam_size, language=self.language, vad_filter=False
+        )
+        # segments are generated lazily, decoding happens here
+        return "".join(segment.text for segment in segments).strip()
+
+
+BACKENDS: Dict[str, Type[LocalSpeechBackend]] = {
+    "faster-whisper": FasterWhisperBackend,
+}
+_backends: Dict[Tuple, LocalSpeechBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_speech_backend(name: str, **options) -> LocalSpeechBackend:
+    """Backend shared by every caller asking for the same name and options."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown speech backend {name}, choose among {sorted(BACKENDS)}")
+    key = (name, tuple(sorted(options.items())))
+    with _backends_lock:
+        if key not in _backends:
+            _backends[key] = BACKENDS[name](**options)
+        return _backends[key]
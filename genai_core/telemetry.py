@@ -0,0 +1,182 @@
+"""Structured, low-overhead logging shared by the models and the agent.
+
+Every logger lives under the ``genai`` namespace. ``configure_logging``
+sends their records through a queue to a background thread, so a request
+never waits for the log output, and samples the records below WARNING.
+
+Models log one compact record per API call (model, latency, tokens, bytes)
+with ``log_call``; payloads are only logged at DEBUG, truncated and
+formatted lazily, i.e. only when the record is actually emitted.
+
+Environment variables, read by ``configure_logging``:
+    GENAI_LOG_LEVEL        WARNING by default
+    GENAI_LOG_SAMPLE_RATE  fraction of the records below WARNING kept, 1.0 by default
+    GENAI_LOG_FORMAT       "text" (default) or "json"
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Optional, TextIO
+
+ROOT_LOGGER = "genai"
+_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def get_verbose_logger(name: str) -> logging.Logger:
+    """Logger of the objects created with ``verbose``, emitting their DEBUG records.
+
+    The level is set on a child of ``name``, the other objects logging to
+    ``name`` keep its level. Logging is configured with the defaults when the
+    application has not configured it, so the records are shown.
+    """
+    logger = get_logger(f"{name}.verbose")
+    logger.setLevel(logging.DEBUG)
+    if not logging.getLogger(ROOT_LOGGER).handlers and not logging.getLogger().handlers:
+        configure_logging()
+    return logger
+
+
+class Lazy:
+    """Defers an expensive log argument until the record is formatted."""
+
+    __slots__ = ("function",)
+
+    def __init__(self, function: Callable[[], Any]):
+        self.function = function
+
+    def __str__(self) -> str:
+        return str(self.function())
+
+
+def truncate(value: Any, limit: int = 200) -> Lazy:
+    """Lazy, truncated string of ``value``, for payloads logged at DEBUG."""
+    def shorten() -> str:
+        text = str(value)
+        if len(text) <= limit:
+            return text
+        return f"{text[:limit]}... ({len(text)} chars)"
+    return Lazy(shorten)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a ``rate`` fraction of the records below WARNING."""
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or self.rate >= 1.0 or random.random() < self.rate
+
+
+class StructuredFormatter(logging.Formatter):
+    """Appends the ``fields`` of a record as key=value pairs, or renders it as JSON."""
+
+    def __init__(self, json_lines: bool = False):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+        self.json_lines = json_lines
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "fields", None) or {}
+        if self.json_lines:
+            return json.dumps({
+                "time": record.created,
+                "level": record.levelname,
+                "logger": record.name,
+                "message": record.getMessage(),
+                **fields,
+            }, default=str)
+        line = super().format(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class _PreformattedQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # keep ``fields`` and the lazy arguments, they are formatted by the
+        # listener thread instead of the caller
+        return record
+
+
+def configure_logging(
+        level: Optional[str] = None,
+        sample_rate: Optional[float] = None,
+        json_lines: Optional[bool] = None,
+        stream: Optional[TextIO] = None,
+) -> None:
+    """Route the ``genai`` loggers through a background thread.
+
+    Arguments left to None are read from the environment. Calling it again
+    replaces the previous configuration.
+    """
+    global _listener
+    level = level or os.environ.get("GENAI_LOG_LEVEL", "WARNING")
+    if sample_rate is None:
+        sample_rate = float(os.environ.get("GENAI_LOG_SAMPLE_RATE", "1.0"))
+    if json_lines is None:
+        json_lines = os.environ.get("GENAI_LOG_FORMAT", "text") == "json"
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(StructuredFormatter(json_lines=json_lines))
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = _PreformattedQueueHandler(records)
+    # sample before queueing, so dropped records cost nothing downstream
+    handler.addFilter(SamplingFilter(sample_rate))
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+        for previous in list(logger.handlers):
+            logger.removeHandler(previous)
+        logger.addHandler(handler)
+        logger.setLevel(level.upper())
+        logger.propagate = False
+        _listener = QueueListener(records, output, respect_handler_level=True)
+        _listener.start()
+
+
+def _stop_listener() -> None:
+    if _listener is not None:
+        # flushes the records still in the queue
+        _listener.stop()
+
+
+atexit.register(_stop_listener)
+
+
+def log_call(
+        logger: logging.Logger,
+        model: str,
+        latency: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        payload_bytes: int = 0,
+        error: Optional[BaseException] = None,
+) -> None:
+    """One compact INFO record per API call, WARNING when it failed."""
+    level = logging.WARNING if error is not None else logging.INFO
+    if not logger.isEnabledFor(level):
+        return
+    fields = {
+        "model": model,
+        "latency_ms": round(1000 * latency, 1),
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "bytes": payload_bytes,
+    }
+    if error is not None:
+        fields["error"] = type(error).__name__
+    logger.log(level, "api call", extra={"fields": fields})
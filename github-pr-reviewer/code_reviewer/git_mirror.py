@@ -0,0 +1,192 @@
+"""Local bare mirrors of the reviewed repositories.
+
+The reviewer reads the full files of a pull request and its diff from git
+objects instead of the REST API: a mirror is cloned once per repository,
+then only the missing commits are fetched. Any git remote works, including
+``file://`` ones. An access token is sent as an HTTP header by the commands
+fetching from the remote, it is never written in the mirrors.
+"""
+import codecs
+import hashlib
+import os
+import re
+import subprocess
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from genai_core.git import auth_env
+from genai_core.telemetry import get_logger
+
+logger = get_logger("code_reviewer.git_mirror")
+
+
+class GitError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class FileChange:
+    """A changed file, with the attributes of PyGithub's ``File`` used by the reviewer."""
+    filename: str
+    status: str
+    patch: str
+    previous_filename: Optional[str] = None
+
+
+def _git(
+        *args: str, cwd: Optional[str] = None, input: Optional[bytes] = None, token: Optional[str] = None
+) -> bytes:
+    result = subprocess.run(
+        ["git", "-c", "core.quotePath=false", *args],
+        cwd=cwd,
+        input=input,
+        capture_output=True,
+        env=auth_env(token),
+    )
+    if result.returncode != 0:
+        raise GitError(f"git {' '.join(args)} failed: {result.stderr.decode(errors='replace').strip()}")
+    return result.stdout
+
+
+def _path(text: str, prefix: str = "") -> str:
+    """Path of a diff header, without the trailing tab git appends to paths
+    with spaces, unquoted when git quoted it for its special characters."""
+    text = text.rstrip("\t")
+    if text.startswith('"') and text.endswith('"'):
+        text = codecs.escape_decode(text[1:-1].encode("utf-8"))[0].decode("utf-8", errors="replace")
+    return text[len(prefix):] if prefix and text.startswith(prefix) else text
+
+
+def parse_diff(diff: str) -> List[FileChange]:
+    """Split a ``git diff`` into per-file changes, the patches start at the
+    first hunk as the ones of the GitHub API."""
+    changes = []
+    for block in re.split(r"^diff --git ", diff, flags=re.MULTILINE)[1:]:
+        lines = block.split("\n")
+        status, filename, previous = "modified", None, None
+        hunk_start = len(lines)
+        for i, line in enumerate(lines):
+            if line.startswith("@@"):
+                hunk_start = i
+                break
+            if line.startswith("new file mode"):
+                status = "added"
+            elif line.startswith("deleted file mode"):
+                status = "removed"
+            elif line.startswith("rename from "):
+                status, previous = "renamed", _path(line[len("rename from "):])
+            elif line.startswith("rename to "):
+                filename = _path(line[len("rename to "):])
+            elif line.startswith("+++ ") and line != "+++ /dev/null":
+                filename = _path(line[len("+++ "):], "b/")
+            elif line.startswith("--- ") and line != "--- /dev/null" and filename is None:
+                filename = _path(line[len("--- "):], "a/")
+        if filename is None:
+            # binary or mode only changes, the paths are in the header
+            header = lines[0]
+            if header.endswith('"'):
+                filename = _path(header[header.rindex(' "b/') + 1:], "b/")
+            else:
+                filename = header.split(" b/", 1)[-1]
+        patch = "\n".join(lines[hunk_start:]).rstrip("\n")
+        changes.append(FileChange(filename, status, patch, previous))
+    return changes
+
+
+class GitMirror:
+    def __init__(self, cache_dir: str):
+        """
+        Parameters:
+            cache_dir(str): directory of the bare mirrors, one per remote
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def path(self, remote_url: str) -> str:
+        # credentials in the url must not leak in the directory name
+        public_url = re.sub(r"//[^/@]*@", "//", remote_url)
+        name = os.path.basename(public_url.rstrip("/")).removesuffix(".git")
+        digest = hashlib.sha1(public_url.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.cache_dir, f"{name}-{digest}.git")
+
+    def _lock(self, remote_url: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(self.path(remote_url), threading.Lock())
+
+    def sync(self, remote_url: str, token: Optional[str] = None) -> str:
+        """Clone the mirror or fetch what changed since the last sync."""
+        path = self.path(remote_url)
+        with self._lock(remote_url):
+            if not os.path.exists(path):
+                logger.info("Cloning mirror into %s", path)
+                _git("clone", "--mirror", "--quiet", remote_url, path, token=token)
+            else:
+                _git("remote", "set-url", "origin", remote_url, cwd=path)
+                _git("fetch", "--prune", "--quiet", "origin", cwd=path, token=token)
+        return path
+
+    def has_commit(self, path: str, sha: str) -> bool:
+        try:
+            _git("cat-file", "-e", f"{sha}^{{commit}}", cwd=path)
+            return True
+        except GitError:
+            return False
+
+    def ensure_commits(self, remote_url: str, *shas: str, token: Optional[str] = None) -> str:
+        """Make sure the commits are in the mirror, fetching only when one is missing."""
+        path = self.path(remote_url)
+        if os.path.exists(path) and all(self.has_commit(path, sha) for sha in shas):
+            return path
+        self.sync(remote_url, token)
+        missing = [sha for sha in shas if not self.has_commit(path, sha)]
+        if missing:
+            # not reachable from the mirrored refs, e.g. the head of a fork
+            with self._lock(remote_url):
+                _git("fetch", "--quiet", "origin", *missing, cwd=path, token=token)
+        return path
+
+    def diff(
+            self, remote_url: str, base_sha: str, head_sha: str, token: Optional[str] = None
+    ) -> List[FileChange]:
+        """Changes of ``head_sha`` since its merge base with ``base_sha``, as in a PR."""
+        path = self.ensure_commits(remote_url, base_sha, head_sha, token=token)
+        diff = _git("diff", "--no-color", "--no-ext-diff", "-M", f"{base_sha}...{head_sha}", cwd=path)
+        return parse_diff(diff.decode("utf-8", errors="replace"))
+
+    def merge_base(self, remote_url: str, base_sha: str, head_sha: str, token: Optional[str] = None) -> str:
+        """The commit ``head_sha`` branched from, where ``diff`` starts."""
+        path = self.ensure_commits(remote_url, base_sha, head_sha, token=token)
+        return _git("merge-base", base_sha, head_sha, cwd=path).decode().strip()
+
+    def read_files(
+            self, remote_url: str, sha: str, paths: List[str], token: Optional[str] = None
+    ) -> Dict[str, Optional[str]]:
+        """Contents of ``paths`` at ``sha`` in a single git call, None for
+        missing or binary files."""
+        path = self.ensure_commits(remote_url, sha, token=token)
+        if not paths:
+            return {}
+        output = _git(
+            "cat-file", "--batch", cwd=path,
+            input="".join(f"{sha}:{file_path}\n" for file_path in paths).encode("utf-8"),
+        )
+        contents: Dict[str, Optional[str]] = {}
+        position = 0
+        for file_path in paths:
+            header_end = output.index(b"\n", position)
+            header = output[position:header_end].split()
+            position = header_end + 1
+            if header[-1] in (b"missing", b"ambiguous"):
+                contents[file_path] = None
+                continue
+            size = int(header[2])
+            content = output[position:position + size]
+            position += size + 1
+            if header[1] != b"blob" or b"\0" in content:
+                contents[file_path] = None
+            else:
+                contents[file_path] = content.decode("utf-8", errors="replace")
+        return contents
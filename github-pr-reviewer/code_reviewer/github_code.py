@@ -1,30 +1,82 @@
 from github import Github
 
+from code_reviewer.prioritizer import REVIEWED_STATUSES, ReviewBudget, ReviewScheduler
 from code_reviewer.reviewer import CodeReviewer
+from genai_core.telemetry import get_logger
+
+logger = get_logger("code_reviewer.github")
 
 class GithubAPI:
-    def __init__(self, access_token, verbose=False):
-        self.g = Github(access_token)
+    def __init__(self, access_token, verbose=False, github=None, mirror=None, budget=None):
+        """
+        ``github`` replaces the PyGithub client, e.g. with ``LocalGithub``.
+        With a ``GitMirror``, the diff and the full files come from a local
+        mirror of the repository instead of the API, and the reviewer sees
+        the whole file of every patch. The files are reviewed by priority
+        within the ``ReviewBudget``, unbounded by default.
+        """
+        self.access_token = access_token
+        self.g = github if github is not None else Github(access_token)
+        self.mirror = mirror
+        self.scheduler = ReviewScheduler(budget or ReviewBudget())
         self.code_reviewer = CodeReviewer(verbose=verbose)
-    
-    def write_comments_for_pr(self, repo_name, pr_number):
+
+    def write_comments_for_pr(self, repo_name, pr_number, head_sha=None):
+        """Review the files of the PR, at ``head_sha`` when given.
+
+        The comments are posted together as a single PR review once every
+        file is reviewed, so a failed review posts nothing and can be retried.
+        Returns the ``ReviewReport``, its summary is the body of the review.
+        """
         repo = self.g.get_repo(repo_name)
         pr = repo.get_pull(pr_number)
-        commit = repo.get_commit(pr.head.sha)
-        files = pr.get_files()
-        for file in files:
-            if file.status == 'added' or file.status == 'modified':
-                comments = self.code_reviewer(file.filename, file.patch)
-                # Since the memory has not been fully implemented yet,
-                #  we reset the state of the model after each file.
-                self.code_reviewer.reset()
-                for filename, position, comment in comments:
-                    pr.create_review_comment(body=comment, commit_id=commit, path=filename, position=position-1)
-        return 200
+        head_sha = head_sha or pr.head.sha
+        commit = repo.get_commit(head_sha)
+        contexts = {}
+        if self.mirror is None:
+            files = pr.get_files()
+        else:
+            # the token is sent to the remote by the mirror, not stored in its url
+            remote_url, token = repo.clone_url, self.access_token
+            files = self.mirror.diff(remote_url, pr.base.sha, head_sha, token)
+            # only the files the scheduler may review, the others are skipped
+            reviewed = [
+                file.filename for file in files
+                if file.filename.endswith('.py') and file.status in REVIEWED_STATUSES
+            ]
+            contexts = self.mirror.read_files(remote_url, head_sha, reviewed, token)
+        selected, report = self.scheduler.plan(files, contexts)
+        review_comments = []
+        for priority in self.scheduler.run(selected, report):
+            file = priority.file
+            comments = self.code_reviewer(
+                file.filename, file.patch, context=contexts.get(file.filename)
+            )
+            # Since the memory has not been fully implemented yet,
+            #  we reset the state of the model after each file.
+            self.code_reviewer.reset()
+            for filename, position, comment in comments:
+                review_comments.append({"path": filename, "position": position - 1, "body": comment})
+        logger.info("pr review", extra={"fields": {
+            "repository": repo_name,
+            "pr": pr_number,
+            "reviewed": len(report.reviewed),
+            "skipped": len(report.skipped),
+            "estimated_tokens": report.estimated_tokens,
+            "elapsed_s": round(report.elapsed, 1),
+        }})
+        if review_comments or report.over_budget:
+            pr.create_review(
+                commit=commit, body=report.summary(), event="COMMENT", comments=review_comments
+            )
+        return report
 
 
 if __name__ == '__main__':
     import os
-    
+
+    from genai_core.telemetry import configure_logging
+
+    configure_logging(level="DEBUG")
     api = GithubAPI(os.environ['GITHUB_ACCESS_TOKEN'], verbose=True)
     api.write_comments_for_pr('diegofiori/generative-playground', 1)
@@ -0,0 +1,204 @@
+"""Persistent queue of review jobs, backed by SQLite.
+
+A job reviews one pull request at one head commit. Jobs are unique per
+``(repository, pr_number, head_sha)``, so the same commit is reviewed once
+however many times it is submitted, and queued jobs of older commits of the
+same pull request are superseded by a newer one. A failed job is queued
+again after an exponential backoff, until it ran ``max_attempts`` times.
+"""
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+SUPERSEDED = "superseded"
+
+
+@dataclass(frozen=True)
+class ReviewJob:
+    id: int
+    repository: str
+    pr_number: int
+    head_sha: str
+    attempts: int
+    enqueued_at: float
+
+
+class ReviewJobQueue:
+    def __init__(self, path: str, max_attempts: int = 3, retry_delay: float = 30.0):
+        """
+        Parameters:
+            path(str): SQLite file of the queue, created if missing
+            max_attempts(int): a failing job is retried until it ran this many times
+            retry_delay(float): seconds before the first retry of a failing job,
+                doubled at every attempt
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "repository TEXT NOT NULL, "
+                "pr_number INTEGER NOT NULL, "
+                "head_sha TEXT NOT NULL, "
+                "status TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "enqueued_at REAL NOT NULL, "
+                "started_at REAL, "
+                "finished_at REAL, "
+                "error TEXT, "
+                "available_at REAL NOT NULL DEFAULT 0, "
+                "UNIQUE (repository, pr_number, head_sha))"
+            )
+            columns = [row[1] for row in self._connection.execute("PRAGMA table_info(jobs)")]
+            if "available_at" not in columns:
+                # queue created before the retries were delayed
+                self._connection.execute(
+                    "ALTER TABLE jobs ADD COLUMN available_at REAL NOT NULL DEFAULT 0"
+                )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id)"
+            )
+            # jobs running when the previous process died are run again
+            self._connection.execute(
+                "UPDATE jobs SET status = ? WHERE status = ?", (QUEUED, RUNNING)
+            )
+
+    def enqueue(self, repository: str, pr_number: int, head_sha: str) -> Optional[int]:
+        """Queue a review, returns the job id or None if the commit is already
+        queued, running or reviewed."""
+        with self._available, self._connection:
+            row = self._connection.execute(
+                "SELECT id, status FROM jobs WHERE repository = ? AND pr_number = ? AND head_sha = ?",
+                (repository, pr_number, head_sha),
+            ).fetchone()
+            if row is not None and row[1] not in (FAILED, SUPERSEDED):
+                return None
+            now = time.time()
+            if row is None:
+                job_id = self._connection.execute(
+                    "INSERT INTO jobs (repository, pr_number, head_sha, status, enqueued_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (repository, pr_number, head_sha, QUEUED, now),
+                ).lastrowid
+            else:
+                job_id = row[0]
+                self._connection.execute(
+                    "UPDATE jobs SET status = ?, attempts = 0, enqueued_at = ?, started_at = NULL, "
+                    "finished_at = NULL, error = NULL, available_at = 0 WHERE id = ?",
+                    (QUEUED, now, job_id),
+                )
+            self._connection.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? "
+                "WHERE repository = ? AND pr_number = ? AND status = ? AND id != ?",
+                (SUPERSEDED, now, repository, pr_number, QUEUED, job_id),
+            )
+            self._available.notify()
+            return job_id
+
+    def claim(self, timeout: Optional[float] = None) -> Optional[ReviewJob]:
+        """Take the oldest queued job whose retry delay is over, waiting up to
+        ``timeout`` seconds for one."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._available:
+            while True:
+                with self._connection:
+                    row = self._connection.execute(
+                        "SELECT id, repository, pr_number, head_sha, attempts, enqueued_at "
+                        "FROM jobs WHERE status = ? AND available_at <= ? ORDER BY id LIMIT 1",
+                        (QUEUED, time.time()),
+                    ).fetchone()
+                    if row is not None:
+                        self._connection.execute(
+                            "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1 "
+                            "WHERE id = ?",
+                            (RUNNING, time.time(), row[0]),
+                        )
+                        return ReviewJob(*row[:4], attempts=row[4] + 1, enqueued_at=row[5])
+                    next_retry = self._connection.execute(
+                        "SELECT MIN(available_at) FROM jobs WHERE status = ?", (QUEUED,)
+                    ).fetchone()[0]
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                if next_retry is not None:
+                    # a delayed retry, nothing notifies when it becomes available
+                    until_retry = max(0.0, next_retry - time.time())
+                    remaining = until_retry if remaining is None else min(remaining, until_retry)
+                self._available.wait(remaining)
+
+    def complete(self, job: ReviewJob) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = NULL WHERE id = ?",
+                (DONE, time.time(), job.id),
+            )
+
+    def fail(self, job: ReviewJob, error: str) -> None:
+        """Mark the job as failed, or queue it again after the retry delay if
+        it has attempts left."""
+        status = QUEUED if job.attempts < self.max_attempts else FAILED
+        now = time.time()
+        available_at = now + self.retry_delay * 2 ** (job.attempts - 1)
+        with self._available, self._connection:
+            self._connection.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ?, available_at = ? WHERE id = ?",
+                (status, now, error, available_at, job.id),
+            )
+            if status == QUEUED:
+                self._available.notify()
+
+    def stats(self, window: float = 300.0) -> Dict[str, float]:
+        """Job counts by status, latencies of the last jobs and the throughput
+        over the last ``window`` seconds."""
+        now = time.time()
+        with self._lock:
+            counts = dict(self._connection.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall())
+            rows = self._connection.execute(
+                "SELECT finished_at - enqueued_at, finished_at - started_at FROM jobs "
+                "WHERE status = ? ORDER BY finished_at DESC LIMIT 1000",
+                (DONE,),
+            ).fetchall()
+            recent = self._connection.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND finished_at >= ?",
+                (DONE, now - window),
+            ).fetchone()[0]
+        latencies = [row[0] for row in rows]
+        durations = [row[1] for row in rows]
+        return {
+            "queue_depth": counts.get(QUEUED, 0),
+            "running": counts.get(RUNNING, 0),
+            "done": counts.get(DONE, 0),
+            "failed": counts.get(FAILED, 0),
+            "superseded": counts.get(SUPERSEDED, 0),
+            "latency_p50": _percentile(latencies, 50),
+            "latency_p95": _percentile(latencies, 95),
+            "review_duration_p50": _percentile(durations, 50),
+            "throughput_per_minute": 60 * recent / window,
+        }
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def _percentile(values: List[float], q: int) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
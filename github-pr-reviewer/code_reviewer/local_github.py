@@ -0,0 +1,109 @@
+"""In-memory stand-in for the parts of PyGithub used by ``GithubAPI``.
+
+Pull requests are added with ``add_pull`` and the review comments written on
+them are kept in ``LocalPullRequest.comments``, so the review service can be
+exercised without GitHub. Pass it as ``GithubAPI(None, github=LocalGithub())``.
+"""
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class LocalFile:
+    filename: str
+    patch: str
+    status: str = "modified"
+
+
+@dataclass
+class LocalCommit:
+    sha: str
+
+
+@dataclass
+class LocalPullRequest:
+    number: int
+    head: LocalCommit
+    files: List[LocalFile]
+    base: Optional[LocalCommit] = None
+    comments: List[Dict] = field(default_factory=list)
+    issue_comments: List[str] = field(default_factory=list)
+    reviews: List[str] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def get_files(self) -> List[LocalFile]:
+        return list(self.files)
+
+    def create_review_comment(self, body: str, commit_id, path: str, position: int) -> None:
+        with self._lock:
+            self.comments.append({
+                "body": body,
+                "commit_id": commit_id.sha,
+                "path": path,
+                "position": position,
+            })
+
+    def create_issue_comment(self, body: str) -> None:
+        with self._lock:
+            self.issue_comments.append(body)
+
+    def create_review(self, commit, body: str, event: str, comments: List[Dict]) -> None:
+        """The comments of the review are added to ``comments``, its body to ``reviews``."""
+        with self._lock:
+            self.reviews.append(body)
+            self.comments.extend({**comment, "commit_id": commit.sha} for comment in comments)
+
+
+class LocalRepository:
+    def __init__(self, full_name: str, clone_url: Optional[str] = None):
+        """``clone_url`` is read by ``GithubAPI`` with a mirror, e.g. a file:// url."""
+        self.full_name = full_name
+        self.clone_url = clone_url
+        self.pulls: Dict[int, LocalPullRequest] = {}
+
+    def get_pull(self, number: int) -> LocalPullRequest:
+        if number not in self.pulls:
+            raise KeyError(f"Pull request {number} not found in {self.full_name}")
+        return self.pulls[number]
+
+    def get_commit(self, sha: str) -> LocalCommit:
+        return LocalCommit(sha)
+
+
+class LocalGithub:
+    def __init__(self):
+        self.repositories: Dict[str, LocalRepository] = {}
+
+    def get_repo(self, full_name: str) -> LocalRepository:
+        if full_name not in self.repositories:
+            raise KeyError(f"Repository {full_name} not found")
+        return self.repositories[full_name]
+
+    def add_pull(
+            self,
+            full_name: str,
+            number: int,
+            head_sha: str,
+            files: List[Tuple[str, str]] = (),
+            base_sha: Optional[str] = None,
+            clone_url: Optional[str] = None,
+    ) -> LocalPullRequest:
+        """Add or update a pull request, ``files`` are ``(filename, patch)`` pairs."""
+        repository = self.repositories.setdefault(full_name, LocalRepository(full_name))
+        if clone_url is not None:
+            repository.clone_url = clone_url
+        pull = repository.pulls.get(number)
+        local_files = [LocalFile(filename, patch) for filename, patch in files]
+        base = LocalCommit(base_sha) if base_sha else None
+        if pull is None:
+            pull = repository.pulls[number] = LocalPullRequest(
+                number, LocalCommit(head_sha), local_files, base
+            )
+        else:
+            pull.head, pull.files, pull.base = LocalCommit(head_sha), local_files, base
+        return pull
+
+    def comments(self, full_name: str, number: int, head_sha: Optional[str] = None) -> List[Dict]:
+        comments = self.get_repo(full_name).get_pull(number).comments
+        return [c for c in comments if head_sha is None or c["commit_id"] == head_sha]
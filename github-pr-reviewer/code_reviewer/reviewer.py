@@ -1,9 +1,10 @@
-import os
 import re
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
-import openai
-openai.api_key = os.environ["OPENAI_API_KEY"]
+from genai_core.models import BaseGenerativeModel
+from genai_core.telemetry import configure_logging, get_logger, truncate
+
+logger = get_logger("code_reviewer")
 
 
 def _remove_strings(text: str) -> str:
@@ -13,9 +14,12 @@ def _remove_strings(text: str) -> str:
     return text
 
 
-class CodeReviewer:
+class CodeReviewer(BaseGenerativeModel):
+    # longer contexts are cut, the reviewed code itself is never cut
+    MAX_CONTEXT_CHARS = 16000
+
     def __init__(self, verbose: bool = False) -> None:
-        self._verbose = verbose
+        super().__init__(verbose=verbose)
         self._model = "gpt-4"
         self._model_params = {
             # "max_tokens": 4096,
@@ -61,6 +65,10 @@ class CodeReviewer:
                 "need to comment a previous file, you just need to put the filename you want "
                 "to refer to into the <start_file_name><end_file_name> section when you "
                 "write the comment.\n"
+                "Sometimes the full file after the change is also shown you, between "
+                "<start_context> and <end_context>. Use it only to understand the code, "
+                "your snippets and comments must refer to the code between <start_code> "
+                "and <end_code>.\n"
             ),
         }
         self._messages = [self._system_message]
@@ -90,12 +98,12 @@ class CodeReviewer:
             file_name = comment.split("<end_file_name>")[0].strip()
             cleaned_comment = re.search(r'<start_comment>(.*?)<end_comment>', comment, re.DOTALL)
             if cleaned_comment is None:
-                print(f"WARNING: comment not found for comment: {comment}")
+                logger.warning("Comment not found for comment: %s", truncate(comment))
                 continue
             cleaned_comment = cleaned_comment.group(1).strip()    
             code_snippet = re.search(r'<start_code_snippet>(.*?)<end_code_snippet>', comment, re.DOTALL)
             if code_snippet is None:
-                print(f"WARNING: code snippet not found for comment: {comment}")
+                logger.warning("Code snippet not found for comment: %s", truncate(comment))
                 continue
             code_snippet = code_snippet.group(1).strip()
             if file_name == original_file_name:
@@ -116,32 +124,40 @@ class CodeReviewer:
         return processed_comments
         
     
-    def __call__(self, filename: str, code: str) -> List[Tuple[str, int, str]]:
+    def run(
+            self, filename: str, code: str, context: Optional[str] = None
+    ) -> List[Tuple[str, int, str]]:
+        """Review ``code``, ``context`` is the full file it belongs to, if known."""
         if code is None or len(code) == 0:
             return []
-        code = f"<start_file_name> {filename} <end_file_name>\n<start_code> {code} <end_code>"
+        header = f"<start_file_name> {filename} <end_file_name>\n"
+        if context:
+            if len(context) > self.MAX_CONTEXT_CHARS:
+                context = context[:self.MAX_CONTEXT_CHARS] + "\n# ... (file truncated)"
+            header += f"<start_context> {context} <end_context>\n"
+        code = f"{header}<start_code> {code} <end_code>"
         user_message = {
             "role": "user",
             "content": code,
         }
         self._messages.append(user_message)
-        if self._verbose:
-            print(f"OpenAI request: {self._messages}")
-        response = openai.ChatCompletion.create(
+        self.logger.debug(
+            "Reviewing %s, %d messages in the conversation", filename, len(self._messages)
+        )
+        response = self._request(
+            self.client.chat.completions.create,
             model=self._model,
             messages=self._messages,
             **self._model_params,
         )
-        model_response = response["choices"][0]["message"]["content"]
-        if self._verbose:
-            print(f"OpenAI response: {response}")
+        model_response = response.choices[0].message.content
+        self.logger.debug("Model response: %s", truncate(model_response))
         comments = self._process_model_message(
             model_response, 
             self._messages[-1], 
             filter(lambda x: x["role"] == "user", self._messages)
         )
-        if self._verbose:
-            print(f"Comments: {comments}")
+        self.logger.debug("%d comments on %s", len(comments), filename)
         model_message = {
             "role": "assistant",
             "content": model_response,
@@ -156,6 +172,7 @@ if __name__ == "__main__":
     parser = ArgumentParser()
     parser.add_argument("--filename", type=str, required=True)
     args = parser.parse_args()
+    configure_logging(level="DEBUG")
     
     with open(args.filename, "r") as f:
         code = f.read()
@@ -0,0 +1,262 @@
+"""Webhook driven review service.
+
+Accepts GitHub ``pull_request`` webhooks, queues a review job per PR head
+commit in a persistent SQLite queue and reviews them with a pool of
+workers. A commit submitted several times is reviewed once.
+
+Endpoints:
+    POST /webhook   GitHub webhook, checked against the secret when one is set
+    GET  /metrics   queue depth, job latency and throughput as JSON
+    GET  /healthz
+
+Usage:
+    GITHUB_ACCESS_TOKEN=... python -m code_reviewer.service --port 8080 --workers 4 \
+        --db reviews.sqlite --secret "$GITHUB_WEBHOOK_SECRET"
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from code_reviewer.jobs import ReviewJob, ReviewJobQueue
+from genai_core.metrics import metrics_snapshot
+from genai_core.telemetry import configure_logging, get_logger
+
+# a reviewer takes (repository, pr_number, head_sha)
+Reviewer = Callable[[str, int, str], Any]
+REVIEWED_ACTIONS = ("opened", "reopened", "synchronize", "ready_for_review")
+
+logger = get_logger("code_reviewer.service")
+
+
+class ReviewService:
+    def __init__(
+            self,
+            queue: ReviewJobQueue,
+            make_reviewer: Callable[[], Reviewer],
+            workers: int = 2,
+            secret: Optional[str] = None,
+    ):
+        """
+        Parameters:
+            queue(ReviewJobQueue): the persistent job queue
+            make_reviewer(callable): builds the reviewer of a worker, each worker
+                gets its own since the reviewer keeps a conversation
+            workers(int): number of reviews running at the same time
+            secret(str): webhook secret, payloads with a wrong signature are rejected
+        """
+        self.queue = queue
+        self.make_reviewer = make_reviewer
+        self.workers = workers
+        self.secret = secret
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._webhooks: Counter = Counter()
+        self._started_at = time.time()
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"reviewer-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """Wait for the running reviews, the queued ones stay in the queue."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+
+    def _work(self) -> None:
+        review = self.make_reviewer()
+        while not self._stop.is_set():
+            job = self.queue.claim(timeout=0.5)
+            if job is None:
+                continue
+            self._run(review, job)
+
+    def _run(self, review: Reviewer, job: ReviewJob) -> None:
+        start = time.perf_counter()
+        try:
+            review(job.repository, job.pr_number, job.head_sha)
+        except Exception as e:
+            logger.warning(
+                "Review of %s#%d at %s failed (attempt %d): %s",
+                job.repository, job.pr_number, job.head_sha, job.attempts, e,
+            )
+            self.queue.fail(job, f"{type(e).__name__}: {e}")
+            return
+        self.queue.complete(job)
+        logger.info("review", extra={"fields": {
+            "repository": job.repository,
+            "pr": job.pr_number,
+            "sha": job.head_sha[:12],
+            "duration_ms": round(1000 * (time.perf_counter() - start), 1),
+            "latency_ms": round(1000 * (time.time() - job.enqueued_at), 1),
+        }})
+
+    def verify(self, body: bytes, signature: Optional[str]) -> bool:
+        if not self.secret:
+            return True
+        expected = "sha256=" + hmac.new(self.secret.encode(), body, hashlib.sha256).hexdigest()
+        return signature is not None and hmac.compare_digest(expected, signature)
+
+    def handle_webhook(
+            self, event: Optional[str], body: bytes, signature: Optional[str] = None
+    ) -> Tuple[int, Dict[str, Any]]:
+        """Returns the HTTP status and the JSON reply of a webhook delivery."""
+        if not self.verify(body, signature):
+            self._count("rejected")
+            return 401, {"error": "invalid signature"}
+        if event == "ping":
+            return 200, {"status": "pong"}
+        if event != "pull_request":
+            self._count("ignored")
+            return 200, {"status": "ignored", "reason": f"event {event}"}
+        try:
+            payload = json.loads(body)
+            action = payload["action"]
+            repository = payload["repository"]["full_name"]
+            pr_number = int(payload["pull_request"]["number"])
+            head_sha = payload["pull_request"]["head"]["sha"]
+        except (ValueError, KeyError, TypeError) as e:
+            self._count("invalid")
+            return 400, {"error": f"invalid pull_request payload: {e}"}
+        if action not in REVIEWED_ACTIONS:
+            self._count("ignored")
+            return 200, {"status": "ignored", "reason": f"action {action}"}
+        job_id = self.queue.enqueue(repository, pr_number, head_sha)
+        if job_id is None:
+            self._count("duplicate")
+            return 200, {"status": "duplicate"}
+        self._count("queued")
+        return 202, {"status": "queued", "job_id": job_id}
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self._webhooks[outcome] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            webhooks = dict(self._webhooks)
+        return {
+            "uptime": time.time() - self._started_at,
+            "workers": self.workers,
+            "jobs": self.queue.stats(),
+            "webhooks": webhooks,
+            "models": metrics_snapshot(),
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "ReviewServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            return self._json(200, self.server.service.metrics())
+        if self.path == "/healthz":
+            return self._json(200, {"status": "ok"})
+        self._json(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path != "/webhook":
+            return self._json(404, {"error": f"Unknown path {self.path}"})
+        status, reply = self.server.service.handle_webhook(
+            self.headers.get("X-GitHub-Event"),
+            body,
+            self.headers.get("X-Hub-Signature-256"),
+        )
+        self._json(status, reply)
+
+    def _json(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ReviewServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, service: ReviewService, host: str = "127.0.0.1", port: int = 0):
+        """Port 0 picks a free port, read it back from ``url``."""
+        super().__init__((host, port), _Handler)
+        self.service = service
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m code_reviewer.service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--db", default="reviews.sqlite", help="SQLite file of the job queue")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-attempts", type=int, default=3)
+    parser.add_argument(
+        "--retry-delay", type=float, default=30.0,
+        help="seconds before retrying a failed review, doubled at every attempt",
+    )
+    parser.add_argument(
+        "--secret", default=os.environ.get("GITHUB_WEBHOOK_SECRET"),
+        help="webhook secret, GITHUB_WEBHOOK_SECRET by default",
+    )
+    parser.add_argument(
+        "--mirror-dir",
+        help="keep local git mirrors of the repositories there, so reviews see the full files",
+    )
+    parser.add_argument(
+        "--max-review-tokens", type=int,
+        help="estimated tokens per PR, the least relevant files beyond it are skipped",
+    )
+    parser.add_argument("--max-review-seconds", type=float, help="time allowed per PR review")
+    args = parser.parse_args()
+    configure_logging()
+    from code_reviewer.git_mirror import GitMirror
+    from code_reviewer.github_code import GithubAPI
+    from code_reviewer.prioritizer import ReviewBudget
+
+    token = os.environ["GITHUB_ACCESS_TOKEN"]
+    # shared by the workers, fetches of the same repository are serialised
+    mirror = GitMirror(args.mirror_dir) if args.mirror_dir else None
+    budget = ReviewBudget(args.max_review_tokens, args.max_review_seconds)
+    service = ReviewService(
+        ReviewJobQueue(args.db, max_attempts=args.max_attempts, retry_delay=args.retry_delay),
+        lambda: GithubAPI(token, mirror=mirror, budget=budget).write_comments_for_pr,
+        workers=args.workers,
+        secret=args.secret,
+    )
+    server = ReviewServer(service, host=args.host, port=args.port)
+    service.start()
+    print(f"Review service listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+        service.queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Audio and archives handed to the UI, in one temporary directory per app.
+
+Gradio copies every file it serves into its own cache, so only the most
+recent files are kept here, and the directory is removed when the app exits.
+"""
+import os
+import tempfile
+import threading
+from collections import deque
+from typing import Deque, Optional
+
+# enough for the outputs still in flight to gradio, with many concurrent users
+MAX_FILES = 256
+
+
+class OutputFiles:
+    def __init__(self, max_files: int = MAX_FILES, prefix: str = "ai_translate-"):
+        # removed by its finalizer at exit, or by ``cleanup``
+        self._directory = tempfile.TemporaryDirectory(prefix=prefix)
+        self.max_files = max_files
+        self._paths: Deque[str] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self) -> str:
+        return self._directory.name
+
+    def new_path(self, suffix: str, prefix: str = "") -> str:
+        """Path of a new empty file, the oldest files are deleted past ``max_files``."""
+        fd, path = tempfile.mkstemp(suffix=suffix, prefix=prefix, dir=self.directory)
+        os.close(fd)
+        with self._lock:
+            self._paths.append(path)
+            while len(self._paths) > self.max_files:
+                try:
+                    os.remove(self._paths.popleft())
+                except FileNotFoundError:
+                    pass
+        return path
+
+    def write(self, content: bytes, suffix: str, prefix: str = "") -> str:
+        path = self.new_path(suffix, prefix)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def cleanup(self) -> None:
+        with self._lock:
+            self._paths.clear()
+            self._directory.cleanup()
+
+
+_output_files: Optional[OutputFiles] = None
+_output_files_lock = threading.Lock()
+
+
+def get_output_files() -> OutputFiles:
+    """Directory shared by the models and the UI handlers of the process."""
+    global _output_files
+    with _output_files_lock:
+        if _output_files is None:
+            _output_files = OutputFiles()
+        return _output_files
@@ -0,0 +1,243 @@
+"""On-device text-to-speech backends of ``TextToVoice``.
+
+The speech is synthesized on the CPU by a pool of processes, each of them
+loading the voices of every language once when it starts. The text is split
+into sentences synthesized in parallel, so ``stream`` yields the first audio
+as soon as the first sentence is ready, as a WAV stream that can be played
+while it is received.
+
+Engines:
+    piper  Piper neural voices on ONNX runtime, pip install piper-tts. The
+           voices are read from ``voices_dir`` (``GENAI_TTS_VOICES_DIR``),
+           as ``<voice>.onnx`` with its ``<voice>.onnx.json``, see ``PIPER_VOICES``.
+
+Select one with ``TextToVoice(backend="piper")`` or for every model with the
+``GENAI_TTS_BACKEND`` environment variable.
+"""
+import os
+import re
+import struct
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Tuple, Type
+
+from genai_core.telemetry import get_logger
+
+logger = get_logger("local_tts")
+
+# voice of each language of ``TextToVoice.LANGUAGE_CODES``
+PIPER_VOICES = {
+    "english": "en_US-lessac-medium",
+    "spanish": "es_ES-davefx-medium",
+    "french": "fr_FR-siwis-medium",
+    "german": "de_DE-thorsten-medium",
+    "italian": "it_IT-riccardo-x_low",
+}
+# sentences longer than this are split further, so no chunk delays the stream too much
+MAX_CHUNK_CHARS = 300
+SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+")
+
+
+class SpeechEngine(ABC):
+    """Synthesizes speech in a worker process, built once per process."""
+
+    def __init__(self, voices: Dict[str, str]):
+        """``voices`` maps the languages to the voices to preload."""
+        self.voices = voices
+
+    @staticmethod
+    def voice_files(voice: str) -> List[str]:
+        """Files the voice is loaded from."""
+        return [voice]
+
+    @abstractmethod
+    def synthesize(self, language: str, text: str) -> Tuple[int, bytes]:
+        """Returns the sample rate and the 16 bit mono PCM samples."""
+        raise NotImplementedError
+
+
+class PiperEngine(SpeechEngine):
+    def __init__(self, voices: Dict[str, str]):
+        super().__init__(voices)
+        try:
+            from piper import PiperVoice
+        except ImportError as e:
+            raise ImportError(
+                "The piper backend requires the piper-tts package: pip install piper-tts"
+            ) from e
+        self._voices = {language: PiperVoice.load(path) for language, path in voices.items()}
+
+    @staticmethod
+    def voice_files(voice: str) -> List[str]:
+        return [voice, voice + ".json"]
+
+    def synthesize(self, language: str, text: str) -> Tuple[int, bytes]:
+        voice = self._voices[language]
+        pcm = b"".join(voice.synthesize_stream_raw(text))
+        return voice.config.sample_rate, pcm
+
+
+ENGINES: Dict[str, Type[SpeechEngine]] = {
+    "piper": PiperEngine,
+}
+
+# the engine of a worker process
+_engine: Optional[SpeechEngine] = None
+
+
+def _init_worker(engine_name: str, voices: Dict[str, str]) -> None:
+    global _engine
+    _engine = ENGINES[engine_name](voices)
+
+
+def _synthesize(language: str, text: str) -> Tuple[int, bytes]:
+    return _engine.synthesize(language, text)
+
+
+def split_text(text: str, max_chars: int = MAX_CHUNK_CHARS) -> List[str]:
+    """Sentences of the text, the long ones cut at the last space before ``max_chars``."""
+    chunks = []
+    for sentence in SENTENCE_END.split(text.strip()):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            chunks.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if sentence:
+            chunks.append(sentence)
+    return chunks
+
+
+def wav_header(sample_rate: int, n_bytes: Optional[int] = None) -> bytes:
+    """Header of a 16 bit mono WAV, with the maximum size when streaming."""
+    data_size = 0xFFFFFFFF - 36 if n_bytes is None else n_bytes
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", data_size + 36, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", data_size,
+    )
+
+
+class LocalVoiceBackend:
+    def __init__(
+            self,
+            engine: str = "piper",
+            voices: Optional[Dict[str, str]] = None,
+            voices_dir: Optional[str] = None,
+            workers: Optional[int] = None,
+    ):
+        """
+        Parameters:
+            engine(str): name of the engine in ``ENGINES``
+            voices(dict): voice model of each language, as paths or names in
+                ``voices_dir``, the Piper voices of ``PIPER_VOICES`` by default
+            voices_dir(str): directory of the voice models, ``GENAI_TTS_VOICES_DIR``
+                or the working directory by default
+            workers(int): synthesis processes, one per core by default
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown speech engine {engine}, choose among {sorted(ENGINES)}")
+        voices_dir = voices_dir or os.environ.get("GENAI_TTS_VOICES_DIR", ".")
+        self.engine = engine
+        self.voices = {
+            language: voice if os.path.splitext(voice)[1] else os.path.join(voices_dir, voice + ".onnx")
+            for language, voice in (voices or PIPER_VOICES).items()
+        }
+        # checked here, a worker failing to load them would only break the pool
+        missing = [
+            path for voice in self.voices.values()
+            for path in ENGINES[engine].voice_files(voice) if not os.path.exists(path)
+        ]
+        if missing:
+            raise FileNotFoundError(
+                f"Missing voice files {missing}, download them into {voices_dir} "
+                "or set GENAI_TTS_VOICES_DIR to their directory"
+            )
+        self.workers = workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                logger.info("Starting %d %s workers for %s", self.workers, self.engine, sorted(self.voices))
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_worker,
+                    initargs=(self.engine, self.voices),
+                )
+            return self._pool
+
+    def _discard(self, pool: ProcessPoolExecutor) -> None:
+        # a worker died, e.g. killed when out of memory, the next call starts a new pool
+        logger.warning("The %s workers stopped, restarting them on the next request", self.engine)
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False)
+
+    def load(self) -> None:
+        """Start the workers and load the voices now instead of on the first request."""
+        language = next(iter(self.voices))
+        pool = self.pool
+        try:
+            futures = [pool.submit(_synthesize, language, "Ready.") for _ in range(self.workers)]
+            for future in futures:
+                future.result()
+        except BrokenProcessPool:
+            self._discard(pool)
+            raise
+
+    def stream(self, input_text: str, language: str) -> Iterator[bytes]:
+        """WAV stream of the speech: the header, then the samples of each
+        sentence as soon as it is synthesized, in order."""
+        if language not in self.voices:
+            raise ValueError(f"No voice for {language}, the voices are {sorted(self.voices)}")
+        pool = self.pool
+        header_sent = False
+        try:
+            futures = [pool.submit(_synthesize, language, chunk) for chunk in split_text(input_text)]
+            for future in futures:
+                sample_rate, pcm = future.result()
+                if not header_sent:
+                    yield wav_header(sample_rate)
+                    header_sent = True
+                yield pcm
+        except BrokenProcessPool:
+            self._discard(pool)
+            raise
+        if not header_sent:
+            # nothing to say, an empty stream is still a valid WAV
+            yield wav_header(16000, 0)
+
+    def synthesize(self, input_text: str, language: str) -> bytes:
+        """Complete WAV file of the speech."""
+        chunks = self.stream(input_text, language)
+        header = next(chunks)
+        pcm = b"".join(chunks)
+        sample_rate = struct.unpack_from("<I", header, 24)[0]
+        return wav_header(sample_rate, len(pcm)) + pcm
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+
+_backends: Dict[Tuple, LocalVoiceBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_voice_backend(engine: str, **options) -> LocalVoiceBackend:
+    """Backend shared by every caller asking for the same engine and options,
+    so the voices are loaded once per process pool."""
+    key = (engine, tuple(sorted((name, repr(value)) for name, value in options.items())))
+    with _backends_lock:
+        if key not in _backends:
+            _backends[key] = LocalVoiceBackend(engine, **options)
+        return _backends[key]
@@ -1,34 +1,12 @@
-from abc import abstractmethod, ABC
+import os
+import time
+from typing import Any, Dict, Iterator, Optional, Union
 
-import openai
-from google.cloud import texttospeech
-
-
-class BaseGenerativeModel(ABC):
-    def __init__(self, verbose: bool = False):
-        self.verbose = verbose
-
-    def __call__(self, *args, **kwargs):
-        return self.run(*args, **kwargs)
-
-    @abstractmethod
-    def run(self, *args, **kwargs):
-        raise NotImplementedError
-
-
-class WhisperModel(BaseGenerativeModel):
-    def __init__(self, model_name: str, verbose: bool = False):
-        super().__init__(verbose=verbose)
-        self.model = model_name
-
-    def run(self, file_path: str):
-        if self.verbose:
-            print(f"Transcribing audio file: {file_path}")
-        audio_file = open(file_path, "rb")
-        transcript = openai.Audio.transcribe(self.model, audio_file)
-        if self.verbose:
-            print(f"Transcript output: {transcript}")
-        return transcript["text"]
+from genai_core.client import get_config
+from genai_core.models import BaseGenerativeModel, WhisperModel
+from genai_core.telemetry import log_call, truncate
+from .files import get_output_files
+from .local_tts import LocalVoiceBackend, get_voice_backend
 
 
 class TranslationModel(BaseGenerativeModel):
@@ -41,8 +19,7 @@ class TranslationModel(BaseGenerativeModel):
         )
 
     def run(self, user_input, language):
-        if self.verbose:
-            print(f"User input: {user_input}")
+        self.logger.debug("User input: %s", truncate(user_input))
         system_message = {
             "role": "system",
             "content": self.SYSTEM_TEMPLATE.format(language=language),
@@ -52,13 +29,13 @@ class TranslationModel(BaseGenerativeModel):
             "content": user_input,
         }
         messages = [system_message, user_message]
-        response = openai.ChatCompletion.create(
+        response = self._request(
+            self.client.chat.completions.create,
             model="gpt-3.5-turbo",
             messages=messages,
         )
-        if self.verbose:
-            print(f"OpenAI response: {response}")
-        model_response = response["choices"][0]["message"]["content"]
+        model_response = response.choices[0].message.content
+        self.logger.debug("Translation: %s", truncate(model_response))
         return model_response
 
 
@@ -70,10 +47,56 @@ class TextToVoice(BaseGenerativeModel):
         "german": "de-DE",
         "italian": "it-IT",
     }
+    def __init__(
+            self,
+            verbose: bool = False,
+            backend: Union[str, LocalVoiceBackend, None] = None,
+            backend_options: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        ``backend`` is "google" for Google Cloud TTS, the name of an on-device
+        engine of ``local_tts`` or a backend instance. It defaults to the
+        ``GENAI_TTS_BACKEND`` environment variable, then to "google".
+        """
+        super().__init__(verbose=verbose)
+        self._tts_client = None
+        backend = backend or os.environ.get("GENAI_TTS_BACKEND") or "google"
+        if isinstance(backend, str) and backend != "google":
+            backend = get_voice_backend(backend, **(backend_options or {}))
+        self.backend: Optional[LocalVoiceBackend] = None if backend == "google" else backend
+
+    @staticmethod
+    def retryable_errors():
+        # imported here, the on-device backends do not need google-cloud
+        from google.api_core import exceptions as google_exceptions
+
+        return (
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.DeadlineExceeded,
+            google_exceptions.TooManyRequests,
+            google_exceptions.InternalServerError,
+        )
+
+    @property
+    def tts_client(self):
+        # the client keeps a gRPC channel open, so we build it once
+        if self._tts_client is None:
+            base_url = get_config().base_url
+            if base_url:
+                from .rest import RestTextToSpeechClient
+
+                self._tts_client = RestTextToSpeechClient(base_url)
+            else:
+                from google.cloud import texttospeech
+
+                self._tts_client = texttospeech.TextToSpeechClient()
+        return self._tts_client
 
     def run(self, input_text: str, language: str):
-        # Instantiates a client
-        client = texttospeech.TextToSpeechClient()
+        if self.backend is not None:
+            audio = self._measure(self.backend.synthesize, input_text, language, payload_bytes=len)
+            return self._write_audio(audio, ".wav")
+        from google.cloud import texttospeech
 
         # Set the text input to be synthesized
         synthesis_input = texttospeech.SynthesisInput(text=input_text)
@@ -92,14 +115,33 @@ class TextToVoice(BaseGenerativeModel):
 
         # Perform the text-to-speech request on the text input with the selected
         # voice parameters and audio file type
-        response = client.synthesize_speech(
-            input=synthesis_input, voice=voice, audio_config=audio_config
+        response = self._request(
+            self.tts_client.synthesize_speech,
+            input=synthesis_input,
+            voice=voice,
+            audio_config=audio_config,
+            retry_on=self.retryable_errors(),
         )
 
         # The response's audio_content is binary.
-        output_file = "output.mp3"
-        with open(output_file, "wb") as out:
-            # Write the response to the output file.
-            out.write(response.audio_content)
-            print(f'Audio content written to file "{output_file}"')
-        return output_file
+        return self._write_audio(response.audio_content, ".mp3")
+
+    def _write_audio(self, audio: bytes, suffix: str) -> str:
+        # Every request gets its own file, concurrent requests would overwrite
+        # each other otherwise.
+        path = get_output_files().write(audio, suffix)
+        self.logger.debug("Audio content written to file %s", path)
+        return path
+
+    def stream(self, input_text: str, language: str) -> Iterator[bytes]:
+        """WAV chunks of the speech as they are synthesized, on-device backends only."""
+        if self.backend is None:
+            raise NotImplementedError("Streaming requires an on-device backend")
+        start = time.perf_counter()
+        n_bytes = 0
+        for chunk in self.backend.stream(input_text, language):
+            n_bytes += len(chunk)
+            yield chunk
+        latency = time.perf_counter() - start
+        self.metrics.record(latency, payload_bytes=n_bytes)
+        log_call(self.logger, type(self).__name__, latency, payload_bytes=n_bytes)
@@ -0,0 +1,46 @@
+"""Text-to-speech over the REST API instead of gRPC.
+
+Used when the models are pointed to another backend with ``base_url``, e.g.
+the local fake server, since the gRPC client only talks to Google.
+"""
+import base64
+from dataclasses import dataclass
+from typing import Optional
+
+from google.api_core import exceptions as google_exceptions
+
+from genai_core.client import get_http_client
+
+
+@dataclass(frozen=True)
+class SynthesizeSpeechResponse:
+    audio_content: bytes
+
+
+def _to_json(message) -> dict:
+    # proto-plus messages, camelCase keys and enum names as the REST API expects
+    return type(message).to_dict(
+        message, use_integers_for_enums=False, preserving_proto_field_name=False
+    )
+
+
+class RestTextToSpeechClient:
+    def __init__(self, base_url: str, api_key: Optional[str] = None):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+
+    def synthesize_speech(self, input, voice, audio_config) -> SynthesizeSpeechResponse:
+        response = get_http_client().post(
+            f"{self.base_url}/v1/text:synthesize",
+            json={
+                "input": _to_json(input),
+                "voice": _to_json(voice),
+                "audioConfig": _to_json(audio_config),
+            },
+            params={"key": self.api_key} if self.api_key else None,
+        )
+        if response.is_error:
+            raise google_exceptions.from_http_status(response.status_code, response.text)
+        return SynthesizeSpeechResponse(
+            audio_content=base64.b64decode(response.json()["audioContent"])
+        )
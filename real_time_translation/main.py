@@ -1,24 +1,89 @@
 import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List
+
 import gradio as gr
 
+from genai_core.audio import WHISPER_SAMPLE_RATE
+from genai_core.telemetry import configure_logging
+from .ai_translate.files import get_output_files
 from .ai_translate.models import (
     WhisperModel, TranslationModel, TextToVoice
 )
 
-debug = True
-whisper_model = WhisperModel("whisper-1", verbose=debug)
-translation_model = TranslationModel(verbose=debug)
-voice_generation_model = TextToVoice(verbose=debug)
+# log level, sampling and format are read from the GENAI_LOG_* variables
+configure_logging()
+whisper_model = WhisperModel("whisper-1", target_sample_rate=WHISPER_SAMPLE_RATE)
+translation_model = TranslationModel()
+voice_generation_model = TextToVoice()
+LANGUAGES = list(TextToVoice.LANGUAGE_CODES)
 
 
-def translate_audio(audio_file, language):
-    os.rename(audio_file, audio_file + '.wav')
-    transcript = whisper_model(audio_file + '.wav')
+def _voice_translation(transcript, language):
     prompt = translation_model(transcript, language)
     path_to_voice = voice_generation_model(prompt, language)
     return path_to_voice
 
-def live_translate():
+
+def translate_audio(audio, language):
+    transcript = whisper_model(audio)
+    return _voice_translation(transcript, language)
+
+
+def translate_audio_multi(audio, languages: List[str]) -> Dict[str, str]:
+    """Transcribe the audio once, then translate and voice it in every
+    language concurrently. Returns the path of the audio of each language."""
+    languages = list(dict.fromkeys(languages))
+    unknown = [language for language in languages if language not in TextToVoice.LANGUAGE_CODES]
+    if unknown:
+        raise ValueError(f"Unsupported languages {unknown}, choose among {LANGUAGES}")
+    if not languages:
+        return {}
+    transcript = whisper_model(audio)
+    with ThreadPoolExecutor(max_workers=len(languages)) as executor:
+        paths = executor.map(partial(_voice_translation, transcript), languages)
+        return dict(zip(languages, paths))
+
+
+def bundle_translations(paths: Dict[str, str]) -> str:
+    """Zip the audio of every language in a single file to download."""
+    bundle_path = get_output_files().new_path(suffix=".zip", prefix="translations-")
+    with zipfile.ZipFile(bundle_path, "w") as bundle:
+        for language, path in paths.items():
+            bundle.write(path, arcname=f"{language}{os.path.splitext(path)[1]}")
+    return bundle_path
+
+
+def translate_audio_fanout(audio, languages):
+    """UI handler of ``translate_audio_multi``, one audio output per entry of
+    ``LANGUAGES``, None for the ones not selected, then the bundle."""
+    if not languages:
+        raise gr.Error("Select at least one language")
+    paths = translate_audio_multi(audio, languages)
+    return [paths.get(language) for language in LANGUAGES] + [bundle_translations(paths)]
+
+
+def translate_audio_batch(audios, languages):
+    """Batched version of ``translate_audio`` for gradio's batch mode.
+
+    Gradio passes one list per input and expects one list per output.
+    """
+    with ThreadPoolExecutor(max_workers=len(audios)) as executor:
+        return [list(executor.map(translate_audio, audios, languages))]
+
+
+def build_live_translate(concurrency_limits=None, max_batch_size=1):
+    """
+    Parameters:
+        concurrency_limits(dict): requests processed at the same time by each
+            event handler, by handler name. Handlers not listed use the
+            default limit of the queue.
+        max_batch_size(int): when above 1, queued requests are grouped into
+            batches of up to this size and translated together.
+    """
+    concurrency_limits = concurrency_limits or {}
     with gr.Blocks() as demo:
         # Add a title
         gr.Markdown(
@@ -26,21 +91,60 @@ def live_translate():
             "translate audio files into english and then read back the text "
             "to the user.\n\nEnjoy!🔥"
         )
-        with gr.Row():
-            audio_window = gr.Audio(
-                sources="microphone", type="filepath", label="Input Audio"
-            )
-            language_dropdown = gr.Dropdown(
-                label="Language", choices=["english", "spanish", "french"]
-            )
-        convert_button = gr.Button("Translate")
-        with gr.Row():
-            audio_out = gr.Audio(type="filepath", label="Input Audio")
+        with gr.Tab("Single language"):
+            with gr.Row():
+                audio_window = gr.Audio(
+                    sources="microphone", type="numpy", label="Input Audio"
+                )
+                language_dropdown = gr.Dropdown(
+                    label="Language", choices=LANGUAGES
+                )
+            convert_button = gr.Button("Translate")
+            with gr.Row():
+                audio_out = gr.Audio(type="filepath", label="Input Audio")
+        with gr.Tab("Multiple languages"):
+            # the speech is transcribed once and voiced in every language
+            with gr.Row():
+                multi_audio_window = gr.Audio(
+                    sources="microphone", type="numpy", label="Input Audio"
+                )
+                languages_checkbox = gr.CheckboxGroup(
+                    label="Languages", choices=LANGUAGES, value=LANGUAGES
+                )
+            multi_convert_button = gr.Button("Translate")
+            with gr.Row():
+                multi_audio_outs = [
+                    gr.Audio(type="filepath", label=language.capitalize())
+                    for language in LANGUAGES
+                ]
+            bundle_out = gr.File(label="All translations")
 
         convert_button.click(
-            translate_audio,
+            translate_audio_batch if max_batch_size > 1 else translate_audio,
             inputs=[audio_window, language_dropdown],
-            outputs=[audio_out]
+            outputs=[audio_out],
+            concurrency_limit=concurrency_limits.get("translate_audio", "default"),
+            batch=max_batch_size > 1,
+            max_batch_size=max_batch_size,
         )
+        multi_convert_button.click(
+            translate_audio_fanout,
+            inputs=[multi_audio_window, languages_checkbox],
+            outputs=multi_audio_outs + [bundle_out],
+            concurrency_limit=concurrency_limits.get("translate_audio_fanout", "default"),
+        )
+
+    return demo
+
+
+def live_translate(
+        max_queue_size=None,
+        concurrency_limit=1,
+        concurrency_limits=None,
+        max_batch_size=1,
+        **launch_options,
+):
+    demo = build_live_translate(concurrency_limits, max_batch_size)
+    demo.queue(max_size=max_queue_size, default_concurrency_limit=concurrency_limit)
+    demo.launch(**launch_options)
 
-    demo.launch()
@@ -0,0 +1,14 @@
+from setuptools import setup
+
+# the shared model layer of the apps, installed with ``pip install -e .`` so
+# every subproject imports it from wherever it is run
+setup(
+    name='genai_core',
+    version='0.1',
+    packages=['genai_core'],
+    install_requires=[
+        'httpx',
+        'numpy',
+        'openai',
+    ],
+)
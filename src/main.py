@@ -7,17 +7,20 @@ from renderer import (
     console, 
     modes_mapped_to_functions, 
     vetical_padding, 
-    parser
+    parser,
+    get_server_options
 )
 
 args = parser.parse_args()
+server_options = get_server_options(args)
 
 def main():
     try:
         if args.mode:
             run_mode(
                 args.mode.capitalize(), 
-                modes_mapped_to_functions.get(args.mode)
+                modes_mapped_to_functions.get(args.mode),
+                **server_options
             )
         else:
             vetical_padding()
@@ -28,13 +31,14 @@ def main():
                 if func:
                     run_mode(
                         mode.capitalize(), 
-                        func
+                        func,
+                        **server_options
                     )
                     break
                 else:
                     console.print(
                         "\n>>> Invalid choice <<<\n\nEnter either",
-                        "'v' for 'voice' or 't' for 'translate'."
+                        "'v' for 'voice', 't' for 'translate' or 'a' for 'all'."
                     )
     except KeyboardInterrupt:
         console.print("\n\n>>> App closed <<<\n\n")
@@ -2,12 +2,11 @@ from rich.console import Console
 from rich.table import Table
 from rich.align import Align
 from rich.padding import Padding
-from voice2image.main import voice_to_image
-from real_time_translation.main import live_translate
 import argparse
+import importlib
 
 console = Console()
-modes_list = ['voice', 'v', 'translate', 't']
+modes_list = ['voice', 'v', 'translate', 't', 'all', 'a']
 
 choices_table = Table(
     show_header=True, 
@@ -32,6 +31,10 @@ choices_table.add_row(
     f"{modes_list[2]} ({modes_list[3]})", 
     "Multi-lingual real-time audio translation." 
 )
+choices_table.add_row(
+    f"{modes_list[4]} ({modes_list[5]})", 
+    "Serve all the modes from a single app." 
+)
 
 running_table = Table(show_header=False)
 running_table.add_column(
@@ -39,30 +42,91 @@ running_table.add_column(
     justify="center"
 )
 
-def run_mode(mode, function):
+def run_mode(mode, function, **server_options):
     if function:
         running_table.add_row(f">>> Now running {read(mode)} <<<")
         vetical_padding()
         console.print(Align.left(running_table))
         vetical_padding()
-        function()
+        function(**server_options)
     else:
         console.print(f"Error: Invalid mode - {mode}")
  
 def read(mode_string):
     if mode_string.lower() in modes_list[:2]:
         return 'voice'
-    if mode_string.lower() in modes_list[2:]:
+    if mode_string.lower() in modes_list[2:4]:
         return 'translate'
+    if mode_string.lower() in modes_list[4:]:
+        return 'all modes'
     
 def vetical_padding():
     console.print(Padding("", (0, 0)))
 
+
+class LazyFunction:
+    """Function imported only when it is called for the first time.
+
+    The apps pull in gradio, openai and google-cloud at import time, so we
+    only import the one of the selected mode.
+    """
+    def __init__(self, module_name, function_name):
+        self.module_name = module_name
+        self.function_name = function_name
+        self._function = None
+
+    def load(self):
+        if self._function is None:
+            module = importlib.import_module(self.module_name)
+            self._function = getattr(module, self.function_name)
+        return self._function
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+
+voice_to_image = LazyFunction("voice2image.main", "voice_to_image")
+live_translate = LazyFunction("real_time_translation.main", "live_translate")
+
+modes_mapped_to_builders = {
+    "Voice2Image": LazyFunction("voice2image.main", "build_voice_to_image"),
+    "Translate": LazyFunction("real_time_translation.main", "build_live_translate"),
+}
+
+
+def serve_all_modes(
+        max_queue_size=None,
+        concurrency_limit=1,
+        concurrency_limits=None,
+        max_batch_size=1,
+        **launch_options,
+):
+    """Serve every mode as a tab of a single gradio app.
+
+    All the modes live in the same process, so they share the pooled API
+    clients and a single request queue.
+    """
+    import gradio as gr
+
+    app = gr.TabbedInterface(
+        [
+            build(concurrency_limits, max_batch_size)
+            for build in modes_mapped_to_builders.values()
+        ],
+        tab_names=list(modes_mapped_to_builders),
+        title="Generative Playground",
+    )
+    app.queue(max_size=max_queue_size, default_concurrency_limit=concurrency_limit)
+    app.launch(**launch_options)
+
+
 modes_mapped_to_functions = {
     modes_list[0]: voice_to_image, 
     modes_list[1]: voice_to_image, 
     modes_list[2]: live_translate,
-    modes_list[3]: live_translate
+    modes_list[3]: live_translate,
+    modes_list[4]: serve_all_modes,
+    modes_list[5]: serve_all_modes,
 }
 
 modes_help_descriptions = {
@@ -70,6 +134,8 @@ modes_help_descriptions = {
     modes_list[1]: "Short form for 'voice'",
     modes_list[2]: "Get live translations",
     modes_list[3]: "Short form for 'translate'",
+    modes_list[4]: "Serve all the modes as tabs of a single app",
+    modes_list[5]: "Short form for 'all'",
 }
 
 parser = argparse.ArgumentParser(
@@ -78,6 +144,7 @@ parser = argparse.ArgumentParser(
         "\nThis app has 2 exciting functioning modes:"
         "\n   1. 'voice' or 'v'."
         "\n   2. 'translate' or 't'."
+        "\nUse 'all' or 'a' to serve both of them from a single app."
     ),
     formatter_class=argparse.RawDescriptionHelpFormatter
 )
@@ -89,4 +156,65 @@ for mode, help_text in modes_help_descriptions.items():
         const=mode, 
         dest='mode', 
         help=help_text
-    )
\ No newline at end of file
+    )
+
+
+def handler_concurrency(option):
+    """Parses a HANDLER=LIMIT option into the handler and its limit."""
+    handler, _, limit = option.partition("=")
+    if not handler or not limit.isdigit() or int(limit) < 1:
+        raise argparse.ArgumentTypeError(
+            f"invalid handler concurrency {option!r}, expected HANDLER=LIMIT, e.g. convert_audio=4"
+        )
+    return handler, int(limit)
+
+
+server_options = parser.add_argument_group("server options")
+server_options.add_argument(
+    '--host', 
+    dest='server_name', 
+    help="Address the app listens on, e.g. 0.0.0.0"
+)
+server_options.add_argument(
+    '--port', 
+    type=int, 
+    dest='server_port', 
+    help="Port the app listens on"
+)
+server_options.add_argument(
+    '--queue-size', 
+    type=int, 
+    dest='max_queue_size', 
+    help="Maximum number of requests waiting in the queue, unbounded by default"
+)
+server_options.add_argument(
+    '--concurrency-limit', 
+    type=int, 
+    default=1, 
+    help="Requests processed at the same time by each event handler"
+)
+server_options.add_argument(
+    '--handler-concurrency', 
+    nargs='*', 
+    type=handler_concurrency, 
+    default=[], 
+    metavar='HANDLER=LIMIT', 
+    help="Override the concurrency limit of single handlers, e.g. convert_audio=4"
+)
+server_options.add_argument(
+    '--max-batch-size', 
+    type=int, 
+    default=1, 
+    help="Group queued requests into batches for the handlers supporting it"
+)
+
+
+def get_server_options(args):
+    return {
+        "server_name": args.server_name,
+        "server_port": args.server_port,
+        "max_queue_size": args.max_queue_size,
+        "concurrency_limit": args.concurrency_limit,
+        "concurrency_limits": dict(args.handler_concurrency),
+        "max_batch_size": args.max_batch_size,
+    }
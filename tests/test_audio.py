@@ -0,0 +1,68 @@
+import io
+
+import numpy as np
+import pytest
+
+from genai_core.audio import audio_upload, decode_wav, encode_audio, load_samples, to_mono
+
+
+def sine(sample_rate=44100, amplitude=8000, seconds=0.1):
+    times = np.arange(int(sample_rate * seconds)) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * 440 * times)).astype(np.int16)
+
+
+def decoded(upload):
+    _, file = upload
+    sample_rate, samples = decode_wav(file)
+    return sample_rate, samples[:, 0]
+
+
+def test_to_mono_keeps_integer_dtype():
+    stereo = np.array([[100, 300], [-200, -400]], dtype=np.int16)
+    mono = to_mono(stereo)
+    assert mono.dtype == np.int16
+    assert mono.tolist() == [200, -300]
+
+
+@pytest.mark.parametrize("make_input", [
+    lambda samples: encode_audio(samples, 44100).getvalue(),
+    lambda samples: (44100, np.stack([samples, samples], axis=1)),
+    lambda samples: (44100, samples),
+], ids=["wav", "stereo_tuple", "mono_tuple"])
+def test_downsampling_preserves_the_signal(make_input):
+    samples = sine()
+    with audio_upload(make_input(samples), target_sample_rate=16000) as upload:
+        sample_rate, output = decoded(upload)
+    assert sample_rate == 16000
+    assert len(output) == pytest.approx(len(samples) * 16000 / 44100, abs=1)
+    # a sine, not a clipped square wave
+    assert np.abs(output).max() == pytest.approx(8000, rel=0.02)
+    assert abs(output.mean()) < 200
+
+
+def test_reencoding_stereo_wav_without_resampling():
+    samples = sine()
+    stereo_wav = io.BytesIO()
+    import wave
+    with wave.open(stereo_wav, "wb") as wav_file:
+        wav_file.setnchannels(2)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(44100)
+        wav_file.writeframes(np.stack([samples, samples], axis=1).tobytes())
+    with audio_upload(stereo_wav.getvalue(), audio_format="wav") as upload:
+        sample_rate, output = decoded(upload)
+    assert sample_rate == 44100
+    np.testing.assert_array_equal(output, samples)
+
+
+def test_load_samples_scales_to_unit_range():
+    samples = sine(amplitude=16384)
+    for audio in (encode_audio(samples, 44100).getvalue(), (44100, np.stack([samples, samples], axis=1))):
+        output = load_samples(audio)
+        assert output.dtype == np.float32
+        assert np.abs(output).max() == pytest.approx(0.5, rel=0.02)
+
+
+def test_load_samples_rejects_compressed_audio():
+    with pytest.raises(ValueError):
+        load_samples(b"ID3\x04\x00\x00\x00")
@@ -0,0 +1,23 @@
+import pytest
+
+from benchmarks import suite
+
+
+def broken():
+    raise ValueError("invalid template")
+
+
+def test_a_failing_case_does_not_stop_the_suite(monkeypatch):
+    monkeypatch.setitem(suite.CASES, "broken", broken)
+    monkeypatch.setitem(suite.CASES, "noop", lambda: lambda: None)
+    results = suite.run(["broken", "noop"], min_time=0.01, min_iterations=2)
+    assert results["broken"] == {"failed": "ValueError: invalid template"}
+    assert results["noop"]["iterations"] >= 2
+
+
+def test_failed_cases_fail_the_run(monkeypatch):
+    monkeypatch.setitem(suite.CASES, "broken", broken)
+    monkeypatch.setattr("sys.argv", ["suite", "--cases", "broken"])
+    with pytest.raises(SystemExit) as exit_info:
+        suite.main()
+    assert exit_info.value.code == 1
@@ -0,0 +1,56 @@
+import pytest
+
+pytest.importorskip("langchain")
+
+from biogen.cache import DiskLRUCache, MemoryLRUCache, stage_key
+from biogen.model import APIModel
+
+INPUTS = {"website": "name: Ada Lovelace", "curriculum": "Mathematician"}
+
+
+@pytest.fixture
+def local_backend(monkeypatch):
+    # the LLMs are only built, no request is sent
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+
+def keys(model):
+    chain = model._chain
+    return [
+        stage_key(stage, chain._select(INPUTS, stage))
+        for stage in (chain.json_reader, chain.curriculum_reader, chain.llm_core)
+    ]
+
+
+def test_temperature_only_changes_the_last_stage_key(local_backend):
+    *readers, core = keys(APIModel(temperature=0.7))
+    *other_readers, other_core = keys(APIModel(temperature=0.2))
+    assert readers == other_readers
+    assert core != other_core
+
+
+def test_model_changes_every_stage_key(local_backend):
+    first, second = keys(APIModel(model_name="text-davinci-003")), keys(APIModel(model_name="gpt-3.5-turbo-instruct"))
+    assert all(a != b for a, b in zip(first, second))
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryLRUCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("1", "3")
+
+
+def test_disk_cache_persists_and_evicts(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.put("c", "3")
+    cache.close()
+    cache = DiskLRUCache(str(tmp_path), max_entries=2)
+    assert cache.get("a") is None
+    assert (cache.get("b"), cache.get("c")) == ("2", "3")
+    cache.close()
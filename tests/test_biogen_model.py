@@ -0,0 +1,90 @@
+import asyncio
+import json
+from typing import Dict, List
+
+import pytest
+
+pytest.importorskip("langchain")
+
+from langchain import LLMChain
+from langchain.llms.base import LLM
+
+from biogen.batch import read_profiles
+from biogen.cache import MemoryLRUCache
+from biogen.chain import ModelChain
+from biogen.templates import GENERATE_BIO_TEMPLATE, READ_CURRICULUM_TEMPLATE, READ_JSON_TEMPLATE
+
+INPUTS = {"website": "name: Ada Lovelace", "curriculum": "Mathematician"}
+
+
+class RecordingLLM(LLM):
+    """Answers every prompt with ``reply`` and records the prompts."""
+    reply: str
+    prompts: List[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "recording"
+
+    @property
+    def _identifying_params(self) -> Dict[str, str]:
+        return {"reply": self.reply}
+
+    def _call(self, prompt, stop=None, run_manager=None, **kwargs) -> str:
+        self.prompts.append(prompt)
+        return self.reply
+
+
+def chain(reader_llm=None, core_llm=None, cache=None):
+    reader_llm = reader_llm or RecordingLLM(reply="career")
+    return ModelChain(
+        json_reader=LLMChain(llm=reader_llm, prompt=READ_JSON_TEMPLATE),
+        curriculum_reader=LLMChain(llm=reader_llm, prompt=READ_CURRICULUM_TEMPLATE),
+        llm_core=LLMChain(llm=core_llm or RecordingLLM(reply="bio"), prompt=GENERATE_BIO_TEMPLATE),
+        cache=cache,
+    )
+
+
+def test_timings_of_the_call_are_popped_by_run():
+    model_chain = chain()
+    outputs = model_chain(INPUTS, include_run_info=True)
+    assert outputs["text"] == "bio"
+    timings = model_chain.pop_timings(outputs)
+    assert set(timings) == {"json_reader", "curriculum_reader", "llm_core", "total"}
+    assert model_chain.run_timings == {}
+
+
+def test_async_call_records_its_timings():
+    model_chain = chain()
+    outputs = asyncio.run(model_chain.acall(INPUTS, include_run_info=True))
+    assert outputs["text"] == "bio"
+    assert "total" in model_chain.pop_timings(outputs)
+
+
+def test_run_returns_the_text():
+    assert chain().run(website="name: Ada Lovelace", curriculum="Mathematician") == "bio"
+
+
+def test_apply_batch_returns_the_texts_and_timings():
+    texts, timings = chain().apply_batch([INPUTS, INPUTS])
+    assert texts == ["bio", "bio"]
+    assert "total" in timings
+
+
+def test_cached_readers_are_not_run_again():
+    cache = MemoryLRUCache()
+    reader_llm = RecordingLLM(reply="career")
+    assert chain(reader_llm, RecordingLLM(reply="first"), cache)(INPUTS)["text"] == "first"
+    assert len(reader_llm.prompts) == 2
+    # a new chain with another generation stage shares the reader outputs
+    core_llm = RecordingLLM(reply="second")
+    assert chain(reader_llm, core_llm, cache)(INPUTS)["text"] == "second"
+    assert len(reader_llm.prompts) == 2
+    assert "career" in core_llm.prompts[0]
+
+
+def test_jsonl_profiles_as_objects(tmp_path):
+    path = tmp_path / "profiles.jsonl"
+    path.write_text(json.dumps({"id": "ada", "website_json": {"name": "Ada"}, "curriculum": "Mathematician"}) + "\n")
+    profile, = read_profiles(str(path))
+    assert json.loads(profile.website_json) == {"name": "Ada"}
@@ -0,0 +1,69 @@
+import io
+import json
+
+import pytest
+
+from biogen.preprocessing import iter_leaves, reduce_profile, strip_html
+
+PROFILE = {
+    "name": "Ada Lovelace",
+    "entityUrn": "urn:li:fs_profile:123",
+    "profilePicture": {"url": "https://example.com/ada.png"},
+    "experience": [
+        {"title": "Analyst", "company": "Analytical Engine", "description": "<p>Wrote <b>the</b> first program</p>"},
+    ],
+    "trackingId": "abc",
+}
+
+
+def test_iter_leaves_names_list_items():
+    leaves = dict(iter_leaves(json.dumps(PROFILE)))
+    assert leaves["experience.item.title"] == "Analyst"
+    assert leaves["profilePicture.url"] == "https://example.com/ada.png"
+
+
+def test_strip_html_keeps_the_visible_text():
+    assert strip_html("<div><script>x()</script><p>Hello <b>world</b></p></div>") == "Hello world"
+
+
+@pytest.mark.parametrize("make_source", [
+    json.dumps, lambda profile: json.dumps(profile).encode(), lambda profile: io.BytesIO(json.dumps(profile).encode()),
+], ids=["str", "bytes", "file"])
+def test_reduce_profile_keeps_the_career_fields(make_source):
+    reduced = reduce_profile(make_source(PROFILE))
+    assert reduced.text.split("\n") == [
+        "name: Ada Lovelace",
+        "experience.title: Analyst",
+        "experience.company: Analytical Engine",
+        "experience.description: Wrote the first program",
+    ]
+    assert 0 < reduced.tokens_after < reduced.tokens_before
+    assert reduced.reduction > 0
+
+
+def test_reduce_profile_of_a_page():
+    reduced = reduce_profile("<html><head><title>x</title></head><body><h1>Ada</h1></body></html>")
+    assert reduced.text == "Ada"
+
+
+@pytest.mark.parametrize("make_source", [json.dumps, lambda profile: io.BytesIO(json.dumps(profile).encode())], ids=["str", "file"])
+def test_reduce_profile_falls_back_to_the_raw_text(make_source):
+    raw = {"foo": "bar", "baz": [1, 2]}
+    reduced = reduce_profile(make_source(raw))
+    assert reduced.text == json.dumps(raw)
+    assert reduced.tokens_after == reduced.tokens_before
+
+
+def test_reduce_profile_does_not_read_files_whole():
+    pytest.importorskip("ijson")
+    sizes = []
+
+    class Recording(io.BytesIO):
+        def read(self, size=-1):
+            sizes.append(size)
+            return super().read(size)
+
+    reduced = reduce_profile(Recording(json.dumps(PROFILE).encode()))
+    assert "name: Ada Lovelace" in reduced.text
+    assert sizes and -1 not in sizes
+    assert reduced.tokens_before == pytest.approx(reduce_profile(json.dumps(PROFILE)).tokens_before, rel=0.1)
@@ -0,0 +1,76 @@
+from agent.tools.code_search import CodeIndex, CodeSearchToolExecutor, tokenize
+
+
+class FakeRepository:
+    def __init__(self, files):
+        self.files = dict(files)
+        self.branch = "main"
+        self.reads = 0
+
+    def get_current_branch(self):
+        return self.branch
+
+    def get_files(self):
+        return sorted(self.files)
+
+    def read_file(self, path):
+        self.reads += 1
+        if path not in self.files:
+            return "Unable to read file due to error:\nmissing"
+        return self.files[path]
+
+
+FILES = {
+    "src/components/NavBar.jsx": "export function NavBar({ links }) {\n  return <nav>{links}</nav>;\n}\n",
+    "src/styles/theme.css": ".nav-bar { color: red; }\n",
+    "src/api/client.js": "const fetchUser = async (id) => fetch(`/users/${id}`);\nexport default fetchUser;\n",
+    "logo.png": "binary",
+}
+
+
+def test_tokenize_splits_identifiers():
+    assert {"nav", "bar", "navbar"} <= set(tokenize("NavBar"))
+    assert {"fetch", "user", "fetchuser"} <= set(tokenize("fetchUser"))
+
+
+def test_search_ranks_paths_and_content():
+    index = CodeIndex()
+    for path, text in FILES.items():
+        index.add(path, text)
+    results = index.search("navbar links")
+    assert results[0]["path"] == "src/components/NavBar.jsx"
+    assert results[0]["snippets"][0]["text"]
+    index.remove("src/components/NavBar.jsx")
+    assert "src/components/NavBar.jsx" not in index
+    assert all(result["path"] != "src/components/NavBar.jsx" for result in index.search("navbar"))
+
+
+def test_find_symbol_exact_then_partial():
+    index = CodeIndex()
+    for path, text in FILES.items():
+        index.add(path, text)
+    assert [symbol.path for symbol in index.find_symbol("NavBar")] == ["src/components/NavBar.jsx"]
+    assert [symbol.name for symbol in index.find_symbol("user")] == ["fetchUser"]
+
+
+def test_the_index_follows_the_agent_writes():
+    repository = FakeRepository(FILES)
+    tools = CodeSearchToolExecutor(repository)
+    assert "NavBar.jsx" in tools.run("searchCode", query="navbar")
+    reads = repository.reads
+    tools.observe("createFile", {"file_path": "/src/Footer.jsx", "file_contents": "export function Footer() {}"}, "Created file /src/Footer.jsx")
+    tools.observe("deleteFile", {"file_path": "src/components/NavBar.jsx"}, "Deleted file src/components/NavBar.jsx")
+    tools.observe("updateFile", {"file_path": "src/api/client.js"}, "Unable to update file")
+    assert "src/Footer.jsx:1: function Footer" in tools.run("findSymbol", name="Footer")
+    assert tools.run("findSymbol", name="NavBar") == "No definition of NavBar found"
+    assert repository.reads == reads
+    # a new branch rebuilds the index
+    repository.branch = "feature"
+    tools.run("searchCode", query="footer")
+    assert repository.reads > reads
+
+
+def test_unknown_functions_are_reported():
+    tools = CodeSearchToolExecutor(FakeRepository({}))
+    assert tools.run("searchEverything", query="x") == "Function not found"
+    assert tools.run("searchCode", query="x") == "No results for x"
@@ -0,0 +1,86 @@
+from agent.compaction import CompactingExecutor, estimate_tokens, file_tree, html_to_text
+from agent.excecutor import FunctionExecutor
+
+
+class FakeRepository:
+    """Files in memory, served through the tool names of the agent."""
+
+    FUNCTIONS = ("readFile", "updateFile", "getStatus", "readWebpage", "searchCode")
+
+    def __init__(self, files):
+        self.files = files
+        self.reads = 0
+
+    @classmethod
+    def support(cls, function_name):
+        return function_name in cls.FUNCTIONS
+
+    def run(self, function_name, **kwargs):
+        if function_name == "readFile":
+            self.reads += 1
+            return self.files[kwargs["file_path"]]
+        if function_name == "updateFile":
+            self.files[kwargs["file_path"].lstrip("/")] = kwargs["file_contents"]
+            return "Updated file " + kwargs["file_path"]
+        if function_name == "getStatus":
+            return {"github_branch": "main", "files": sorted(self.files)}
+        if function_name == "readWebpage":
+            return "<html><head><style>p {}</style></head><body><p>Hello <a href='/docs'>docs</a></p></body></html>"
+        return "x" * 10000
+
+
+def executor(files, **kwargs):
+    repository = FakeRepository(files)
+    return repository, CompactingExecutor(FunctionExecutor([repository]), **kwargs)
+
+
+def test_long_files_are_paged():
+    text = "\n".join(f"line {i}" for i in range(2000))
+    repository, compacting = executor({"app.js": text}, budgets={"readFile": 500})
+    first = compacting.execute("readFile", file_path="app.js")
+    assert first.startswith("[readFile file_path=app.js: lines 1-")
+    next_line = int(first.split("start_line=")[1].split(" ")[0])
+    second = compacting.execute("readFile", file_path="app.js", start_line=next_line)
+    assert second.split("\n")[1] == f"line {next_line - 1}"
+    assert estimate_tokens(second) <= 600
+    # the next pages come from the text already fetched
+    assert repository.reads == 1
+
+
+def test_a_page_already_seen_is_referenced_until_it_expires():
+    repository, compacting = executor({"a.html": "<p>a</p>", "b.html": "<p>b</p>"}, seen_ttl_calls=3)
+    assert compacting.execute("readFile", file_path="a.html") == "<p>a</p>"
+    assert "unchanged since" in compacting.execute("readFile", file_path="a.html")
+    for _ in range(3):
+        compacting.execute("readFile", file_path="b.html")
+    assert compacting.execute("readFile", file_path="a.html") == "<p>a</p>"
+
+
+def test_writes_invalidate_the_cached_file():
+    repository, compacting = executor({"a.html": "<p>a</p>"})
+    compacting.execute("readFile", file_path="a.html")
+    compacting.execute("updateFile", file_path="/a.html", file_contents="<p>b</p>")
+    assert compacting.execute("readFile", file_path="a.html") == "<p>b</p>"
+
+
+def test_status_and_other_outputs_fit_their_budgets():
+    files = {f"src/components/part_{i}/view_{j}.js": "" for i in range(50) for j in range(20)}
+    _, compacting = executor(files, budgets={"getStatus": 200, "searchCode": 100})
+    status = compacting.execute("getStatus")
+    assert "files (1000):" in status
+    assert estimate_tokens(status) <= 250
+    assert compacting.execute("searchCode", query="x").endswith("[output of searchCode truncated to 100 tokens]")
+    assert compacting.saved_tokens > 0
+
+
+def test_file_tree_collapses_deep_directories():
+    tree = file_tree(["a/b/c.js", "a/b/d.js", "a/e.css", "f.html"], budget=1000)
+    assert tree.split("\n") == ["a/", "  b/", "    c.js", "    d.js", "  e.css", "f.html"]
+    collapsed = file_tree(["a/b/c.js", "a/b/d.js", "a/e.css", "f.html"], budget=4)
+    assert collapsed.startswith("a/ (3 files: .js 2, .css 1)")
+
+
+def test_html_to_text_keeps_the_visible_text_and_links():
+    _, compacting = executor({})
+    assert compacting.execute("readWebpage", url="https://example.com") == "Hello [/docs] docs"
+    assert html_to_text("plain text") == "plain text"
@@ -0,0 +1,139 @@
+import base64
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from code_reviewer import git_mirror
+from code_reviewer.git_mirror import GitMirror, parse_diff
+
+NAMES = ["plain.py", "with space.py", "café.py", 'quo"te.py', "tab\tname.py"]
+
+
+def git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True,
+    )
+
+
+@pytest.fixture
+def repository(tmp_path):
+    path = tmp_path / "repository"
+    path.mkdir()
+    git(path, "init", "--quiet", "--initial-branch=main")
+    (path / "kept.py").write_text("a = 1\n")
+    (path / "gone.py").write_text("b = 2\n")
+    (path / "old name.py").write_text("".join(f"line_{i} = {i}\n" for i in range(20)))
+    git(path, "add", "-A")
+    git(path, "commit", "--quiet", "-m", "base")
+    git(path, "checkout", "--quiet", "-b", "feature")
+    for name in NAMES:
+        (path / name).write_text(f"name = {name!r}\n")
+    (path / "kept.py").write_text("a = 1\nc = 3\n")
+    (path / "gone.py").unlink()
+    git(path, "mv", "old name.py", "new name.py")
+    (path / "new name.py").write_text((path / "new name.py").read_text() + "line_20 = 20\n")
+    git(path, "add", "-A")
+    git(path, "commit", "--quiet", "-m", "feature")
+    return path
+
+
+def sha(path, ref):
+    return subprocess.run(["git", "rev-parse", ref], cwd=path, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def test_parse_diff_of_special_paths(repository):
+    diff = subprocess.run(
+        ["git", "-c", "core.quotePath=false", "diff", "-M", "main...feature"],
+        cwd=repository, check=True, capture_output=True,
+    ).stdout.decode("utf-8")
+    changes = {change.filename: change for change in parse_diff(diff)}
+    assert sorted(changes) == sorted(NAMES + ["kept.py", "gone.py", "new name.py"])
+    for name in NAMES:
+        assert changes[name].status == "added"
+        assert changes[name].patch.startswith("@@")
+    assert changes["gone.py"].status == "removed"
+    assert changes["kept.py"].status == "modified"
+    assert changes["kept.py"].patch.endswith("+c = 3")
+    assert changes["new name.py"].status == "renamed"
+    assert changes["new name.py"].previous_filename == "old name.py"
+
+
+def test_parse_diff_of_binary_files():
+    diff = (
+        'diff --git "a/ima ge\\"s.png" "b/ima ge\\"s.png"\n'
+        "new file mode 100644\n"
+        "Binary files /dev/null and \"b/ima ge\\\"s.png\" differ\n"
+        "diff --git a/logo.png b/logo.png\n"
+        "Binary files a/logo.png and b/logo.png differ\n"
+    )
+    changes = parse_diff(diff)
+    assert [change.filename for change in changes] == ['ima ge"s.png', "logo.png"]
+    assert [change.status for change in changes] == ["added", "modified"]
+
+
+def test_mirror_reads_the_files_before_and_after(repository, tmp_path):
+    mirror = GitMirror(str(tmp_path / "mirrors"))
+    remote = repository.as_uri()
+    base, head = sha(repository, "main"), sha(repository, "feature")
+    changes = {change.filename: change for change in mirror.diff(remote, base, head)}
+    assert "with space.py" in changes
+    after = mirror.read_files(remote, head, ["with space.py", "kept.py", "gone.py"])
+    assert after == {"with space.py": "name = 'with space.py'\n", "kept.py": "a = 1\nc = 3\n", "gone.py": None}
+    assert mirror.merge_base(remote, base, head) == base
+    assert mirror.read_files(remote, base, ["gone.py"]) == {"gone.py": "b = 2\n"}
+
+
+def test_mirror_token_is_never_stored(repository, tmp_path, monkeypatch):
+    environments = []
+    run = git_mirror.subprocess.run
+
+    def recording_run(command, **kwargs):
+        environments.append((command[3], kwargs.get("env")))
+        return run(command, **kwargs)
+
+    monkeypatch.setattr(git_mirror.subprocess, "run", recording_run)
+    mirror = GitMirror(str(tmp_path / "mirrors"))
+    remote = repository.as_uri()
+    mirror.sync(remote, token="secret-token")
+    path = mirror.sync(remote, token="secret-token")
+
+    assert "secret-token" not in (Path(path) / "config").read_text()
+    header = "Authorization: Basic " + base64.b64encode(b"x-access-token:secret-token").decode()
+    assert {command for command, env in environments if env is not None} == {"clone", "fetch"}
+    assert all(env["GIT_CONFIG_VALUE_0"] == header for _, env in environments if env is not None)
+
+
+class SilentReviewer:
+    def __call__(self, filename, patch, context=None):
+        return []
+
+    def reset(self):
+        pass
+
+
+def test_review_reads_only_the_files_it_may_review(repository, tmp_path, monkeypatch):
+    pytest.importorskip("github")
+    from code_reviewer.github_code import GithubAPI
+    from code_reviewer.local_github import LocalGithub
+
+    github = LocalGithub()
+    github.add_pull(
+        "octo/repo", 1, sha(repository, "feature"),
+        base_sha=sha(repository, "main"), clone_url=repository.as_uri(),
+    )
+    mirror = GitMirror(str(tmp_path / "mirrors"))
+    reads = []
+    read_files = mirror.read_files
+
+    def recording_read_files(remote_url, sha, paths, token=None):
+        reads.append(paths)
+        return read_files(remote_url, sha, paths, token)
+
+    monkeypatch.setattr(mirror, "read_files", recording_read_files)
+    api = GithubAPI(None, github=github, mirror=mirror)
+    api.code_reviewer = SilentReviewer()
+    api.write_comments_for_pr("octo/repo", 1)
+    # neither the removed gone.py nor the renamed file
+    assert [sorted(paths) for paths in reads] == [sorted(NAMES + ["kept.py"])]
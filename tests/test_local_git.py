@@ -0,0 +1,73 @@
+import base64
+import subprocess
+
+import pytest
+
+pytest.importorskip("github")
+
+from agent.tools import local_git
+from agent.tools.local_git import LocalGitInterface
+
+
+def git(cwd, *args):
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True, text=True,
+    ).stdout
+
+
+@pytest.fixture
+def remote(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    git(source, "init", "--quiet", "--initial-branch=main")
+    (source / "index.html").write_text("<h1>v1</h1>\n")
+    git(source, "add", "-A")
+    git(source, "commit", "--quiet", "-m", "v1")
+    bare = tmp_path / "remote.git"
+    git(tmp_path, "clone", "--quiet", "--bare", str(source), str(bare))
+    git(source, "remote", "add", "origin", str(bare))
+    return source, bare
+
+
+def test_reopening_a_clone_starts_from_the_latest_base(remote, tmp_path):
+    source, bare = remote
+    clone = str(tmp_path / "clone")
+    first = LocalGitInterface.from_remote(bare.as_uri(), clone)
+    assert first.github_base_branch == "main"
+    assert "Successfully" in first.create_branch("agent/feature")
+    (source / "index.html").write_text("<h1>v2</h1>\n")
+    git(source, "commit", "--quiet", "-am", "v2")
+    git(source, "push", "--quiet", "origin", "main")
+
+    second = LocalGitInterface.from_remote(bare.as_uri(), clone, github_branch="main")
+    assert second.read_file("index.html") == "<h1>v2</h1>\n"
+    third = LocalGitInterface.from_remote(bare.as_uri(), clone, github_branch="agent/feature")
+    assert git(clone, "rev-parse", "main") == git(bare, "rev-parse", "main")
+    assert third.get_current_branch() == "agent/feature"
+
+
+def test_the_token_stays_out_of_the_clone(remote, tmp_path, monkeypatch):
+    _, bare = remote
+    environments = []
+    run = subprocess.run
+
+    def recording_run(command, **kwargs):
+        environments.append((command, kwargs.get("env")))
+        return run(command, **kwargs)
+
+    monkeypatch.setattr(local_git.subprocess, "run", recording_run)
+    clone = tmp_path / "clone"
+    interface = LocalGitInterface.from_remote(bare.as_uri(), str(clone), github_token="secret-token")
+    interface.create_branch("agent/feature")
+    interface.create_file("about.html", "<p>about</p>")
+    assert "Pushed branch agent/feature" in interface.create_pull_request("Add about\n\nbody")
+
+    assert "secret-token" not in (clone / ".git" / "config").read_text()
+    assert "secret-token" not in repr(interface)
+    header = "Authorization: Basic " + base64.b64encode(b"x-access-token:secret-token").decode()
+    remote_commands = {command[3] for command, env in environments if env is not None}
+    assert remote_commands == {"clone", "push"}
+    assert all(env["GIT_CONFIG_VALUE_0"] == header for _, env in environments if env is not None)
+    assert all("secret-token" not in " ".join(command) for command, _ in environments)
+    assert git(bare, "rev-parse", "agent/feature") == git(clone, "rev-parse", "agent/feature")
@@ -0,0 +1,82 @@
+import io
+import os
+import wave
+
+import pytest
+
+from real_time_translation.ai_translate import local_tts
+from real_time_translation.ai_translate.local_tts import (
+    ENGINES, LocalVoiceBackend, SpeechEngine, split_text, wav_header,
+)
+from real_time_translation.ai_translate.models import TextToVoice
+
+
+class ToneEngine(SpeechEngine):
+    """One sample per character, the worker dies on "crash"."""
+
+    def synthesize(self, language, text):
+        if text == "crash.":
+            os._exit(1)
+        return 8000, b"\x01\x00" * len(text)
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    monkeypatch.setitem(ENGINES, "tone", ToneEngine)
+    (tmp_path / "voice.onnx").write_bytes(b"")
+    backend = LocalVoiceBackend("tone", voices={"english": "voice"}, voices_dir=str(tmp_path), workers=1)
+    yield backend
+    backend.close()
+
+
+def test_split_text_in_sentences():
+    assert split_text("Hello there. How are you?  Fine!") == ["Hello there.", "How are you?", "Fine!"]
+    assert split_text("   ") == []
+
+
+def test_split_text_cuts_long_sentences_at_spaces():
+    chunks = split_text("word " * 100, max_chars=32)
+    assert all(len(chunk) <= 32 for chunk in chunks)
+    assert " ".join(chunks).split() == ["word"] * 100
+    assert split_text("x" * 10, max_chars=4) == ["xxxx", "xxxx", "xx"]
+
+
+def test_wav_header_is_readable():
+    pcm = b"\x00\x01" * 100
+    with wave.open(io.BytesIO(wav_header(22050, len(pcm)) + pcm)) as wav_file:
+        assert (wav_file.getframerate(), wav_file.getnchannels(), wav_file.getsampwidth()) == (22050, 1, 2)
+        assert wav_file.readframes(1000) == pcm
+
+
+def test_missing_voice_files_are_reported(tmp_path):
+    with pytest.raises(FileNotFoundError, match="en_US-lessac-medium.onnx"):
+        LocalVoiceBackend("piper", voices={"english": "en_US-lessac-medium"}, voices_dir=str(tmp_path))
+    # piper needs the config next to the model
+    (tmp_path / "en_US-lessac-medium.onnx").write_bytes(b"")
+    with pytest.raises(FileNotFoundError, match="onnx.json"):
+        LocalVoiceBackend("piper", voices={"english": "en_US-lessac-medium"}, voices_dir=str(tmp_path))
+
+
+def test_stream_yields_the_sentences_in_order(backend):
+    chunks = list(backend.stream("One. Three.", "english"))
+    assert chunks[0] == wav_header(8000)
+    assert chunks[1:] == [b"\x01\x00" * 4, b"\x01\x00" * 6]
+    with wave.open(io.BytesIO(backend.synthesize("One. Three.", "english"))) as wav_file:
+        assert wav_file.getnframes() == 10
+
+
+def test_a_broken_pool_is_replaced(backend):
+    with pytest.raises(local_tts.BrokenProcessPool):
+        backend.synthesize("crash.", "english")
+    assert backend.synthesize("Back.", "english").endswith(b"\x01\x00" * 5)
+
+
+def test_text_to_voice_writes_local_speech(backend):
+    model = TextToVoice(backend=backend)
+    before = model.metrics.snapshot()
+    path = model("Hello.", "english")
+    with wave.open(path) as wav_file:
+        assert wav_file.getnframes() == 6
+    after = model.metrics.snapshot()
+    assert after["calls"] - before["calls"] == 1
+    assert after["payload_bytes"] - before["payload_bytes"] == os.path.getsize(path)
@@ -0,0 +1,62 @@
+import httpx
+import numpy as np
+import pytest
+
+from genai_core import client
+from genai_core.models import WhisperModel
+from genai_core.speech import LocalSpeechBackend
+
+
+class EchoBackend(LocalSpeechBackend):
+    """Transcribes a clip as its number of samples."""
+
+    def _load(self):
+        return "engine"
+
+    def _transcribe(self, engine, samples):
+        if not len(samples):
+            raise RuntimeError("empty clip")
+        return f"{len(samples)} samples"
+
+
+@pytest.fixture
+def model():
+    backend = EchoBackend(workers=2)
+    yield WhisperModel("whisper-1", backend=backend)
+    backend.close()
+
+
+def clip(n_samples):
+    return 16000, np.zeros(n_samples, dtype=np.int16)
+
+
+def test_local_backend_records_each_call(model):
+    before = model.metrics.snapshot()
+    assert model.run_batch([clip(1600), clip(3200)]) == ["1600 samples", "3200 samples"]
+    assert model(clip(1600)) == "1600 samples"
+    after = model.metrics.snapshot()
+    assert after["calls"] - before["calls"] == 2
+    assert after["errors"] == before["errors"]
+
+
+def test_local_backend_records_failures(model):
+    before = model.metrics.snapshot()
+    with pytest.raises(RuntimeError):
+        model(clip(0))
+    assert model.metrics.snapshot()["errors"] - before["errors"] == 1
+
+
+def test_api_requests_are_retried_and_recorded_once(model, monkeypatch):
+    monkeypatch.setattr(client, "backoff_delay", lambda attempt, config=None: 0.0)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise httpx.ConnectError("refused")
+        return "ok"
+
+    before = model.metrics.snapshot()
+    assert model._request(flaky) == "ok"
+    assert len(attempts) == 2
+    assert model.metrics.snapshot()["calls"] - before["calls"] == 1
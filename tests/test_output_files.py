@@ -0,0 +1,21 @@
+import os
+
+from real_time_translation.ai_translate.files import OutputFiles
+
+
+def test_only_the_recent_files_are_kept():
+    files = OutputFiles(max_files=2)
+    paths = [files.write(str(i).encode(), ".wav") for i in range(3)]
+    assert not os.path.exists(paths[0])
+    assert [open(path, "rb").read() for path in paths[1:]] == [b"1", b"2"]
+    assert all(os.path.dirname(path) == files.directory for path in paths)
+    files.cleanup()
+    assert not os.path.exists(files.directory)
+
+
+def test_new_paths_are_unique():
+    files = OutputFiles()
+    paths = {files.new_path(".zip", prefix="translations-") for _ in range(10)}
+    assert len(paths) == 10
+    assert all(os.path.basename(path).startswith("translations-") for path in paths)
+    files.cleanup()
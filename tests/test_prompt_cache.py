@@ -0,0 +1,50 @@
+from voice2image.voice2image.cache import ImageCache, PromptCache, normalize_text
+
+
+def test_transcripts_are_normalized():
+    assert normalize_text("  A red   CAR. ") == "a red car"
+    cache = PromptCache()
+    cache.put("A red car.", "prompt")
+    assert cache.get("a red car") == "prompt"
+
+
+def test_reordered_or_negated_transcripts_do_not_match_by_default():
+    cache = PromptCache()
+    cache.put("a dog chasing a cat", "dog")
+    assert cache.get("a cat chasing a dog") is None
+    cache.put("a red car on a sunny beach at noon with palm trees", "beach")
+    assert cache.get("a red car on a sunny beach at noon with no palm trees") is None
+
+
+def test_similar_transcripts_share_a_prompt():
+    cache = PromptCache(similarity_threshold=0.8)
+    cache.put("a red car on a sunny beach at noon", "beach")
+    assert cache.get("the red car on a sunny beach at noon") == "beach"
+    # the same words in another order
+    assert cache.get("a sunny car on a red beach at noon") is None
+
+
+def test_exact_mode_never_matches_similar_transcripts():
+    cache = PromptCache(similarity_threshold=1.0)
+    cache.put("a red car on a sunny beach at noon today", "beach")
+    assert cache.get("the red car on a sunny beach at noon today") is None
+    assert cache.get("A red car on a sunny beach at noon today!") == "beach"
+
+
+def test_least_recently_used_prompts_are_evicted():
+    cache = PromptCache(max_size=2, similarity_threshold=1.0)
+    cache.put("one", "1")
+    cache.put("two", "2")
+    assert cache.get("one") == "1"
+    cache.put("three", "3")
+    assert (cache.get("one"), cache.get("two"), cache.get("three")) == ("1", None, "3")
+
+
+def test_image_cache_needs_every_image(tmp_path):
+    cache = ImageCache(str(tmp_path))
+    cache.put("a cat", "512x512", 0, b"png0")
+    assert cache.get("a cat", "512x512", 2) is None
+    cache.put("a cat", "512x512", 1, b"png1")
+    paths = cache.get("a cat", "512x512", 2)
+    assert [open(path, "rb").read() for path in paths] == [b"png0", b"png1"]
+    assert cache.get("a cat", "1024x1024", 1) is None
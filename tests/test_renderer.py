@@ -0,0 +1,26 @@
+from os.path import dirname, join
+
+import pytest
+
+pytest.importorskip("rich")
+
+
+@pytest.fixture
+def renderer(monkeypatch):
+    monkeypatch.syspath_prepend(join(dirname(dirname(__file__)), "src"))
+    import renderer
+    return renderer
+
+
+def test_handler_concurrency_overrides(renderer):
+    args = renderer.parser.parse_args(["--a", "--handler-concurrency", "convert_audio=4", "translate_audio=2"])
+    limits = renderer.get_server_options(args)["concurrency_limits"]
+    assert limits == {"convert_audio": 4, "translate_audio": 2}
+
+
+@pytest.mark.parametrize("option", ["convert_audio", "convert_audio=four", "=4", "convert_audio=0"])
+def test_malformed_handler_concurrency_is_a_usage_error(renderer, option, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        renderer.parser.parse_args(["--a", "--handler-concurrency", option])
+    assert exit_info.value.code == 2
+    assert "expected HANDLER=LIMIT" in capsys.readouterr().err
@@ -0,0 +1,126 @@
+import sqlite3
+import time
+
+import pytest
+
+from code_reviewer.jobs import DONE, FAILED, QUEUED, SUPERSEDED, ReviewJobQueue
+from code_reviewer.local_github import LocalGithub
+from code_reviewer.service import ReviewService
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = ReviewJobQueue(str(tmp_path / "jobs.sqlite"), max_attempts=3, retry_delay=0.2)
+    yield queue
+    queue.close()
+
+
+def statuses(queue):
+    return dict(queue._connection.execute("SELECT head_sha, status FROM jobs").fetchall())
+
+
+def test_a_commit_is_queued_once(queue):
+    assert queue.enqueue("octo/repo", 1, "a") is not None
+    assert queue.enqueue("octo/repo", 1, "a") is None
+    job = queue.claim(timeout=0)
+    assert queue.enqueue("octo/repo", 1, "a") is None
+    queue.complete(job)
+    assert queue.enqueue("octo/repo", 1, "a") is None
+    assert queue.stats()["done"] == 1
+
+
+def test_a_new_commit_supersedes_the_queued_ones(queue):
+    queue.enqueue("octo/repo", 1, "a")
+    queue.enqueue("octo/repo", 2, "b")
+    queue.enqueue("octo/repo", 1, "c")
+    assert statuses(queue) == {"a": SUPERSEDED, "b": QUEUED, "c": QUEUED}
+    assert [queue.claim(timeout=0).head_sha for _ in range(2)] == ["b", "c"]
+    assert queue.claim(timeout=0) is None
+
+
+def test_failed_jobs_are_retried_after_a_backoff(queue):
+    queue.enqueue("octo/repo", 1, "a")
+    job = queue.claim(timeout=0)
+    queue.fail(job, "boom")
+    assert queue.claim(timeout=0) is None
+    start = time.monotonic()
+    retry = queue.claim(timeout=5)
+    assert 0.15 < time.monotonic() - start < 2
+    assert (retry.id, retry.attempts) == (job.id, 2)
+    queue.fail(retry, "boom")
+    # the delay doubles
+    assert queue.claim(timeout=0.3) is None
+    last = queue.claim(timeout=5)
+    queue.fail(last, "boom")
+    assert statuses(queue) == {"a": FAILED}
+    assert queue.claim(timeout=0) is None
+
+
+def test_an_old_queue_is_migrated(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, repository TEXT NOT NULL, "
+            "pr_number INTEGER NOT NULL, head_sha TEXT NOT NULL, status TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, enqueued_at REAL NOT NULL, started_at REAL, "
+            "finished_at REAL, error TEXT, UNIQUE (repository, pr_number, head_sha))"
+        )
+        connection.execute(
+            "INSERT INTO jobs (repository, pr_number, head_sha, status, enqueued_at) VALUES (?, ?, ?, ?, ?)",
+            ("octo/repo", 1, "a", "running", time.time()),
+        )
+    connection.close()
+    queue = ReviewJobQueue(path)
+    assert queue.claim(timeout=0).head_sha == "a"
+    queue.close()
+
+
+def test_the_service_retries_failed_reviews(queue):
+    calls = []
+
+    def review(repository, pr_number, head_sha):
+        calls.append(head_sha)
+        if len(calls) == 1:
+            raise RuntimeError("rate limited")
+
+    service = ReviewService(queue, lambda: review, workers=1)
+    queue.enqueue("octo/repo", 1, "a")
+    service.start()
+    deadline = time.monotonic() + 5
+    while statuses(queue)["a"] != DONE and time.monotonic() < deadline:
+        time.sleep(0.05)
+    service.stop()
+    assert calls == ["a", "a"]
+    assert statuses(queue)["a"] == DONE
+
+
+class FlakyReviewer:
+    """Comments every line 1, fails on the files named in ``failing``."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+
+    def __call__(self, filename, patch, context=None):
+        if filename in self.failing:
+            raise RuntimeError("timeout")
+        return [(filename, 2, f"comment on {filename}")]
+
+    def reset(self):
+        pass
+
+
+def test_a_failed_review_posts_nothing():
+    pytest.importorskip("github")
+    from code_reviewer.github_code import GithubAPI
+
+    github = LocalGithub()
+    pull = github.add_pull("octo/repo", 1, "a", [("a.py", "@@ -1 +1 @@\n-x\n+y"), ("b.py", "@@ -1 +1 @@\n-x\n+y")])
+    api = GithubAPI(None, github=github)
+    api.code_reviewer = FlakyReviewer(failing={"b.py"})
+    with pytest.raises(RuntimeError):
+        api.write_comments_for_pr("octo/repo", 1)
+    assert pull.comments == [] and pull.reviews == []
+    api.code_reviewer = FlakyReviewer()
+    api.write_comments_for_pr("octo/repo", 1)
+    assert sorted(comment["path"] for comment in pull.comments) == ["a.py", "b.py"]
+    assert len(pull.reviews) == 1
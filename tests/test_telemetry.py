@@ -0,0 +1,78 @@
+import io
+import json
+import logging
+
+import pytest
+
+from genai_core import telemetry
+from genai_core.models import WhisperModel
+from genai_core.telemetry import (
+    Lazy, SamplingFilter, StructuredFormatter, configure_logging, get_logger, log_call, truncate,
+)
+
+
+@pytest.fixture
+def genai_logger():
+    logger = logging.getLogger(telemetry.ROOT_LOGGER)
+    state = (list(logger.handlers), logger.level, logger.propagate)
+    for handler in state[0]:
+        logger.removeHandler(handler)
+    yield logger
+    if telemetry._listener is not None:
+        telemetry._listener.stop()
+        telemetry._listener = None
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    for handler in state[0]:
+        logger.addHandler(handler)
+    logger.setLevel(state[1])
+    logger.propagate = state[2]
+
+
+def record(fields=None, level=logging.INFO):
+    record = logging.LogRecord("genai.test", level, __file__, 1, "api call", (), None)
+    record.fields = fields
+    return record
+
+
+def test_structured_formatter():
+    fields = {"model": "m", "latency_ms": 1.5}
+    assert StructuredFormatter().format(record(fields)).endswith("api call model=m latency_ms=1.5")
+    line = json.loads(StructuredFormatter(json_lines=True).format(record(fields)))
+    assert (line["message"], line["model"], line["level"]) == ("api call", "m", "INFO")
+
+
+def test_sampling_keeps_the_warnings():
+    sampling = SamplingFilter(0.0)
+    assert not sampling.filter(record())
+    assert sampling.filter(record(level=logging.WARNING))
+
+
+def test_lazy_arguments_are_formatted_on_demand():
+    calls = []
+    lazy = Lazy(lambda: calls.append(1) or "value")
+    assert not calls
+    assert str(lazy) == "value" and calls == [1]
+    assert str(truncate("x" * 300, limit=10)) == "xxxxxxxxxx... (300 chars)"
+
+
+def test_log_call_fields(genai_logger):
+    stream = io.StringIO()
+    configure_logging(level="INFO", json_lines=True, stream=stream)
+    log_call(get_logger("test"), "m", 0.25, 3, 4, 5, error=ValueError())
+    telemetry._listener.stop()
+    line = json.loads(stream.getvalue())
+    assert line["level"] == "WARNING"
+    assert (line["latency_ms"], line["prompt_tokens"], line["bytes"], line["error"]) == (250.0, 3, 5, "ValueError")
+    telemetry._listener = None
+
+
+def test_verbose_is_scoped_to_the_instance(genai_logger, monkeypatch):
+    monkeypatch.setattr(logging.getLogger(), "handlers", [])
+    quiet = WhisperModel("whisper-1")
+    verbose = WhisperModel("whisper-1", verbose=True)
+    assert verbose.logger.isEnabledFor(logging.DEBUG)
+    assert not quiet.logger.isEnabledFor(logging.DEBUG)
+    assert not WhisperModel("whisper-1").logger.isEnabledFor(logging.DEBUG)
+    # nothing was configured, verbose attached a handler so the records show
+    assert genai_logger.handlers
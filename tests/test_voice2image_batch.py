@@ -0,0 +1,15 @@
+from voice2image.batch import find_clips
+
+
+def test_clips_of_the_same_name_get_distinct_ids(tmp_path):
+    (tmp_path / "sub").mkdir()
+    for name in ("a.wav", "a.mp3", "sub/a.wav", "notes.txt"):
+        (tmp_path / name).write_bytes(b"")
+    clips = find_clips(str(tmp_path))
+    assert [clip.id for clip in clips] == ["a.mp3", "a.wav", "sub/a.wav"]
+
+
+def test_manifest_ids_default_to_the_relative_path(tmp_path):
+    manifest = tmp_path / "clips.txt"
+    manifest.write_text("a.wav\nsub/a.mp3\n")
+    assert [clip.id for clip in find_clips(str(manifest))] == ["a.wav", "sub/a.mp3"]
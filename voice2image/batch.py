@@ -0,0 +1,205 @@
+"""Headless batch mode for voice2image.
+
+Transcribes, refines and generates images for a directory (or a manifest) of
+audio prompts, writing the images and an ``index.jsonl`` to the output
+directory. Clips already in the index are skipped, so an interrupted run can
+simply be restarted with the same arguments.
+
+Usage:
+    python -m voice2image.batch path/to/audio_dir --output-dir out --concurrency 4
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Set
+
+from genai_core.audio import WHISPER_SAMPLE_RATE
+from .voice2image.cache import PromptCache
+from .voice2image.models import (
+    WhisperModel, PromptGenerationModel, ImageGenerationModel
+)
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg", ".webm", ".mp4", ".mpeg", ".mpga")
+INDEX_FILE = "index.jsonl"
+
+
+@dataclass(frozen=True)
+class Clip:
+    id: str
+    path: str
+
+
+def find_clips(source: str) -> List[Clip]:
+    """List the clips in a directory, or in a manifest file.
+
+    A manifest is either a JSONL file with a "path" and an optional "id" field
+    per line, or a plain text file with one audio path per line. Relative
+    paths are resolved from the manifest directory.
+    """
+    if os.path.isdir(source):
+        clips = []
+        for root, _, files in os.walk(source):
+            for file_name in sorted(files):
+                if file_name.lower().endswith(AUDIO_EXTENSIONS):
+                    path = os.path.join(root, file_name)
+                    clips.append(Clip(_clip_id(os.path.relpath(path, source)), path))
+        return sorted(clips, key=lambda clip: clip.id)
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    clips = []
+    with open(source, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if source.endswith(".jsonl"):
+                entry = json.loads(line)
+                path, clip_id = entry["path"], entry.get("id")
+            else:
+                path, clip_id = line, None
+            path = os.path.join(base_dir, path)
+            clips.append(Clip(clip_id or _clip_id(os.path.relpath(path, base_dir)), path))
+    return clips
+
+
+def _clip_id(relative_path: str) -> str:
+    # the extension is kept, a.wav and a.mp3 are two clips
+    return relative_path.replace(os.sep, "/")
+
+
+def load_done(index_path: str) -> Set[str]:
+    done = set()
+    if not os.path.exists(index_path):
+        return done
+    with open(index_path, "r") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["id"])
+            except (json.JSONDecodeError, KeyError):
+                # the last line may be truncated if the previous run was killed
+                continue
+    return done
+
+
+class BatchRunner:
+    def __init__(
+            self,
+            output_dir: str,
+            n_images: int = 4,
+            concurrency: int = 4,
+            verbose: bool = False,
+    ):
+        self.output_dir = output_dir
+        self.images_dir = os.path.join(output_dir, "images")
+        self.index_path = os.path.join(output_dir, INDEX_FILE)
+        self.concurrency = concurrency
+        self.whisper_model = WhisperModel(
+            "whisper-1", target_sample_rate=WHISPER_SAMPLE_RATE, verbose=verbose
+        )
+        # exact matches only, two different clips of a batch must never get
+        # the same prompt because their transcripts are alike
+        self.prompt_generation_model = PromptGenerationModel(
+            cache=PromptCache(similarity_threshold=1.0), verbose=verbose
+        )
+        self.image_generation_model = ImageGenerationModel(
+            n_images=n_images,
+            parallel=True,
+            cache_dir=os.path.join(output_dir, "cache"),
+            verbose=verbose,
+        )
+        self._index_lock = threading.Lock()
+        os.makedirs(self.images_dir, exist_ok=True)
+
+    def process(self, clip: Clip) -> Dict:
+        start = time.perf_counter()
+        transcript = self.whisper_model(clip.path)
+        prompt = self.prompt_generation_model(transcript)
+        cached_images = self.image_generation_model(prompt)
+        images = []
+        for i, cached_image in enumerate(cached_images):
+            image_path = os.path.join(self.images_dir, f"{clip.id}_{i}.png")
+            os.makedirs(os.path.dirname(image_path), exist_ok=True)
+            shutil.copyfile(cached_image, image_path)
+            images.append(os.path.relpath(image_path, self.output_dir))
+        return {
+            "id": clip.id,
+            "audio": clip.path,
+            "transcript": transcript,
+            "prompt": prompt,
+            "images": images,
+            "latency": time.perf_counter() - start,
+        }
+
+    def _write(self, record: Dict) -> None:
+        with self._index_lock:
+            with open(self.index_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+    def run(self, clips: Iterable[Clip]) -> Dict[str, float]:
+        done = load_done(self.index_path)
+        todo = [clip for clip in clips if clip.id not in done]
+        print(f"{len(done)} clips already done, {len(todo)} to go")
+        start = time.perf_counter()
+        n_done, n_failed = 0, 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {executor.submit(self.process, clip): clip for clip in todo}
+            for future in as_completed(futures):
+                clip = futures[future]
+                try:
+                    record = future.result()
+                except Exception as e:
+                    n_failed += 1
+                    print(f"FAILED {clip.id}: {e}", file=sys.stderr)
+                    continue
+                self._write(record)
+                n_done += 1
+                elapsed = time.perf_counter() - start
+                print(
+                    f"[{n_done + n_failed}/{len(todo)}] {clip.id} "
+                    f"({record['latency']:.1f}s) - {60 * n_done / elapsed:.1f} clips/min"
+                )
+        elapsed = time.perf_counter() - start
+        stats = {
+            "done": n_done,
+            "failed": n_failed,
+            "skipped": len(done),
+            "elapsed": elapsed,
+            "clips_per_minute": 60 * n_done / elapsed if elapsed > 0 else 0.0,
+        }
+        print(
+            f"Processed {n_done} clips ({n_failed} failed) in {elapsed:.1f}s - "
+            f"{stats['clips_per_minute']:.1f} clips/min"
+        )
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m voice2image.batch",
+        description="Generate images for a directory or manifest of audio prompts.",
+    )
+    parser.add_argument("source", help="directory of audio files, or a .jsonl/.txt manifest")
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument("--n-images", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=4, help="clips processed at the same time")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    runner = BatchRunner(
+        args.output_dir,
+        n_images=args.n_images,
+        concurrency=args.concurrency,
+        verbose=args.verbose,
+    )
+    stats = runner.run(find_clips(args.source))
+    sys.exit(1 if stats["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,104 @@
 import os
+import queue
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
 import gradio as gr
 
+from genai_core.audio import WHISPER_SAMPLE_RATE
+from genai_core.telemetry import configure_logging
+from .voice2image.cache import PromptCache
 from .voice2image.models import (
     WhisperModel, PromptGenerationModel, ImageGenerationModel
 )
 
-debug = True
-whisper_model = WhisperModel("whisper-1", verbose=debug)
-prompt_generation_model = PromptGenerationModel(verbose=debug)
-image_generation_model = ImageGenerationModel(n_images=4, verbose=debug)
+# log level, sampling and format are read from the GENAI_LOG_* variables
+configure_logging()
+# Speculative mode generates images from the raw transcript while the prompt
+# is refined. "raw" keeps the raw images (the refined prompt only warms the
+# prompt cache), "refined" shows the raw images as a preview and replaces them
+# with the refined ones as soon as they are ready. Leave empty to disable it.
+speculative_keep = os.environ.get("VOICE2IMAGE_SPECULATIVE", "")
+whisper_model = WhisperModel(
+    "whisper-1", target_sample_rate=WHISPER_SAMPLE_RATE
+)
+prompt_generation_model = PromptGenerationModel(cache=PromptCache())
+image_generation_model = ImageGenerationModel(
+    n_images=4,
+    parallel=True,
+    cache_dir=os.environ.get(
+        "VOICE2IMAGE_CACHE_DIR",
+        os.path.join(tempfile.gettempdir(), "voice2image-cache"),
+    ),
+)
+
+
+def convert_audio(audio):
+    transcript = whisper_model(audio)
+    if speculative_keep == "raw":
+        yield from _speculative_raw(transcript)
+    elif speculative_keep == "refined":
+        yield from _speculative_refined(transcript)
+    else:
+        prompt = prompt_generation_model(transcript)
+        # show every image as soon as it is ready
+        yield from image_generation_model.stream(prompt)
+
 
+def _speculative_raw(transcript):
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        refinement = executor.submit(prompt_generation_model, transcript)
+        yield from image_generation_model.stream(transcript)
+        refinement.result()
 
-def convert_audio(audio_file):
-    os.rename(audio_file, audio_file + '.wav')
-    transcript = whisper_model(audio_file + '.wav')
-    prompt = prompt_generation_model(transcript)
-    images = image_generation_model(prompt)
-    return images
 
-def voice_to_image():
+def _speculative_refined(transcript):
+    updates = queue.Queue()
+
+    def generate(source, get_prompt):
+        try:
+            for images in image_generation_model.stream(get_prompt()):
+                updates.put((source, images))
+        finally:
+            updates.put((source, None))
+
+    n_images = image_generation_model.n_images
+    raw_images, refined_images = [None] * n_images, [None] * n_images
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(generate, "raw", lambda: transcript),
+            executor.submit(
+                generate, "refined", lambda: prompt_generation_model(transcript)
+            ),
+        ]
+        running = len(futures)
+        while running:
+            source, images = updates.get()
+            if images is None:
+                running -= 1
+                continue
+            if source == "raw":
+                raw_images = images
+            else:
+                refined_images = images
+            # refined images replace the raw ones slot by slot
+            yield [
+                refined if refined is not None else raw
+                for raw, refined in zip(raw_images, refined_images)
+            ]
+        for future in futures:
+            future.result()
+
+def build_voice_to_image(concurrency_limits=None, max_batch_size=1):
+    """
+    Parameters:
+        concurrency_limits(dict): requests processed at the same time by each
+            event handler, by handler name. Handlers not listed use the
+            default limit of the queue.
+        max_batch_size(int): ignored, convert_audio streams the images one
+            by one and gradio cannot batch streaming handlers.
+    """
+    concurrency_limits = concurrency_limits or {}
     with gr.Blocks() as demo:
         # Add a title
         gr.Markdown(
@@ -27,7 +107,7 @@ def voice_to_image():
             "generate images based on the audio you recorded.\n\nEnjoy!🔥"
         )
         audio_window = gr.Audio(
-            sources="microphone", type="filepath", label="Input Audio"
+            sources="microphone", type="numpy", label="Input Audio"
         )
         convert_button = gr.Button("Generate Images")
         with gr.Row():
@@ -36,6 +116,23 @@ def voice_to_image():
             image_3 = gr.Image()
             image_4 = gr.Image()
 
-        convert_button.click(convert_audio, inputs=[audio_window], outputs=[image_1, image_2, image_3, image_4])
+        convert_button.click(
+            convert_audio,
+            inputs=[audio_window],
+            outputs=[image_1, image_2, image_3, image_4],
+            concurrency_limit=concurrency_limits.get("convert_audio", "default"),
+        )
+
+    return demo
+
 
-    demo.launch()
\ No newline at end of file
+def voice_to_image(
+        max_queue_size=None,
+        concurrency_limit=1,
+        concurrency_limits=None,
+        max_batch_size=1,
+        **launch_options,
+):
+    demo = build_voice_to_image(concurrency_limits, max_batch_size)
+    demo.queue(max_size=max_queue_size, default_concurrency_limit=concurrency_limit)
+    demo.launch(**launch_options)
@@ -0,0 +1,99 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import unicodedata
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import List, Optional, Tuple
+
+
+class ImageCache:
+    """On-disk cache of generated images, keyed by a hash of the prompt."""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(prompt: str, size: str) -> str:
+        return hashlib.sha256(f"{size}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def path(self, prompt: str, size: str, index: int) -> str:
+        return os.path.join(self.cache_dir, self.key(prompt, size), f"{index}.png")
+
+    def get(self, prompt: str, size: str, n_images: int) -> Optional[List[str]]:
+        """Return the cached image paths, or None if any of them is missing."""
+        paths = [self.path(prompt, size, i) for i in range(n_images)]
+        if all(os.path.exists(path) for path in paths):
+            return paths
+        return None
+
+    def put(self, prompt: str, size: str, index: int, content: bytes) -> str:
+        path = self.path(prompt, size, index)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a temporary file first so readers never see partial images
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), delete=False) as f:
+            f.write(content)
+        os.replace(f.name, path)
+        return path
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+class PromptCache:
+    """LRU cache of transcript -> refined prompt.
+
+    Transcripts are compared after normalization, so "A red car." and
+    "a red car" share the same entry. By default only such exact matches are
+    used: one word more, e.g. "no", or in another order changes the meaning.
+    With a ``similarity_threshold`` below 1.0, when there is no exact match,
+    the entry whose word sequence is the most similar (``difflib`` ratio, word
+    order included) is used if it is above the threshold.
+    """
+
+    def __init__(self, max_size: int = 1024, similarity_threshold: float = 1.0):
+        self.max_size = max_size
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[str, Tuple[Tuple[str, ...], str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _most_similar(self, words: Tuple[str, ...]) -> Optional[str]:
+        best_score = self.similarity_threshold
+        best_key = None
+        matcher = SequenceMatcher(autojunk=False)
+        matcher.set_seq2(words)
+        for other_key, (other_words, _) in self._entries.items():
+            matcher.set_seq1(other_words)
+            # the quick ratios are upper bounds of the ratio
+            if (
+                    matcher.real_quick_ratio() >= best_score
+                    and matcher.quick_ratio() >= best_score
+                    and matcher.ratio() >= best_score
+            ):
+                best_score, best_key = matcher.ratio(), other_key
+        return best_key
+
+    def get(self, transcript: str) -> Optional[str]:
+        key = normalize_text(transcript)
+        with self._lock:
+            if key not in self._entries and self.similarity_threshold < 1.0:
+                key = self._most_similar(tuple(key.split()))
+            if key is None or key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key][1]
+
+    def put(self, transcript: str, prompt: str) -> None:
+        key = normalize_text(transcript)
+        with self._lock:
+            self._entries[key] = (tuple(key.split()), prompt)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
@@ -1,34 +1,14 @@
 import re
-from abc import abstractmethod, ABC
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Optional
 
-import openai
+from genai_core.client import call_with_retries, get_http_client
+from genai_core.models import BaseGenerativeModel, WhisperModel
+from genai_core.telemetry import truncate
+from .cache import ImageCache, PromptCache
 
-
-class BaseOpenAIModel(ABC):
-    def __init__(self, verbose: bool = False):
-        self.verbose = verbose
-
-    def __call__(self, *args, **kwargs):
-        return self.run(*args, **kwargs)
-
-    @abstractmethod
-    def run(self, *args, **kwargs):
-        raise NotImplementedError
-
-
-class WhisperModel(BaseOpenAIModel):
-    def __init__(self, model_name: str, verbose: bool = False):
-        super().__init__(verbose=verbose)
-        self.model = model_name
-
-    def run(self, file_path: str):
-        if self.verbose:
-            print(f"Transcribing audio file: {file_path}")
-        audio_file = open(file_path, "rb")
-        transcript = openai.Audio.transcribe(self.model, audio_file)
-        if self.verbose:
-            print(f"Transcript output: {transcript}")
-        return transcript["text"]
+# kept for backward compatibility, all the models share the same base now
+BaseOpenAIModel = BaseGenerativeModel
 
 
 class PromptGenerationModel(BaseOpenAIModel):
@@ -50,44 +30,111 @@ class PromptGenerationModel(BaseOpenAIModel):
         )
     }
 
+    def __init__(self, cache: Optional[PromptCache] = None, verbose: bool = False):
+        super().__init__(verbose=verbose)
+        self.cache = cache
+
     def run(self, user_input):
-        if self.verbose:
-            print(f"User input: {user_input}")
+        self.logger.debug("User input: %s", truncate(user_input))
+        if self.cache is not None:
+            prompt = self.cache.get(user_input)
+            if prompt is not None:
+                self.logger.debug("Prompt (cached): %s", truncate(prompt))
+                return prompt
         user_message = {
             "role": "user",
             "content": user_input,
         }
         messages = [self.SYSTEM_TEMPLATE, user_message]
-        response = openai.ChatCompletion.create(
+        response = self._request(
+            self.client.chat.completions.create,
             model="gpt-3.5-turbo",
             messages=messages,
         )
-        if self.verbose:
-            print(f"OpenAI response: {response}")
-        model_response = response["choices"][0]["message"]["content"]
+        model_response = response.choices[0].message.content
+        self.logger.debug("Model response: %s", truncate(model_response))
         # write a regex to extract the prompt
         regex = r"<begin> (.*) <end>"
         prompt = re.search(regex, model_response).group(0)
-        if self.verbose:
-            print(f"Prompt: {prompt}")
+        self.logger.debug("Prompt: %s", truncate(prompt))
+        if self.cache is not None:
+            self.cache.put(user_input, prompt)
         return prompt
 
 
 class ImageGenerationModel(BaseOpenAIModel):
-    def __init__(self, n_images: int = 1, verbose: bool = False):
+    SIZE = "512x512"  # "1024x1024"
+
+    def __init__(
+            self,
+            n_images: int = 1,
+            parallel: bool = False,
+            cache_dir: Optional[str] = None,
+            verbose: bool = False,
+    ):
+        """
+        Parameters:
+            n_images(int): number of images generated for each prompt
+            parallel(bool): split the request into n_images concurrent
+                single-image requests, so images are ready one by one
+            cache_dir(str): when given, images are downloaded over the shared
+                connection pool and cached there by prompt hash. The model
+                then returns local paths instead of remote urls.
+        """
         super().__init__(verbose=verbose)
         self.n_images = n_images
+        self.parallel = parallel
+        self.cache = ImageCache(cache_dir) if cache_dir else None
+
+    def run(self, prompt: str) -> List[str]:
+        images = []
+        for images in self.stream(prompt):
+            pass
+        return images
 
-    def run(self, prompt: str):
-        if self.verbose:
-            print(f"Prompt: {prompt}")
-        response = openai.Image.create(
+    def stream(self, prompt: str) -> Iterator[List[Optional[str]]]:
+        """Yield the list of images every time a new one is ready.
+
+        Images not generated yet are None.
+        """
+        self.logger.debug("Prompt: %s", truncate(prompt))
+        if self.cache is not None:
+            cached = self.cache.get(prompt, self.SIZE, self.n_images)
+            if cached is not None:
+                self.logger.debug("Images found in cache")
+                yield cached
+                return
+        if not self.parallel:
+            yield self._generate(prompt, n_images=self.n_images)
+            return
+        images = [None] * self.n_images
+        with ThreadPoolExecutor(max_workers=self.n_images) as executor:
+            futures = {
+                executor.submit(self._generate, prompt, n_images=1, first_index=i): i
+                for i in range(self.n_images)
+            }
+            for future in as_completed(futures):
+                images[futures[future]] = future.result()[0]
+                yield list(images)
+
+    def _generate(self, prompt: str, n_images: int, first_index: int = 0) -> List[str]:
+        response = self._request(
+            self.client.images.generate,
             prompt=prompt,
-            n=self.n_images,
-            # size="1024x1024"
-            size="512x512"
+            n=n_images,
+            size=self.SIZE,
         )
-        if self.verbose:
-            print(f"OpenAI response: {response}")
-        image_urls = response['data']
-        return [x['url'] for x in image_urls]
+        urls = [image.url for image in response.data]
+        self.logger.debug("Image urls: %s", truncate(urls))
+        if self.cache is None:
+            return urls
+        return [
+            self.cache.put(prompt, self.SIZE, first_index + i, self._download(url))
+            for i, url in enumerate(urls)
+        ]
+
+    @staticmethod
+    def _download(url: str) -> bytes:
+        response = call_with_retries(get_http_client().get, url)
+        response.raise_for_status()
+        return response.content